@@ -0,0 +1,133 @@
+# asr_precision.py
+# Precision modes for the Whisper ASR stage on CPU: int8 dynamic quantization
+# of the linear layers, bf16 where the CPU has native support, and fp32.
+
+import glob
+import json
+import os
+
+FP32 = "fp32"
+BF16 = "bf16"
+INT8 = "int8"
+AUTO = "auto"
+MODES = [FP32, BF16, INT8]   # most precise first; AUTO takes the first supported one that fits the budget
+
+# Resident size of the weights relative to fp32. Whisper's Linear layers hold
+# ~90% of its parameters; int8 quantizes only those and keeps the rest in fp32.
+FOOTPRINT = {FP32: 1.0, BF16: 0.5, INT8: 0.35}
+DEFAULT_BUDGET_MB = 2048.0
+
+
+def int8_supported():
+    import torch
+    return any(engine != "none" for engine in torch.backends.quantized.supported_engines)
+
+
+def bf16_supported():
+    """True if the CPU runs bf16 matmuls natively (emulated bf16 is slower than fp32)."""
+    import torch
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (AttributeError, RuntimeError):
+        pass
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+
+def supported(mode):
+    if mode == INT8:
+        return int8_supported()
+    if mode == BF16:
+        return bf16_supported()
+    return mode == FP32
+
+
+def weights_mb(model_dir):
+    """Size of the checkpoint in fp32 (MB), from the weight files and the dtype they were saved in."""
+    files = glob.glob(os.path.join(model_dir, "*.safetensors")) + glob.glob(os.path.join(model_dir, "*.bin"))
+    size = sum(os.path.getsize(path) for path in files) / 2 ** 20
+    try:
+        with open(os.path.join(model_dir, "config.json"), encoding="utf-8") as f:
+            saved_dtype = json.load(f).get("torch_dtype")
+    except (OSError, ValueError):
+        saved_dtype = None
+    return size * 2 if saved_dtype in ("float16", "bfloat16") else size
+
+
+def estimate_mb(model_dir, mode):
+    return weights_mb(model_dir) * FOOTPRINT[mode]
+
+
+def parse_budget(value, default=DEFAULT_BUDGET_MB):
+    """A memory budget in MB from a config string; the default if unset or not a positive number."""
+    if value is None or not str(value).strip():
+        return default
+    try:
+        budget = float(value)
+    except ValueError:
+        budget = 0
+    if budget > 0:
+        return budget
+    print(f"Ignoring ASR memory budget '{value}': not a positive number; using {default:.0f} MB.")
+    return default
+
+
+def resolve(mode, model_dir=None, budget_mb=None):
+    """
+    The precision to load with. AUTO picks the most precise supported mode
+    whose estimated weights fit budget_mb (or the smallest one if none do);
+    an unknown mode, or one the CPU can't run, falls back to fp32.
+    """
+    mode = (mode or FP32).strip().lower()
+    if mode not in MODES and mode != AUTO:
+        print(f"Unknown ASR precision '{mode}' (expected one of {', '.join(MODES + [AUTO])}); using {FP32}.")
+        return FP32
+    if mode != AUTO:
+        if supported(mode):
+            return mode
+        print(f"ASR precision {mode} is not supported on this CPU; using {FP32}.")
+        return FP32
+
+    candidates = [m for m in MODES if supported(m)]
+    if budget_mb and model_dir:
+        for candidate in candidates:
+            if estimate_mb(model_dir, candidate) <= budget_mb:
+                return candidate
+        smallest = min(candidates, key=lambda m: FOOTPRINT[m])
+        print(f"No ASR precision fits {budget_mb:.0f} MB; using the smallest ({smallest}).")
+        return smallest
+    return candidates[0]
+
+
+def load_model(model_dir, mode):
+    # Plain from_pretrained like pipeline(model=path) does: low_cpu_mem_usage
+    # would make accelerate a hard dependency on transformers 4.x.
+    import torch
+    from transformers import AutoModelForSpeechSeq2Seq
+
+    if mode == BF16:
+        return AutoModelForSpeechSeq2Seq.from_pretrained(model_dir, torch_dtype=torch.bfloat16).eval()
+    model = AutoModelForSpeechSeq2Seq.from_pretrained(model_dir, torch_dtype=torch.float32)
+    if mode == INT8:
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model.eval()
+
+
+def load_pipeline(model_dir, tokenizer_dir, feature_extractor_dir, mode, generate_kwargs=None):
+    """The automatic-speech-recognition pipeline with its model loaded at the given precision."""
+    import torch
+    from transformers import pipeline
+
+    return pipeline(
+        "automatic-speech-recognition",
+        model=load_model(model_dir, mode),
+        tokenizer=tokenizer_dir,
+        feature_extractor=feature_extractor_dir,
+        generate_kwargs=generate_kwargs,
+        # Input features are cast to the model's dtype.
+        torch_dtype=torch.bfloat16 if mode == BF16 else torch.float32
+    )
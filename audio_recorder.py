@@ -1,113 +1,111 @@
 # audio_recorder.py
 # --- MODIFIED to be GUI-friendly ---
 
-import sounddevice as sd
 import numpy as np
 from scipy.io.wavfile import write
-import time
 import threading
-import sys
+import capture_service
 
 SAMPLE_RATE = 16000
 FILENAME = "recorded_audio.wav"
 SILENCE_THRESHOLD = 0.005
-MAX_SILENCE_DURATION = 1.0
-CALIBRATION_TIME = 0.5
+MAX_SILENCE_DURATION = 1.0   # longest end-of-speech wait; short commands stop sooner (vad.py)
+CALIBRATION_TIME = 0.5         # once per session, when the microphone stream opens
 CHUNK_SIZE = 512
+MAX_RECORDING_TIME = 30.0
 
-def record_with_immediate_stop():
-    print("🎤 Quick calibration (0.5s)... Stay quiet!")
-    
-    recording = []
-    noise_samples = []
-    recording_started = False
-    calibration_done = False
-    silence_start = None
-    background_noise_level = 0
-    start_time = time.time()
-    processing_complete = threading.Event()
-    
-    def save_and_exit_thread():
-        """Save file in background thread"""
-        # This function NO LONGER EXITS THE PROGRAM.
-        # It just saves the file and sets an event.
-        try:
-            if recording:
-                print(f"🔄 Saving {len(recording)} chunks...")
-                audio_data = np.concatenate(recording, axis=0)
-                audio_data_int16 = np.clip(audio_data * 32767, -32767, 32767).astype(np.int16)
-                write(FILENAME, SAMPLE_RATE, audio_data_int16)
-                duration = len(audio_data) / SAMPLE_RATE
-                print(f"✅ Saved {FILENAME} ({duration:.2f}s)")
-            else:
-                print("❌ No audio recorded")
-        except Exception as e:
-            print(f"❌ Save error: {e}")
-        finally:
-            processing_complete.set()
-            # CRITICAL: os._exit(0) has been REMOVED.
-
-    def callback(indata, frames, time_info, status):
-        nonlocal recording_started, calibration_done, silence_start, background_noise_level
-        
-        volume_norm = np.sqrt(np.mean(np.square(indata)))
-        current_time = time.time()
-        
-        if not calibration_done:
-            noise_samples.append(volume_norm)
-            if current_time - start_time > CALIBRATION_TIME:
-                background_noise_level = np.mean(noise_samples) * 2.0
-                calibration_done = True
-                print(f"📊 Noise level: {background_noise_level:.6f}")
-                print("🎤 Speak now...")
-            return
-        
-        current_threshold = max(SILENCE_THRESHOLD, background_noise_level)
-        
-        if volume_norm > current_threshold:
-            if not recording_started:
-                recording_started = True
-                print("🔴 Recording...")
-            silence_start = None
-            recording.append(indata.copy())
-        elif recording_started:
-            if silence_start is None:
-                silence_start = current_time
-                print("⏸️  Silence...")
-            elif current_time - silence_start > MAX_SILENCE_DURATION:
-                print("⏹️  Stopping...")
-                save_thread = threading.Thread(target=save_and_exit_thread, daemon=False)
-                save_thread.start()
-                raise sd.CallbackStop()
+# --- Debug sink ---
+# The recorder hands the float32 buffer straight to the ASR stage.
+# Set this to True (or pass debug_wav_path) to also dump each turn to disk.
+SAVE_DEBUG_WAV = False
 
+
+def save_debug_wav(audio_data, path=FILENAME):
+    """Writes a float32 recording to disk as 16-bit PCM (debugging only)."""
     try:
-        with sd.InputStream(
-            samplerate=SAMPLE_RATE, 
-            channels=1, 
-            callback=callback, 
-            dtype='float32',
-            blocksize=CHUNK_SIZE
-        ):
-            sd.sleep(30000)
-            
-    except sd.CallbackStop:
-        print("CallbackStop received. Waiting for save...")
-        processing_complete.wait(timeout=2.0)
-        # CRITICAL: sys.exit(0) has been REMOVED.
-        print("Recording function finished.")
+        audio_data_int16 = np.clip(audio_data * 32767, -32767, 32767).astype(np.int16)
+        write(path, SAMPLE_RATE, audio_data_int16)
+        print(f"💾 Debug copy saved to {path}")
+    except Exception as e:
+        print(f"❌ Save error: {e}")
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_capture_service():
+    """The session's CaptureService (one open microphone stream), created on first use."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = capture_service.CaptureService(
+                sample_rate=SAMPLE_RATE,
+                block_size=CHUNK_SIZE,
+                calibration_time=CALIBRATION_TIME,
+                max_recording_time=MAX_RECORDING_TIME,
+                max_silence=MAX_SILENCE_DURATION,
+                min_rms=SILENCE_THRESHOLD
+            )
+        return _service
+
+
+def record_with_immediate_stop(debug_wav_path=None, transcriber=None, wake_word=None, stop_event=None,
+                               on_wake=None, barge_in=None):
+    """
+    Records one utterance from the microphone.
+    Returns a 1-D float32 NumPy array at SAMPLE_RATE, or None if nothing was recorded.
+
+    The microphone stream stays open between calls (capture_service.py), so
+    recording starts at once with an up-to-date noise floor; the adaptive
+    endpointer (vad.py) stops it as soon as the utterance is over. The
+    returned audio includes vad.PRE_ROLL before the detected onset.
+
+    If a streaming_asr.StreamingTranscriber is given, the speech audio and
+    every pause are forwarded to it so decoding overlaps with speech.
+
+    With a wake_word.WakeWordSpotter, the stream goes to the spotter until
+    it hears the wake word (no time limit); recording then starts with the
+    audio right after it, so "Jarvis, open notepad" in one breath works.
+    on_wake is called when that happens. Setting stop_event gives up and
+    returns None.
+
+    With a barge_in.BargeInDetector the same happens while a reply is
+    playing: the detector stops the reply when the user talks over it, and
+    that speech becomes the next command.
+    """
+    try:
+        audio_data = get_capture_service().capture(
+            transcriber=transcriber,
+            wake_word=wake_word,
+            stop_event=stop_event,
+            on_wake=on_wake,
+            barge_in=barge_in
+        )
     except KeyboardInterrupt:
         print("\n⏹️ Stopped by user")
-        save_thread = threading.Thread(target=save_and_exit_thread, daemon=False)
-        save_thread.start()
-        processing_complete.wait(timeout=2.0)
-        # CRITICAL: sys.exit(0) has been REMOVED.
-        print("Recording function finished (KeyboardInterrupt).")
+        return None
+
+    if stop_event is not None and stop_event.is_set():
+        return None
+    if audio_data is None:
+        print("❌ No audio recorded")
+        return None
+
+    duration = len(audio_data) / SAMPLE_RATE
+    print(f"✅ Captured {duration:.2f}s")
+
+    if debug_wav_path or SAVE_DEBUG_WAV:
+        save_debug_wav(audio_data, debug_wav_path or FILENAME)
+
+    print("Recording function finished.")
+    return audio_data
 
 if __name__ == "__main__":
     # This file should no longer be run directly.
     # Run main_gui.py instead.
     print("This file is a module. Run main_gui.py to start the assistant.")
     try:
-        record_with_immediate_stop()
+        record_with_immediate_stop(debug_wav_path=FILENAME)
     except Exception as e:
-        print(f"❌ Error: {e}")
\ No newline at end of file
+        print(f"❌ Error: {e}")
@@ -0,0 +1,121 @@
+# barge_in.py
+# Lets the user interrupt a spoken reply: a light VAD on the microphone that
+# ignores the assistant's own voice coming back from the speakers.
+
+import time
+import numpy as np
+import vad
+
+SAMPLE_RATE = 16000
+ONSET_TIME = 0.08          # speech this long above the echo gate interrupts the reply
+ECHO_WINDOW = 0.12         # output this recent (plus the device latency) can still be heard by the mic
+ECHO_MARGIN = 1.5          # the mic must be this much louder than the expected echo
+COUPLING_RANGE = (0.02, 2.0)
+# Until the coupling has been measured, assume the loudest echo we handle, so a
+# loud room can't interrupt the reply with the assistant's own voice.
+ECHO_COUPLING = COUPLING_RANGE[1]
+COUPLING_RISE = 0.05       # the coupling estimate follows echo peaks quickly...
+COUPLING_DECAY = 0.002     # ...and forgets them slowly
+COUPLING_WARMUP = 0.5      # seconds of echo measured before the starting guess is replaced
+COUPLING_PERCENTILE = 95   # ...by this percentile of the measured mic/output ratios
+RING_SECONDS = 2.0
+
+
+class BargeInDetector:
+    """
+    Watches the microphone while a reply plays and reports when the user
+    starts talking over it. It has the same interface as
+    wake_word.WakeWordSpotter, so CaptureService can use it as the gate of
+    a turn. process() returns None, or the absolute sample position where
+    the user's speech began (minus vad.PRE_ROLL), so the command can be
+    recorded from self.ring without losing its onset.
+
+    Echo gating: `output` (the playback_engine.PlaybackEngine) reports how
+    loud it has recently been playing. A frame only counts as the user if it
+    is speech-like and ECHO_MARGIN times louder than the echo that output
+    level would produce. The echo coupling (mic level per unit of output
+    level) is learned from the frames that don't pass the gate; until
+    COUPLING_WARMUP of echo has been measured the gate assumes the highest
+    coupling, so the reply can only be interrupted by speech well above it.
+    On a detection the output is stopped right away, from the audio thread.
+    """
+
+    def __init__(self, output, sample_rate=SAMPLE_RATE, noise_floor=None, coupling=None, min_rms=vad.MIN_RMS):
+        self.output = output
+        self.sample_rate = sample_rate
+        self.min_rms = min_rms
+        self.ring = vad.RingBuffer(int(RING_SECONDS * sample_rate))
+        self.noise_floor = noise_floor or 0.0
+        # A coupling learned during an earlier reply (same room and devices) needs no warm-up.
+        self.coupling = coupling or ECHO_COUPLING
+        self._warmup = None if coupling else []
+        self._warmup_frames = int(COUPLING_WARMUP * sample_rate / vad.FRAME_SIZE)
+        self.onset_frames = max(1, int(round(ONSET_TIME * sample_rate / vad.FRAME_SIZE)))
+
+        self._run = 0            # consecutive frames above the gate
+        self._run_start = None
+
+        # Stats
+        self.busy_seconds = 0.0
+        self.triggered_at = None
+
+    def process(self, block):
+        started = time.perf_counter()
+        try:
+            return self._process(block.reshape(-1))
+        finally:
+            self.busy_seconds += time.perf_counter() - started
+
+    def _process(self, block):
+        block_start = self.ring.total
+        self.ring.write(block)
+        energy, flatness = vad.frame_features(block, self.sample_rate)
+        if not len(energy):
+            return None
+
+        echo = self.output.output_level(ECHO_WINDOW)
+        threshold = max(self.min_rms, self.noise_floor * vad.ENERGY_RATIO, ECHO_MARGIN * self.coupling * echo)
+        speech = (energy > threshold) & (flatness < vad.MAX_FLATNESS)
+
+        for i, is_speech in enumerate(speech):
+            if not is_speech:
+                self._run = 0
+                self._run_start = None
+                if energy[i] <= threshold:
+                    self._learn(energy[i], echo)
+                continue
+            if self._run_start is None:
+                self._run_start = block_start + i * vad.FRAME_SIZE
+            self._run += 1
+            if self._run >= self.onset_frames:
+                return self._trigger()
+        return None
+
+    def _learn(self, energy, echo):
+        if echo > self.min_rms:
+            ratio = energy / echo
+            if self._warmup is not None:
+                self._warmup.append(ratio)
+                if len(self._warmup) >= self._warmup_frames:
+                    self.coupling = float(np.clip(np.percentile(self._warmup, COUPLING_PERCENTILE), *COUPLING_RANGE))
+                    self._warmup = None
+                return
+            rate = COUPLING_RISE if ratio > self.coupling else COUPLING_DECAY
+            self.coupling = float(np.clip(self.coupling + rate * (ratio - self.coupling), *COUPLING_RANGE))
+        else:
+            self.noise_floor += vad.NOISE_ADAPT * (float(energy) - self.noise_floor)
+
+    @property
+    def learned_coupling(self):
+        """The echo coupling once measured (pass it to the next detector), else None."""
+        return self.coupling if self._warmup is None else None
+
+    def _trigger(self):
+        self.output.stop_all()
+        self.triggered_at = time.time()
+        return max(self.ring.oldest(), self._run_start - int(vad.PRE_ROLL * self.sample_rate))
+
+    def cpu_load(self):
+        """Share of one core spent in process(), relative to the audio it was fed."""
+        audio_seconds = self.ring.total / self.sample_rate
+        return self.busy_seconds / audio_seconds if audio_seconds else 0.0
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+ASR precision benchmark: what each Whisper precision mode (asr_precision.py)
+costs and gives on this machine, to pick ASR_PRECISION per deployment.
+
+Every mode is loaded in its own process (so resident memory isn't shared
+between them), warmed up like ModelManager does, and run over a fixed test
+set. Reported:
+
+  load          model + pipeline load time
+  rss           resident memory after load and warm-up (and peak, which for
+                int8 includes the fp32 weights it is quantized from)
+  rtf           real-time factor: decode time / audio duration (< 1 is faster than real time)
+  wer           word error rate against the reference transcripts
+
+The test set is a directory of 16 kHz 16-bit WAVs, each with a .txt of the
+same name holding the reference transcript. --synthesize builds the default
+one from the utterances in benchmarks/corpus/commands.jsonl with the en-IN
+edge-tts voices (needs network once); record your own into a directory to
+measure real microphones and accents. Run from the repository root:
+
+    python -m benchmarks.asr_benchmark --synthesize
+    python -m benchmarks.asr_benchmark
+    python -m benchmarks.asr_benchmark --modes int8,fp32 --testset my_recordings/
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import wave
+import numpy as np
+import asr_precision
+
+SAMPLE_RATE = 16000
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+TESTSET_DIR = os.path.join(CORPUS_DIR, "asr")
+WHISPER_DIR = "whisper_medium"
+VOICES = ["en-IN-NeerjaNeural", "en-IN-PrabhatNeural"]
+RESULT_PREFIX = "RESULT "
+
+
+# --- Test set ---
+
+def synthesize_testset(directory):
+    """Renders every utterance of commands.jsonl to <directory>/NNN.wav + NNN.txt."""
+    import tts_player
+
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(CORPUS_DIR, "commands.jsonl"), encoding="utf-8") as f:
+        texts = [json.loads(line)["text"] for line in f if line.strip()]
+    for i, text in enumerate(texts):
+        voice = VOICES[i % len(VOICES)]
+        pcm, rate = tts_player._synthesize_pcm(text, voice, put=lambda pcm, sample_rate: None)
+        if pcm is None:
+            print(f"Skipping '{text}': nothing synthesized")
+            continue
+        pcm = pcm.reshape(len(pcm), -1).mean(axis=1)
+        positions = np.arange(int(len(pcm) * SAMPLE_RATE / rate)) * rate / SAMPLE_RATE
+        audio = np.interp(positions, np.arange(len(pcm)), pcm)
+        path = os.path.join(directory, f"{i:03d}")
+        with wave.open(path + ".wav", "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(SAMPLE_RATE)
+            f.writeframes((np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes())
+        with open(path + ".txt", "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(f"Wrote {len(texts)} utterances to {directory}")
+
+
+def load_testset(directory):
+    clips = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        text_path = os.path.splitext(path)[0] + ".txt"
+        if not os.path.exists(text_path):
+            print(f"Skipping {path}: no {os.path.basename(text_path)}")
+            continue
+        with wave.open(path, "rb") as f:
+            rate, channels, width = f.getframerate(), f.getnchannels(), f.getsampwidth()
+            frames = f.readframes(f.getnframes())
+        if rate != SAMPLE_RATE or width != 2:
+            print(f"Skipping {path}: needs {SAMPLE_RATE} Hz 16-bit PCM")
+            continue
+        data = np.frombuffer(frames, dtype=np.int16).reshape(-1, channels).mean(axis=1) / 32767.0
+        with open(text_path, encoding="utf-8") as f:
+            text = f.read().strip()
+        clips.append({"name": os.path.basename(path), "audio": data.astype(np.float32), "text": text})
+    return clips
+
+
+# --- Scoring ---
+
+def normalize(text):
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_errors(reference, hypothesis):
+    """(substitutions + deletions + insertions, reference words) after normalize()."""
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, word in enumerate(ref, 1):
+        current = [i]
+        for j, other in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (word != other)))
+        previous = current
+    return previous[-1], len(ref)
+
+
+def _peak_mb(process):
+    info = process.memory_info()
+    if hasattr(info, "peak_wset"):     # Windows
+        return info.peak_wset / 2 ** 20
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+# --- One mode (runs in a child process) ---
+
+def measure(mode, testset, whisper_dir):
+    import psutil
+
+    clips = load_testset(testset)
+    process = psutil.Process()
+    started = time.perf_counter()
+    pipe = asr_precision.load_pipeline(
+        os.path.join(whisper_dir, "model"),
+        os.path.join(whisper_dir, "tokenizer"),
+        os.path.join(whisper_dir, "feature_extractor"),
+        mode,
+        generate_kwargs={"language": "en"}
+    )
+    load_time = time.perf_counter() - started
+    pipe(np.zeros(SAMPLE_RATE, dtype=np.float32))
+    rss = process.memory_info().rss / 2 ** 20
+
+    errors = words = 0
+    decode_seconds = audio_seconds = 0.0
+    for clip in clips:
+        started = time.perf_counter()
+        text = pipe(clip["audio"].copy())["text"]
+        decode_seconds += time.perf_counter() - started
+        audio_seconds += len(clip["audio"]) / SAMPLE_RATE
+        clip_errors, clip_words = word_errors(clip["text"], text)
+        errors += clip_errors
+        words += clip_words
+        if clip_errors:
+            print(f"  {clip['name']}: '{text.strip()}' (expected '{clip['text']}')")
+
+    return {
+        "mode": mode,
+        "clips": len(clips),
+        "load": load_time,
+        "rss_mb": rss,
+        "peak_mb": _peak_mb(process),
+        "rtf": decode_seconds / audio_seconds if audio_seconds else None,
+        "wer": errors / words if words else None,
+    }
+
+
+def run_mode(mode, testset, whisper_dir):
+    command = [sys.executable, "-m", "benchmarks.asr_benchmark", "--worker", mode,
+               "--testset", testset, "--whisper-dir", whisper_dir]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+        print(line)
+    print(completed.stderr.strip()[-2000:])
+    return None
+
+
+def _cell(value, fmt):
+    return "-" if value is None else format(value, fmt)
+
+
+def print_table(results, budget_mb):
+    print("\n  " + "".join(f"{c:>12}" for c in ["mode", "load", "rss", "peak", "rtf", "wer", "budget"]))
+    for r in results:
+        fits = "ok" if budget_mb is None or r["rss_mb"] <= budget_mb else "over"
+        print("  " + "".join(f"{c:>12}" for c in [
+            r["mode"], f"{r['load']:.1f} s", f"{r['rss_mb']:.0f} MB", _cell(r["peak_mb"], ".0f") + " MB",
+            _cell(r["rtf"], ".2f"), _cell(r["wer"], ".1%"), fits,
+        ]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default=",".join(asr_precision.MODES))
+    parser.add_argument("--testset", default=TESTSET_DIR, help="directory of 16 kHz WAVs with .txt transcripts")
+    parser.add_argument("--whisper-dir", default=WHISPER_DIR)
+    parser.add_argument("--budget-mb", type=float, default=asr_precision.parse_budget(os.getenv("ASR_MEMORY_BUDGET_MB")),
+                        help="memory budget to check against (default: ASR_MEMORY_BUDGET_MB)")
+    parser.add_argument("--synthesize", action="store_true", help="(re)build the test set with edge-tts and exit")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.synthesize:
+        synthesize_testset(args.testset)
+        return
+    if args.worker:
+        print(RESULT_PREFIX + json.dumps(measure(args.worker, args.testset, args.whisper_dir)))
+        return
+
+    if not load_testset(args.testset):
+        print(f"No test set in {args.testset}; build it with --synthesize or pass --testset DIR.")
+        return
+    results = []
+    for mode in args.modes.split(","):
+        if not asr_precision.supported(mode):
+            print(f"{mode}: not supported on this CPU, skipped")
+            continue
+        estimate = asr_precision.estimate_mb(os.path.join(args.whisper_dir, "model"), mode)
+        print(f"{mode}: loading (weights ~{estimate:.0f} MB)...")
+        result = run_mode(mode, args.testset, args.whisper_dir)
+        if result is not None:
+            results.append(result)
+    print_table(results, args.budget_mb)
+    auto = asr_precision.resolve(asr_precision.AUTO, os.path.join(args.whisper_dir, "model"), args.budget_mb)
+    print(f"\nASR_PRECISION=auto picks {auto} for a {args.budget_mb:.0f} MB budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Barge-in benchmark: how fast the user can interrupt a spoken reply, and how
+often the assistant interrupts itself on its own echo.
+
+A synthetic reply is "played" by a stand-in for the playback engine, comes
+back into the microphone through a delayed, reverberant echo path with a
+random coupling, and is mixed with room noise. In the barge-in clips the
+user starts talking over it at a random point, at several levels relative
+to the echo. barge_in.BargeInDetector is compared with the same detector
+without echo gating (it is told nothing is playing). Reported:
+
+  false interrupts    echo-only replies that were interrupted
+  detected            barge-in clips that were interrupted after the user started
+  latency             user speech onset -> detection (p50 / max)
+  onset kept          detections whose returned start position precedes the user's onset
+
+Run from the repository root:
+
+    python -m benchmarks.barge_in_benchmark
+"""
+
+import argparse
+import numpy as np
+import barge_in
+import vad
+from benchmarks.vad_benchmark import noise, synthetic_speech
+
+SAMPLE_RATE = barge_in.SAMPLE_RATE
+BLOCK = 512
+OUTPUT_BLOCK = 320          # 20 ms, as the engine's callback
+OUTPUT_LATENCY = 0.04       # device output latency reported by the stream
+ACOUSTIC_DELAY = 0.03       # speaker -> mic path on top of it
+REPLY_SECONDS = 8.0
+USER_TO_ECHO_DB = [0, 6, 12]
+COUPLING = (0.05, 1.8)      # echo level at the mic per unit of output level (log-uniform)
+NOISE_RMS = 0.002
+
+
+class SimulatedOutput:
+    """Plays `reply` the way PlaybackEngine would, for a caller that advances `now`."""
+
+    def __init__(self, reply):
+        blocks = len(reply) // OUTPUT_BLOCK
+        frames = reply[:blocks * OUTPUT_BLOCK].reshape(blocks, OUTPUT_BLOCK)
+        self.levels = np.sqrt(np.mean(frames ** 2, axis=1))
+        self.output_latency = OUTPUT_LATENCY
+        self.now = 0
+        self.stopped_at = None
+
+    def output_level(self, window):
+        end = self.now if self.stopped_at is None else self.stopped_at
+        first = int((self.now - (window + self.output_latency) * SAMPLE_RATE) // OUTPUT_BLOCK)
+        last = int(end // OUTPUT_BLOCK) + 1
+        levels = self.levels[max(first, 0):max(last, 0)]
+        return float(levels.max()) if len(levels) else 0.0
+
+    def stop_all(self):
+        if self.stopped_at is None:
+            self.stopped_at = self.now
+
+
+class SilentOutput(SimulatedOutput):
+    """The same stream, but the detector is told nothing is playing (no echo gating)."""
+
+    def output_level(self, window):
+        return 0.0
+
+
+def echo_path(reply, rng):
+    """Delayed, reverberant and attenuated copy of the reply as the mic hears it."""
+    delay = int((OUTPUT_LATENCY + ACOUSTIC_DELAY) * SAMPLE_RATE)
+    t = np.arange(int(0.15 * SAMPLE_RATE)) / SAMPLE_RATE
+    impulse = rng.standard_normal(len(t)) * np.exp(-t / rng.uniform(0.02, 0.06))
+    impulse[0] = 4.0
+    impulse /= np.sqrt(np.sum(impulse ** 2))
+    echo = np.convolve(reply, impulse)[:len(reply)]
+    coupling = np.exp(rng.uniform(np.log(COUPLING[0]), np.log(COUPLING[1])))
+    return np.concatenate([np.zeros(delay), echo])[:len(reply)] * coupling, delay
+
+
+def make_clip(rng, user_db=None):
+    reply = synthetic_speech([(int(rng.integers(4, 9)), float(rng.uniform(0.2, 0.5))) for _ in range(6)], rng)
+    reply = np.pad(reply, (0, max(0, int(REPLY_SECONDS * SAMPLE_RATE) - len(reply))))[:int(REPLY_SECONDS * SAMPLE_RATE)]
+    reply *= rng.uniform(0.1, 0.3)
+    echo, delay = echo_path(reply, rng)
+    room = noise("pink", len(reply), rng)
+    room *= NOISE_RMS / np.sqrt(np.mean(room ** 2))
+
+    user = np.zeros(len(reply))
+    onset = None
+    if user_db is not None:
+        speech = synthetic_speech([(int(rng.integers(3, 7)), 0.0)], rng)
+        start = int(rng.uniform(1.5, REPLY_SECONDS - 2.5) * SAMPLE_RATE)
+        voiced = np.flatnonzero(np.abs(speech) > 1e-4)
+        echo_rms = np.sqrt(np.mean(echo[echo != 0] ** 2))
+        speech *= echo_rms * 10 ** (user_db / 20) / np.sqrt(np.mean(speech[voiced] ** 2))
+        user[start:start + len(speech)] = speech[:len(reply) - start]
+        onset = start + voiced[0]
+    return {"reply": reply.astype(np.float32), "echo": echo, "delay": delay, "room": room, "user": user,
+            "onset": onset}
+
+
+def run(clip, output_class):
+    output = output_class(clip["reply"])
+    detector = barge_in.BargeInDetector(output, noise_floor=NOISE_RMS * 0.5)
+    for pos in range(0, len(clip["reply"]) - BLOCK + 1, BLOCK):
+        output.now = pos + BLOCK
+        echo = clip["echo"][pos:pos + BLOCK].copy()
+        if output.stopped_at is not None:
+            # Nothing played after the stop reaches the mic (reverb tail ignored).
+            cut = output.stopped_at + clip["delay"] - pos
+            echo[max(cut, 0):] = 0.0
+        block = (echo + clip["room"][pos:pos + BLOCK] + clip["user"][pos:pos + BLOCK]).astype(np.float32)
+        start = detector.process(block)
+        if start is not None:
+            return pos + BLOCK, start, detector
+    return None, None, detector
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--clips", type=int, default=40, help="clips per condition")
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    echo_only = [make_clip(rng) for _ in range(args.clips)]
+    barge = {db: [make_clip(rng, db) for _ in range(args.clips)] for db in USER_TO_ECHO_DB}
+
+    for label, output_class in (("echo gated", SimulatedOutput), ("no gating", SilentOutput)):
+        false = sum(run(clip, output_class)[0] is not None for clip in echo_only)
+        print(f"{label}: false interrupts {false}/{len(echo_only)} replies")
+        busy = seconds = 0.0
+        for db, clips in barge.items():
+            latencies, kept, early = [], 0, 0
+            for clip in clips:
+                detected, start, detector = run(clip, output_class)
+                busy += detector.busy_seconds
+                seconds += detector.ring.total / SAMPLE_RATE
+                if detected is None:
+                    continue
+                if detected < clip["onset"]:
+                    early += 1
+                    continue
+                latencies.append((detected - clip["onset"]) / SAMPLE_RATE)
+                kept += start <= clip["onset"]
+            latencies.sort()
+            summary = (f"p50 {latencies[len(latencies) // 2]:.3f}s, max {latencies[-1]:.3f}s"
+                       if latencies else "n/a")
+            print(f"  user {db:>2} dB over echo: detected {len(latencies)}/{len(clips)} "
+                  f"(+{early} before the user spoke), latency {summary}, onset kept {kept}/{len(latencies)}")
+        print(f"  CPU: {100 * busy / max(seconds, 1e-9):.2f}% of one core")
+    print(f"(stopping adds at most one output block ({1000 * OUTPUT_BLOCK / SAMPLE_RATE:.0f} ms) "
+          f"plus the device latency; vad.PRE_ROLL is {vad.PRE_ROLL}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Prompt-size benchmark for the get_command and responser system prompts.
+
+Replays the labeled corpus in benchmarks/corpus/ against each prompt variant
+and reports prompt tokens, parse success (via parse_commands), command
+accuracy and latency. Run from the repository root:
+
+    python -m benchmarks.prompt_benchmark                       # local stand-in (stub_server.py)
+    python -m benchmarks.prompt_benchmark --ms-per-prompt-token 0.2
+    python -m benchmarks.prompt_benchmark --live --record benchmarks/recordings.jsonl
+    python -m benchmarks.prompt_benchmark --recordings benchmarks/recordings.jsonl
+
+--live calls the real API (GROQ_API_KEY); --record saves its answers so later
+runs can replay them offline with --recordings.
+
+The local stand-in answers every parser prompt with intent_matcher, whatever
+the prompt says, so on it only the token counts and prefill latency compare
+the variants; parse success, accuracy and clean replies are left out. Use
+--live or --recordings for those.
+"""
+
+import argparse
+import json
+import os
+import time
+import prompts
+import stub_server
+from command_response_fetcher import parse_commands
+from llm_client import LLMClient
+from program_opener import registry
+
+MODEL = "llama-3.1-8b-instant"
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+VARIANTS = ["full", "compact"]
+
+
+def load_corpus(name):
+    with open(os.path.join(CORPUS_DIR, name), encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[max(0, min(len(values) - 1, int(round(p / 100.0 * len(values))) - 1))]
+
+
+def is_known(command):
+    return command == "no_action" or (command or "").endswith(".exe") or registry.get(command) is not None
+
+
+def bench_get_command(client, variant, corpus, combined_reply, recorder):
+    system = prompts.system_prompt("get_command", variant, combined_reply=combined_reply)
+    latencies, usage_tokens = [], []
+    parsed = correct = 0
+    for item in corpus:
+        started = time.time()
+        completion = client.chat(
+            model=MODEL,
+            messages=[{"role": "system", "content": system}, {"role": "user", "content": item["text"]}],
+            temperature=0.0,
+            max_tokens=1024,
+            top_p=1,
+            response_format={"type": "json_object"},
+        )
+        latencies.append(time.time() - started)
+        content = completion.choices[0].message.content
+        if completion.usage is not None:
+            usage_tokens.append(completion.usage.prompt_tokens)
+        recorder(system, item["text"], content)
+
+        tasks = parse_commands(content)
+        commands = [t.get("command") for t in tasks if isinstance(t, dict)]
+        if tasks and len(commands) == len(tasks) and all(is_known(c) for c in commands):
+            parsed += 1
+        if commands == item["commands"]:
+            correct += 1
+
+    return {
+        "prompt_tokens": prompts.estimate_tokens(system),
+        "api_prompt_tokens": sum(usage_tokens) / len(usage_tokens) if usage_tokens else None,
+        "parse_success": parsed / len(corpus),
+        "accuracy": correct / len(corpus),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+    }
+
+
+def bench_responser(client, variant, corpus, recorder):
+    system = prompts.system_prompt("responser", variant)
+    first_token, totals = [], []
+    clean = 0
+    for item in corpus:
+        started = time.time()
+        first = None
+        parts = []
+        for chunk in client.chat_stream(
+            model=MODEL,
+            messages=[{"role": "system", "content": system}, {"role": "user", "content": item["text"]}],
+            temperature=0.8,
+            max_tokens=200,
+            top_p=0.9,
+        ):
+            token = chunk.choices[0].delta.content if chunk.choices else None
+            if token:
+                if first is None:
+                    first = time.time() - started
+                parts.append(token)
+        totals.append(time.time() - started)
+        first_token.append(first if first is not None else totals[-1])
+        reply = "".join(parts).strip()
+        recorder(system, item["text"], reply)
+        if reply and "(translation" not in reply.lower():
+            clean += 1
+
+    return {
+        "prompt_tokens": prompts.estimate_tokens(system),
+        "clean_replies": clean / len(corpus),
+        "ttft_p50": percentile(first_token, 50),
+        "ttft_p95": percentile(first_token, 95),
+        "total_p50": percentile(totals, 50),
+    }
+
+
+PERCENT_COLUMNS = {"parse_success", "accuracy", "clean_replies"}
+TIME_COLUMNS = {"p50", "p95", "ttft_p50", "ttft_p95", "total_p50"}
+
+
+def _cell(column, value):
+    if value is None:
+        return "-"
+    if column in PERCENT_COLUMNS:
+        return f"{value:.0%}"
+    if column in TIME_COLUMNS:
+        return f"{value * 1000:.0f} ms"
+    return f"{value:.0f}"
+
+
+def print_table(title, rows, columns):
+    print(f"\n{title}")
+    print("  " + "".join(f"{c:>18}" for c in ["variant"] + columns))
+    for variant, result in rows:
+        print("  " + "".join(f"{c:>18}" for c in [variant] + [_cell(c, result[c]) for c in columns]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare prompt variants on a labeled utterance corpus")
+    parser.add_argument("--variants", default=",".join(VARIANTS))
+    parser.add_argument("--live", action="store_true", help="use the real API instead of the local stand-in")
+    parser.add_argument("--record", default=None, help="append the answers to this JSONL file")
+    parser.add_argument("--recordings", default=None, help="replay recorded answers on the stand-in")
+    parser.add_argument("--ms-per-prompt-token", type=float, default=0.05, help="stand-in prefill cost")
+    parser.add_argument("--no-combined-reply", action="store_true", help="benchmark get_command without the reply addendum")
+    args = parser.parse_args()
+
+    server = None
+    if args.live:
+        client = LLMClient(api_key=os.getenv("GROQ_API_KEY"), base_url=os.getenv("GROQ_BASE_URL"))
+    else:
+        recordings = stub_server.load_recordings(args.recordings) if args.recordings else None
+        server, url = stub_server.start_server(ms_per_prompt_token=args.ms_per_prompt_token, recordings=recordings)
+        client = LLMClient(api_key="stub", base_url=url)
+
+    record_file = open(args.record, "a", encoding="utf-8") if args.record else None
+
+    def recorder(system, user, content):
+        if record_file:
+            record_file.write(json.dumps({"key": stub_server.recording_key(system, user), "content": content}) + "\n")
+
+    commands = load_corpus("commands.jsonl")
+    replies = load_corpus("replies.jsonl")
+    variants = [v.strip() for v in args.variants.split(",") if v.strip()]
+
+    client.warm().result(timeout=15)
+    get_command_rows, responser_rows = [], []
+    for variant in variants:
+        print(f"Running variant '{variant}' ({prompts.get_template('get_command', variant).version}, "
+              f"{prompts.get_template('responser', variant).version})...")
+        get_command_rows.append((variant, bench_get_command(client, variant, commands, not args.no_combined_reply, recorder)))
+        responser_rows.append((variant, bench_responser(client, variant, replies, recorder)))
+
+    source = "live API" if args.live else ("recorded answers" if args.recordings else "local stand-in")
+    print(f"\nSource: {source}; {len(commands)} commands, {len(replies)} reply inputs.")
+    # The stand-in's answers don't depend on the prompt, so their quality says nothing about it.
+    scored = args.live or args.recordings
+    print_table("get_command", get_command_rows,
+                ["prompt_tokens", "api_prompt_tokens"] + (["parse_success", "accuracy"] if scored else []) + ["p50", "p95"])
+    print_table("responser", responser_rows,
+                ["prompt_tokens"] + (["clean_replies"] if scored else []) + ["ttft_p50", "ttft_p95", "total_p50"])
+    if not scored:
+        print("\n(Answer quality isn't scored on the local stand-in; use --live or --recordings.)")
+
+    if record_file:
+        record_file.close()
+    client.close()
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
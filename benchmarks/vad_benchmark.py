@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Offline endpointing benchmark for the recorder.
+
+Replays clips block by block (CHUNK_SIZE, as the microphone delivers them)
+through the legacy fixed-threshold/1.0 s recorder logic and through
+vad.VoiceActivityDetector, and reports per condition:
+
+  stop after speech   how long after the true end of speech recording stopped
+  speech lost         labeled speech missing from the returned audio (clipping)
+  onset clip          part of that lost before the first kept sample
+  early stops         recordings that ended before the speaker had finished
+  missed              clips where no speech was detected at all
+  callback            mean time per block spent in the detector
+
+Synthetic clips (harmonic, syllable-modulated "speech" with internal pauses
+over white, pink and mains-hum noise at several SNRs) are always included.
+Recorded clips can be added with --clips DIR: each WAV (16 kHz, 16-bit) needs a
+JSON file of the same name with {"start": seconds, "end": seconds}.
+
+    python -m benchmarks.vad_benchmark
+    python -m benchmarks.vad_benchmark --clips recordings/ --seed 3
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+import wave
+import numpy as np
+import vad
+
+# Mirrors audio_recorder (not imported, so no audio device/PortAudio is needed).
+SAMPLE_RATE = 16000
+BLOCK = 512
+CALIBRATION_TIME = 0.5
+SILENCE_THRESHOLD = 0.005
+MAX_SILENCE_DURATION = 1.0
+LEAD_IN = 1.2    # seconds of noise before speech (covers calibration)
+TAIL = 2.5       # seconds of noise after speech
+
+# (label, [(syllables, pause after in seconds), ...])
+UTTERANCES = [
+    ("short command", [(3, 0.0)]),
+    ("command", [(5, 0.0)]),
+    ("paused command", [(3, 0.45), (3, 0.0)]),
+    ("sentence", [(6, 0.3), (5, 0.6), (4, 0.0)]),
+]
+NOISES = ["white", "pink", "hum"]
+SNRS_DB = [20, 10, 5]
+
+
+# --- Synthetic clips ---
+
+def noise(kind, n, rng):
+    if kind == "white":
+        return rng.standard_normal(n)
+    if kind == "pink":
+        spectrum = np.fft.rfft(rng.standard_normal(n))
+        spectrum /= np.sqrt(np.maximum(np.arange(len(spectrum)), 1))
+        return np.fft.irfft(spectrum, n)
+    t = np.arange(n) / SAMPLE_RATE
+    return np.sin(2 * np.pi * 50 * t) + 0.3 * np.sin(2 * np.pi * 150 * t) + 0.05 * rng.standard_normal(n)
+
+
+def syllable(rng, f0=None, formants=None, duration=None):
+    """
+    One voiced syllable: harmonics of f0 shaped by two formants that glide
+    from their start to their end frequency ((f1_start, f1_end), (f2_start, f2_end)).
+    Anything not given is random.
+    """
+    duration = duration or rng.uniform(0.12, 0.25)
+    t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+    f0 = (f0 or rng.uniform(110, 220)) * (1 + 0.05 * np.sin(2 * np.pi * 3 * t))
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    if formants is None:
+        formants = (rng.uniform(400, 900, 2), rng.uniform(1100, 2500, 2))
+    progress = t / duration
+    # Harmonics weighted towards the formants so energy sits in the speech band.
+    tracks = [start + (end - start) * progress for start, end in formants]
+    voice = np.zeros_like(t)
+    for h in range(1, 20):
+        weight = sum(np.exp(-((h * f0 - track) / 250) ** 2) for track in tracks) + 0.05 / h
+        voice += weight * np.sin(h * phase)
+    envelope = np.sin(np.pi * progress) ** 0.7
+    return voice * envelope / np.max(np.abs(voice))
+
+
+def synthetic_speech(groups, rng):
+    """Speech-like signal: groups of (syllables, pause after in seconds)."""
+    parts = []
+    for syllables, pause in groups:
+        for i in range(syllables):
+            parts.append(syllable(rng))
+            parts.append(np.zeros(int(rng.uniform(0.03, 0.08) * SAMPLE_RATE)))
+        parts[-1] = np.zeros(int(pause * SAMPLE_RATE))
+    return np.concatenate(parts)
+
+
+def synthetic_clips(seed):
+    rng = np.random.default_rng(seed)
+    clips = []
+    for label, groups in UTTERANCES:
+        for kind in NOISES:
+            for snr in SNRS_DB:
+                speech = synthetic_speech(groups, rng) * rng.uniform(0.05, 0.2)
+                voiced = np.flatnonzero(np.abs(speech) > 1e-4)
+                start = int(LEAD_IN * SAMPLE_RATE)
+                total = start + len(speech) + int(TAIL * SAMPLE_RATE)
+                background = noise(kind, total, rng)
+                speech_rms = np.sqrt(np.mean(speech[voiced] ** 2))
+                background *= speech_rms / (10 ** (snr / 20)) / np.sqrt(np.mean(background ** 2))
+                signal = background
+                signal[start:start + len(speech)] += speech
+                clips.append({
+                    "name": f"{label}/{kind}/{snr}dB",
+                    "condition": f"{label}, {kind} noise",
+                    "audio": signal.astype(np.float32),
+                    "start": start + voiced[0],
+                    "end": start + voiced[-1] + 1,
+                })
+    return clips
+
+
+def recorded_clips(directory):
+    clips = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        label_path = os.path.splitext(path)[0] + ".json"
+        if not os.path.exists(label_path):
+            print(f"Skipping {path}: no {os.path.basename(label_path)}")
+            continue
+        with wave.open(path, "rb") as f:
+            rate, channels, width = f.getframerate(), f.getnchannels(), f.getsampwidth()
+            frames = f.readframes(f.getnframes())
+        if rate != SAMPLE_RATE or width != 2:
+            print(f"Skipping {path}: needs {SAMPLE_RATE} Hz 16-bit PCM")
+            continue
+        data = np.frombuffer(frames, dtype=np.int16).reshape(-1, channels).mean(axis=1) / 32767.0
+        with open(label_path, encoding="utf-8") as f:
+            label = json.load(f)
+        clips.append({
+            "name": os.path.basename(path),
+            "condition": "recorded",
+            "audio": data.astype(np.float32),
+            "start": int(label["start"] * SAMPLE_RATE),
+            "end": int(label["end"] * SAMPLE_RATE),
+        })
+    return clips
+
+
+# --- Endpointers under test ---
+
+def run_legacy(audio):
+    """
+    The previous recorder: RMS per block against 2x the calibrated noise,
+    keeps only blocks above it, stops after MAX_SILENCE_DURATION of quiet.
+    Returns (stop sample or None, mask of returned samples, seconds per block).
+    """
+    kept = np.zeros(len(audio), dtype=bool)
+    noise, level, started, silence_start, stop = [], None, False, None, None
+    spent = 0.0
+    blocks = 0
+    for pos in range(0, len(audio) - BLOCK + 1, BLOCK):
+        block = audio[pos:pos + BLOCK]
+        began = time.perf_counter()
+        now = (pos + BLOCK) / SAMPLE_RATE
+        volume = np.sqrt(np.mean(np.square(block)))
+        if level is None:
+            noise.append(volume)
+            if now > CALIBRATION_TIME:
+                level = np.mean(noise) * 2.0
+        elif volume > max(SILENCE_THRESHOLD, level):
+            started, silence_start = True, None
+            kept[pos:pos + BLOCK] = True
+        elif started:
+            if silence_start is None:
+                silence_start = now
+            elif now - silence_start > MAX_SILENCE_DURATION:
+                stop = pos + BLOCK
+        spent += time.perf_counter() - began
+        blocks += 1
+        if stop is not None:
+            break
+    return (stop if started else None), kept, spent / max(blocks, 1)
+
+
+def run_vad(audio):
+    detector = vad.VoiceActivityDetector(
+        sample_rate=SAMPLE_RATE,
+        max_seconds=len(audio) / SAMPLE_RATE,
+        calibration_time=CALIBRATION_TIME,
+        max_hangover=MAX_SILENCE_DURATION,
+        min_rms=SILENCE_THRESHOLD
+    )
+    spent = 0.0
+    blocks = 0
+    for pos in range(0, len(audio) - BLOCK + 1, BLOCK):
+        began = time.perf_counter()
+        detector.process(audio[pos:pos + BLOCK])
+        spent += time.perf_counter() - began
+        blocks += 1
+        if detector.state == vad.DONE:
+            break
+    kept = np.zeros(len(audio), dtype=bool)
+    bounds = detector.utterance_bounds()
+    if bounds:
+        kept[bounds[0]:bounds[1]] = True
+    return (detector.end if bounds else None), kept, spent / max(blocks, 1)
+
+
+ENDPOINTERS = {"legacy": run_legacy, "vad": run_vad}
+
+
+# --- Report ---
+
+def evaluate(clip, endpointer):
+    stop, kept, per_block = endpointer(clip["audio"])
+    start, end = clip["start"], clip["end"]
+    speech = kept[start:end]
+    first_kept = np.flatnonzero(kept)
+    return {
+        "missed": stop is None and not first_kept.size,
+        "early": stop is not None and stop < end,
+        "stop_after": ((stop if stop is not None else len(clip["audio"])) - end) / SAMPLE_RATE,
+        "lost": (len(speech) - np.count_nonzero(speech)) / SAMPLE_RATE,
+        "onset_clip": (max(0, first_kept[0] - start) if first_kept.size else end - start) / SAMPLE_RATE,
+        "per_block": per_block,
+    }
+
+
+def summarize(rows):
+    detected = [r for r in rows if not r["missed"]]
+    stops = sorted(r["stop_after"] for r in detected) or [0.0]
+    return {
+        "clips": len(rows),
+        "stop p50 (s)": stops[len(stops) // 2],
+        "stop max (s)": stops[-1],
+        "speech lost (s)": np.mean([r["lost"] for r in detected]) if detected else 0.0,
+        "onset clip (s)": np.mean([r["onset_clip"] for r in detected]) if detected else 0.0,
+        "early stops": sum(r["early"] for r in rows),
+        "missed": sum(r["missed"] for r in rows),
+        "callback (us)": 1e6 * np.mean([r["per_block"] for r in rows]),
+    }
+
+
+def print_table(results):
+    columns = ["clips", "stop p50 (s)", "stop max (s)", "speech lost (s)", "onset clip (s)",
+               "early stops", "missed", "callback (us)"]
+    header = f"{'condition':<32}{'method':<8}" + "".join(f"{c:>16}" for c in columns)
+    print(header)
+    print("-" * len(header))
+    for (condition, method), summary in results.items():
+        cells = []
+        for column in columns:
+            value = summary[column]
+            cells.append(f"{value:>16.3f}" if isinstance(value, float) else f"{value:>16}")
+        print(f"{condition:<32}{method:<8}" + "".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clips", help="directory of labeled 16 kHz WAV clips to include")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic clips")
+    parser.add_argument("--no-synthetic", action="store_true", help="only run the recorded clips")
+    args = parser.parse_args()
+
+    clips = [] if args.no_synthetic else synthetic_clips(args.seed)
+    if args.clips:
+        clips += recorded_clips(args.clips)
+    if not clips:
+        parser.error("no clips to run")
+
+    rows = {}
+    for clip in clips:
+        for method, endpointer in ENDPOINTERS.items():
+            rows.setdefault((clip["condition"], method), []).append(evaluate(clip, endpointer))
+    for method in ENDPOINTERS:
+        rows[("all", method)] = [r for (_, m), values in list(rows.items()) if m == method for r in values]
+
+    print_table({key: summarize(value) for key, value in rows.items()})
+
+
+if __name__ == "__main__":
+    main()
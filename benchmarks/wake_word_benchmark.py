@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Wake-word spotter benchmark: detection rate, false triggers per hour, CPU
+load and whether the command after the wake word survives the handoff.
+
+By default it runs on a synthetic corpus: a fixed two-syllable "wake word"
+(enrolled from a few renditions) spoken with random tempo, pitch and noise,
+often followed directly by a command, plus long stretches of other
+syllables and silence for the false-trigger rate. A real corpus can be used
+instead with --corpus DIR:
+
+    DIR/templates/*.wav   enrolled wake word recordings (as written by `python wake_word.py enroll`)
+    DIR/positive/*.wav    clips containing the wake word; an optional <name>.json
+                          {"command_start": seconds} marks where the command begins
+    DIR/negative/*.wav    speech and noise without the wake word
+
+All WAVs are 16 kHz 16-bit. Run from the repository root:
+
+    python -m benchmarks.wake_word_benchmark
+    python -m benchmarks.wake_word_benchmark --corpus wake_corpus/
+"""
+
+import argparse
+import glob
+import json
+import os
+import numpy as np
+import wake_word
+from benchmarks.vad_benchmark import noise, syllable, synthetic_speech
+
+SAMPLE_RATE = wake_word.SAMPLE_RATE
+BLOCK = 512
+HANDOFF_SLACK = 0.05   # the wake word may end this far into the command before it counts as clipped
+
+# The synthetic wake word: (f0, ((F1 start, F1 end), (F2 start, F2 end)), duration) per syllable.
+WAKE_RECIPE = [
+    (180, ((750, 650), (1100, 1300)), 0.22),   # "jar"
+    (150, ((350, 300), (1900, 2300)), 0.20),   # "vis"
+]
+NOISE_KINDS = ["white", "pink", "hum"]
+SNRS_DB = [20, 10]
+
+
+# --- Synthetic corpus ---
+
+def render_wake_word(rng, jitter=1.0):
+    parts = []
+    for f0, formants, duration in WAKE_RECIPE:
+        scale = lambda spread: 1 + jitter * rng.uniform(-spread, spread)
+        tracks = tuple((a * scale(0.05), b * scale(0.05)) for a, b in formants)
+        parts.append(syllable(rng, f0=f0 * scale(0.1), formants=tracks, duration=duration * scale(0.15)))
+        parts.append(np.zeros(int(rng.uniform(0.03, 0.06) * SAMPLE_RATE)))
+    return np.concatenate(parts[:-1])
+
+
+def _mix(speech, kind, snr, rng, lead_in=1.0, tail=1.0):
+    start = int(lead_in * SAMPLE_RATE)
+    signal = noise(kind, start + len(speech) + int(tail * SAMPLE_RATE), rng)
+    voiced = np.abs(speech) > 1e-4
+    speech_rms = np.sqrt(np.mean(speech[voiced] ** 2))
+    signal *= speech_rms / (10 ** (snr / 20)) / np.sqrt(np.mean(signal ** 2))
+    signal[start:start + len(speech)] += speech
+    return signal.astype(np.float32), start
+
+
+def synthetic_corpus(seed, positives=60, negative_minutes=10):
+    rng = np.random.default_rng(seed)
+    # Enrollment happens in a quiet room, not a silent one.
+    templates = [_mix(render_wake_word(rng) * 0.1, "white", 25, rng, 0.3, 0.3)[0]
+                 for _ in range(wake_word.TEMPLATE_COUNT)]
+
+    positive = []
+    for i in range(positives):
+        kind, snr = NOISE_KINDS[i % len(NOISE_KINDS)], SNRS_DB[i % len(SNRS_DB)]
+        wake = render_wake_word(rng) * rng.uniform(0.05, 0.2)
+        command_start = None
+        speech = wake
+        if i % 2 == 0:
+            # Half the clips run straight into the command after a short breath.
+            gap = np.zeros(int(rng.uniform(0.05, 0.3) * SAMPLE_RATE))
+            command = synthetic_speech([(rng.integers(3, 7), 0.0)], rng) * rng.uniform(0.05, 0.2)
+            speech = np.concatenate([wake, gap, command])
+            command_start = len(wake) + len(gap)
+        audio, offset = _mix(speech, kind, snr, rng)
+        positive.append({
+            "name": f"positive {i} ({kind}, {snr} dB)",
+            "audio": audio,
+            "command_start": None if command_start is None else offset + command_start,
+        })
+
+    negative = []
+    for minute in range(negative_minutes):
+        kind, snr = NOISE_KINDS[minute % len(NOISE_KINDS)], SNRS_DB[minute % len(SNRS_DB)]
+        pieces, length = [], 0
+        while length < 60 * SAMPLE_RATE:
+            groups = [(int(rng.integers(1, 8)), float(rng.uniform(0.2, 0.8))) for _ in range(rng.integers(1, 4))]
+            piece = synthetic_speech(groups, rng) * rng.uniform(0.05, 0.2)
+            pieces += [piece, np.zeros(int(rng.uniform(0.5, 4.0) * SAMPLE_RATE))]
+            length += len(pieces[-1]) + len(piece)
+        audio, _ = _mix(np.concatenate(pieces), kind, snr, rng)
+        negative.append({"name": f"negative minute {minute} ({kind}, {snr} dB)", "audio": audio})
+
+    return templates, positive, negative
+
+
+# --- Recorded corpus ---
+
+def _wavs(directory):
+    return sorted(glob.glob(os.path.join(directory, "*.wav")))
+
+
+def recorded_corpus(directory):
+    templates = [wake_word._read_wav(path) for path in _wavs(os.path.join(directory, "templates"))]
+    positive = []
+    for path in _wavs(os.path.join(directory, "positive")):
+        label_path = os.path.splitext(path)[0] + ".json"
+        command_start = None
+        if os.path.exists(label_path):
+            with open(label_path, encoding="utf-8") as f:
+                command_start = int(json.load(f)["command_start"] * SAMPLE_RATE)
+        positive.append({"name": os.path.basename(path), "audio": wake_word._read_wav(path),
+                         "command_start": command_start})
+    negative = [{"name": os.path.basename(path), "audio": wake_word._read_wav(path)}
+                for path in _wavs(os.path.join(directory, "negative"))]
+    return templates, positive, negative
+
+
+# --- Run ---
+
+def stream(spotter, audio):
+    """Feeds audio block by block; returns every wake-word end position reported."""
+    triggers = []
+    for pos in range(0, len(audio) - BLOCK + 1, BLOCK):
+        wake_end = spotter.process(audio[pos:pos + BLOCK])
+        if wake_end is not None:
+            triggers.append(wake_end)
+    return triggers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="directory with templates/, positive/ and negative/ WAVs")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic corpus")
+    parser.add_argument("--negative-minutes", type=int, default=10, help="synthetic non-wake-word audio")
+    args = parser.parse_args()
+
+    if args.corpus:
+        recordings, positive, negative = recorded_corpus(args.corpus)
+    else:
+        recordings, positive, negative = synthetic_corpus(args.seed, negative_minutes=args.negative_minutes)
+    if len(recordings) < wake_word.MIN_TEMPLATES:
+        parser.error(f"need at least {wake_word.MIN_TEMPLATES} templates")
+
+    templates = wake_word.template_features(recordings)
+    threshold = wake_word.calibrate_threshold(templates)
+    print(f"{len(templates)} templates, threshold {threshold:.2f}")
+
+    detected = clipped = with_command = 0
+    positive_busy = positive_seconds = 0.0
+    for clip in positive:
+        spotter = wake_word.WakeWordSpotter(templates, threshold)
+        triggers = stream(spotter, clip["audio"])
+        positive_busy += spotter.busy_seconds
+        positive_seconds += len(clip["audio"]) / SAMPLE_RATE
+        if not triggers:
+            continue
+        detected += 1
+        wake_end = triggers[0]
+        if clip["command_start"] is not None:
+            with_command += 1
+            if wake_end > clip["command_start"] + HANDOFF_SLACK * SAMPLE_RATE:
+                clipped += 1
+
+    false_triggers = 0
+    negative_seconds = sum(len(clip["audio"]) for clip in negative) / SAMPLE_RATE
+    spotter = wake_word.WakeWordSpotter(templates, threshold)
+    for clip in negative:
+        false_triggers += len(stream(spotter, clip["audio"]))
+
+    idle = wake_word.WakeWordSpotter(templates, threshold)
+    stream(idle, noise("white", 60 * SAMPLE_RATE, np.random.default_rng(args.seed)).astype(np.float32) * 0.002)
+
+    print(f"Detection rate:        {detected}/{len(positive)} ({100 * detected / max(len(positive), 1):.1f}%)")
+    print(f"Command clipped:       {clipped}/{with_command} handoffs")
+    print(f"False triggers:        {false_triggers} in {negative_seconds / 60:.1f} min "
+          f"({false_triggers * 3600 / max(negative_seconds, 1):.1f}/hour)")
+    print(f"DTW checks (negative): {spotter.checks} ({spotter.checks * 60 / max(negative_seconds, 1):.1f}/min)")
+    print(f"CPU, quiet room:       {100 * idle.cpu_load():.2f}% of one core")
+    print(f"CPU, background speech:{100 * spotter.cpu_load():6.2f}% of one core")
+    print(f"CPU, wake word clips:  {100 * positive_busy / max(positive_seconds, 1e-9):.2f}% of one core")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+# capture_service.py
+# One microphone stream for the whole session: a rolling noise floor, a short
+# history for pre-roll, and per-turn captures that start instantly.
+
+import queue
+import threading
+import time
+import numpy as np
+import sounddevice as sd
+import vad
+
+EVENT_POLL_INTERVAL = 0.1   # how often a waiting capture checks stop_event and its deadline
+HISTORY_SECONDS = 3.0       # recent audio kept while no turn is active (pre-roll for the next one)
+WAKE_COMMAND_TIMEOUT = 5.0  # after the wake word (or a barge-in), give up if no command starts within this time
+
+
+class _Capture:
+    """
+    One turn's detectors. process() runs on the audio thread and only
+    queues events; CaptureService.capture() consumes them.
+
+    A gate (wake_word.WakeWordSpotter or barge_in.BargeInDetector) gets
+    the stream first; recording starts from the position it returns.
+    """
+
+    def __init__(self, service, gate=None):
+        self.detector = vad.VoiceActivityDetector(
+            sample_rate=service.sample_rate,
+            max_seconds=service.max_recording_time,
+            calibration_time=0,
+            max_hangover=service.max_silence,
+            min_rms=service.min_rms,
+            noise_floor=service.noise_floor
+        )
+        self.gate = gate
+        self.awake = gate is None
+        self.seeded = gate is not None  # gated turns start where the gate says, not from the history
+        self.events = queue.SimpleQueue()
+
+    def process(self, block, history):
+        """Returns True once the utterance is complete."""
+        if not self.seeded:
+            # Speech that began just before the turn started still gets its onset.
+            self.seeded = True
+            end = history.total - len(block)
+            seed = history.read(end - int(vad.PRE_ROLL * self.detector.sample_rate), end)
+            if len(seed):
+                self._detect(seed)
+        if not self.awake:
+            opened_at = self.gate.process(block)
+            if opened_at is None:
+                return False
+            self.awake = True
+            self.detector.noise_floor = self.gate.noise_floor
+            self.events.put(("wake", opened_at))
+            block = self.gate.ring.read(opened_at)
+        return self._detect(block)
+
+    def _detect(self, samples):
+        for event in self.detector.process(samples):
+            self.events.put(event)
+        if self.detector.state == vad.SPEAKING:
+            self.events.put(("block", self.detector.ring.total))
+        return self.detector.state == vad.DONE
+
+
+class CaptureService:
+    """
+    Keeps one sd.InputStream open for the session. Every block updates a
+    rolling noise floor from its non-speech frames (after a single
+    calibration when the stream opens), so a turn needs no "stay quiet"
+    pause: capture() hands the stream to a fresh VAD at once, seeded with
+    the last vad.PRE_ROLL of audio. Speech blocks, pauses and the end of
+    the utterance reach the consuming thread through a queue.
+    """
+
+    def __init__(self, sample_rate=16000, block_size=512, calibration_time=0.5, max_recording_time=30.0,
+                 max_silence=1.0, min_rms=vad.MIN_RMS):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.calibration_samples = int(calibration_time * sample_rate)
+        self.max_recording_time = max_recording_time
+        self.max_silence = max_silence
+        self.min_rms = min_rms
+
+        self.history = vad.RingBuffer(int(HISTORY_SECONDS * sample_rate))
+        self.noise_floor = None
+        self.calibrated = threading.Event()
+        self._calibration_energy = []
+        self._active = None
+        self._stream = None
+        self._lock = threading.Lock()
+        self.overflows = 0
+
+    # --- Stream ---
+
+    def start(self):
+        """Opens the input stream if it isn't running (also after a device error). Returns self."""
+        with self._lock:
+            if self._stream is not None and self._stream.active:
+                return self
+            if self._stream is not None:
+                self._stream.close()
+            self._stream = sd.InputStream(
+                samplerate=self.sample_rate,
+                channels=1,
+                callback=self._callback,
+                dtype='float32',
+                blocksize=self.block_size
+            )
+            self._stream.start()
+            print("🎙️ Microphone stream open")
+        return self
+
+    def close(self):
+        with self._lock:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+
+    def _callback(self, indata, frames, time_info, status):
+        if status.input_overflow:
+            self.overflows += 1
+        block = indata.reshape(-1)
+        self.history.write(block)
+        self._update_noise_floor(block)
+
+        capture = self._active
+        if capture is None:
+            return
+        try:
+            if capture.process(block, self.history):
+                self._active = None
+        except Exception as e:
+            self._active = None
+            capture.events.put(("error", e))
+
+    def _update_noise_floor(self, block):
+        energy, flatness = vad.frame_features(block, self.sample_rate)
+        if not len(energy):
+            return
+        if self.noise_floor is None:
+            self._calibration_energy.append(energy)
+            if self.history.total >= self.calibration_samples:
+                self.noise_floor = float(np.median(np.concatenate(self._calibration_energy)))
+                self.calibrated.set()
+            return
+        threshold = max(self.min_rms, self.noise_floor * vad.ENERGY_RATIO)
+        quiet = ~((energy > threshold) & (flatness < vad.MAX_FLATNESS))
+        if quiet.any():
+            self.noise_floor += vad.NOISE_ADAPT * (float(energy[quiet].mean()) - self.noise_floor)
+
+    # --- Turns ---
+
+    def capture(self, transcriber=None, wake_word=None, stop_event=None, on_wake=None, barge_in=None):
+        """
+        Captures one utterance from the running stream and returns it as a
+        1-D float32 array, or None if nothing was said (or stop_event was set).
+
+        If a streaming_asr.StreamingTranscriber is given, the speech audio and
+        every pause are forwarded to it so decoding overlaps with speech.
+        With a wake_word.WakeWordSpotter, the stream goes to the spotter until
+        it hears the wake word (no time limit) and recording starts with the
+        audio right after it; on_wake is called when that happens.
+        A barge_in.BargeInDetector works the same way while a reply is
+        playing: recording starts with the user's speech over it (on_wake
+        is called then, too).
+        """
+        self.start()
+        if not self.calibrated.is_set():
+            print("🎤 Quick calibration (0.5s)... Stay quiet!")
+            self.calibrated.wait()
+            print(f"📊 Noise level: {self.noise_floor:.6f}")
+
+        gate = wake_word if wake_word is not None else barge_in
+        capture = _Capture(self, gate)
+        detector = capture.detector
+        fed = None  # detector position up to which the transcriber has been fed
+
+        def feed_until(position):
+            nonlocal fed
+            if transcriber is not None and fed is not None and position > fed:
+                transcriber.feed(detector.ring.read(fed, position))
+                fed = position
+
+        if wake_word is not None:
+            print("👂 Waiting for the wake word...")
+            deadline = None
+        elif barge_in is not None:
+            print("👂 Listening for barge-in while speaking...")
+            deadline = None
+        else:
+            print("🎤 Speak now...")
+            deadline = time.time() + self.max_recording_time
+        self._active = capture
+
+        try:
+            finished = False
+            while not finished:
+                if stop_event is not None and stop_event.is_set():
+                    print("⏹️  Listening cancelled.")
+                    return None
+                if deadline is not None and time.time() >= deadline:
+                    if detector.speech_started():
+                        print("⏹️  Maximum recording time reached.")
+                    else:
+                        print("⏹️  No command heard.")
+                    break
+                try:
+                    event, position = capture.events.get(timeout=EVENT_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                if event == "error":
+                    raise position
+                if event == "wake":
+                    if wake_word is not None:
+                        print(f"👂 Wake word heard (CPU {100 * wake_word.cpu_load():.1f}% while waiting)")
+                        print("🎤 Speak now...")
+                    else:
+                        print(f"✋ Barge-in: reply stopped (CPU {100 * barge_in.cpu_load():.1f}% while watching)")
+                    deadline = time.time() + WAKE_COMMAND_TIMEOUT
+                    if on_wake is not None:
+                        on_wake()
+                elif event == "start":
+                    print("🔴 Recording...")
+                    if gate is not None:
+                        deadline = time.time() + self.max_recording_time
+                    fed = detector.utterance_bounds()[0]
+                    feed_until(detector.ring.total)
+                elif event == "block":
+                    feed_until(position)
+                elif event == "pause":
+                    print("⏸️  Silence...")
+                    feed_until(position)
+                    if transcriber is not None:
+                        transcriber.mark_pause()
+                elif event == "end":
+                    print(f"⏹️  Stopping ({detector.hangover():.2f}s of silence)...")
+                    finished = True
+        finally:
+            if self._active is capture:
+                self._active = None
+
+        audio = detector.utterance()
+        if audio is None or len(audio) == 0:
+            return None
+        # Whatever the transcriber hasn't seen yet (the padded tail) goes in last.
+        feed_until(detector.utterance_bounds()[1])
+        return audio
@@ -1,8 +1,18 @@
 # command_and_response_giver.py
 
-from groq import Groq
+import concurrent.futures
+import itertools
+import json
 import os
+import re
+import time
+import intent_matcher
+import prompts
 from dotenv import load_dotenv
+from llm_cache import LLMCache, prompt_version
+from llm_client import LLMClient
+from program_opener import registry
+from request_policy import RequestPolicy
 
 load_dotenv() 
 
@@ -11,232 +21,326 @@ api_key = os.getenv("GROQ_API_KEY")
 if not api_key:
     print("CRITICAL ERROR: GROQ_API_KEY not found in .env file.")
     
-client = Groq(api_key=api_key)
+# One pooled client for the whole session (set GROQ_BASE_URL to use a local stand-in).
+llm = LLMClient(api_key=api_key)
+
+MODEL = "llama-3.1-8b-instant"
+GET_COMMAND_TIMEOUT = 8.0
+RESPONSER_TIMEOUT = 15.0
+
+# --- Parse-and-Reply Mode ---
+# get_command also writes the final Tanglish reply for actions whose result
+# doesn't change what we say, so process_command can skip the responser call.
+COMBINED_REPLY_MODE = True
+
+# System prompts are versioned templates in prompts.py, rendered once per process.
+def get_command_system_prompt():
+    return prompts.system_prompt("get_command", combined_reply=COMBINED_REPLY_MODE)
+
+
+def responser_system_prompt():
+    return prompts.system_prompt("responser")
+
+# --- Result Cache ---
+# get_command runs at temperature 0.0, so its output for a given utterance is stable.
+# responser keeps a few variants per input and rotates through them.
+CACHE_ENABLED = True
+GET_COMMAND_TTL = 30 * 24 * 3600
+RESPONSER_TTL = 7 * 24 * 3600
+RESPONSER_VARIANTS = 3
+
+GET_COMMAND_VERSION = prompt_version(get_command_system_prompt(), MODEL, 0.0)
+RESPONSER_VERSION = prompt_version(responser_system_prompt(), MODEL, 0.8)
+
+cache = LLMCache(ttls={"get_command": GET_COMMAND_TTL, "responser": RESPONSER_TTL}) if CACHE_ENABLED else None
+
+# --- Latency Policies ---
+# Each call type tracks its own rolling latency: once a call runs past its p95
+# a duplicate is sent and the first answer wins. Repeated failures open a
+# circuit breaker, and while it is open we answer locally instead of waiting.
+get_command_policy = RequestPolicy("get_command")
+responser_policy = RequestPolicy("responser")
+
+# Below this local-match confidence the offline parser treats the utterance as conversation.
+FALLBACK_CONFIDENCE = 0.7
+
+FALLBACK_OFFLINE_REPLY = "Sorry sir, ippo ennoda online connection slow-a irukku. Konjam neram kalichu try pannunga."
+
+# Templated replies used while the responser is unavailable: each known English
+# confirmation is swapped for its Tanglish form and any task result is kept.
+FALLBACK_TEMPLATES = [
+    (re.escape(english), intent_matcher.TANGLISH_RESPONSES[command])
+    for command, english in intent_matcher.RESPONSES.items()
+    if command in intent_matcher.TANGLISH_RESPONSES
+] + [
+    (re.escape(intent_matcher.RESPONSES["get_time"]), "Sir, ippo time"),
+    (r"And writing your text\.", intent_matcher.TANGLISH_RESPONSES["write_in_notepad"]),
+    (r"Fetching the latest news on (.+?)\.", r"Sir, \1 pathi latest news:"),
+    (r"Searching Google for (.+?)\.", r"Sari sir, \1 Google-la search panren."),
+    (r"Closing (.+?)\.\.\.", r"\1 close panren, sir."),
+]
+
+
+def warm_up():
+    """Opens the pooled connection to the LLM API in the background."""
+    return llm.warm()
+
+
+def cache_stats():
+    """Hit/miss counters of the LLM result cache (empty if caching is disabled)."""
+    return cache.stats() if cache else {}
+
+
+def policy_stats():
+    """Breaker state, latency percentiles and fallback counts per call type."""
+    return {
+        "get_command": get_command_policy.stats(),
+        "responser": responser_policy.stats(),
+        "hedged_requests": llm.hedges,
+    }
+
+
+def _call_with_policy(policy, call, timeout):
+    """
+    Runs call(hedge_after) under the policy. Returns (result, True), or
+    (None, False) if the breaker is open or the call failed, in which case
+    the caller answers locally. Cancellation by a newer turn is re-raised.
+    """
+    if not policy.allow():
+        print(f"LLM circuit open ({policy.name}); answering locally.")
+        policy.fallbacks += 1
+        return None, False
+
+    started = time.time()
+    try:
+        result = call(policy.hedge_delay(timeout))
+    except concurrent.futures.CancelledError:
+        policy.abandoned()
+        raise
+    except Exception as e:
+        policy.failed()
+        policy.fallbacks += 1
+        print(f"LLM call failed ({policy.name}): {e}. Answering locally.")
+        return None, False
+    policy.succeeded(time.time() - started)
+    return result, True
+
+
+def local_command(unstr_english_command):
+    """
+    Deterministic stand-in for get_command while the LLM is unavailable:
+    the local intent matcher at a relaxed threshold, otherwise no_action.
+    """
+    tasks, confidence = intent_matcher.match_intent(unstr_english_command, registry.available_commands())
+    risky = any(t["command"] in intent_matcher.STRICT_COMMANDS for t in tasks)
+    threshold = intent_matcher.CONFIDENCE_THRESHOLD if risky else FALLBACK_CONFIDENCE
+    if not tasks or confidence < threshold:
+        tasks = [{"command": "no_action", "args": [], "response": unstr_english_command, "tanglish_response": ""}]
+    return json.dumps(tasks if len(tasks) > 1 else tasks[0])
+
+
+def fallback_reply(text):
+    """Templated Tanglish reply for responser input while the LLM is unavailable."""
+    reply, replaced = text, 0
+    for pattern, template in FALLBACK_TEMPLATES:
+        reply, n = re.subn(pattern, template, reply)
+        replaced += n
+    return reply.strip() if replaced else FALLBACK_OFFLINE_REPLY
+
 
 def get_command(unstr_english_command):
-    system_prompt = """
-You are a command parser for a voice assistant.
-Your job is to analyze messy natural language commands and produce a strict JSON output.
-The JSON must contain:
-1. "command": a structured function name or process name.
-2. "args": a list of strings representing arguments for the command. It must be an empty list [] if there are no arguments.
-3. "response": a short, natural, encouraging confirmation message to the user. E.g., "Got it!", "On it!", "Opening that for you."
-
-You have 2 main tasks:
-Task 1: Identify the user intent for laptop assistance and extract the corresponding command and any necessary arguments FROM THE SUPPORTED LIST.
-Task 2: If no clear command is given, or if the request is conversational (e.g., "tell me a story", "what is..."), treat it as conversation.
-
-Rules:
-- Your output must be *only* valid JSON.
-- **For multi-step commands, return a JSON array of command objects to be executed in sequence.**
-- If no valid intent or command is found, or if the user is making small talk, telling you something, or asking a general question (like "tell me a story", "what's the capital of France", "how are you"), you MUST return a single object:
-  {
-    "command": "no_action",
-    "args": [],
-    "response": "[USER'S ORIGINAL CONVERSATIONAL TEXT]"
-  }
-- **CRITICAL:** Only use the commands from the "Supported commands" list. Do NOT invent new commands. Any other request is "no_action".
-
-Supported commands:
-
-Applications (Open):
-- open_google_chrome
-- open_calculator
-- open_notepad
-- open_file_explorer
-- open_cmd
-- open_task_manager
-- open_windows_media_player
-- open_control_panel
-- open_settings
-- write_in_notepad (takes the text to write as an argument)
-
-Applications (Close → use process name):
-- Google Chrome → chrome.exe
-- Calculator → calculator.exe
-- Notepad → notepad.exe
-... (and so on for other apps)
-
-System:
-- enable_wifi, disable_wifi
-- enable_bluetooth, disable_bluetooth
-- increase_volume, decrease_volume, mute_volume, unmute_volume
-- increase_brightness, decrease_brightness
-
-Power:
-- shutdown_system, restart_system, lock_screen, sign_out
-
-Web Search:
-- google_search (takes the search query as an argument)
-
-Others:
-- get_time
-- get_news (takes the news topic as an argument)
-
-Examples:
-
-User: "open google chrome"
-Output:
-{
-    "command": "open_google_chrome",
-    "args": [],
-    "response": "Opening Google Chrome for you, sir."
-}
-
-User: "close notepad right now"
-Output:
-{
-    "command": "notepad.exe",
-    "args": [],
-    "response": "Closing Notepad..."
-}
-
-User: "hey jarvis what time is it"
-Output:
-{
-    "command": "get_time",
-    "args": [],
-    "response": "Right away. Getting the time."
-}
-
-User: "tell me a small story"
-Output:
-{
-    "command": "no_action",
-    "args": [],
-    "response": "tell me a small story"
-}
-
-User: "what's the latest news on artificial intelligence"
-Output:
-{
-  "command": "get_news",
-  "args": ["artificial intelligence"],
-  "response": "Fetching the latest news on artificial intelligence."
-}
-
-MULTI-STEP EXAMPLE
-User: "open notepad and write my name is jarvis"
-Output:
-[
-  {
-    "command": "open_notepad",
-    "args": [],
-    "response": "Opening Notepad..."
-  },
-  {
-    "command": "write_in_notepad",
-    "args": ["my name is jarvis"],
-    "response": "And writing your text."
-  }
-]
-"""
-    completion = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
+    if cache:
+        key = cache.make_key(unstr_english_command, GET_COMMAND_VERSION)
+        cached = cache.get("get_command", key)
+        if cached is not None:
+            print("LLM cache hit (get_command).")
+            return cached
+
+    completion, ok = _call_with_policy(get_command_policy, lambda hedge_after: llm.chat(
+        timeout=GET_COMMAND_TIMEOUT,
+        hedge_after=hedge_after,
+        model=MODEL,
         messages=[
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": get_command_system_prompt()},
             {"role": "user", "content": unstr_english_command}
         ],
         temperature=0.0,
         max_tokens=1024,
         top_p=1,
         response_format={"type": "json_object"}
-    )
+    ), GET_COMMAND_TIMEOUT)
+    if not ok:
+        return local_command(unstr_english_command)
+
+    usage = getattr(completion, "usage", None)
+    if usage is not None:
+        print(f"get_command prompt tokens: {usage.prompt_tokens}")
     
     str_english_command = completion.choices[0].message.content
+
+    if cache and str_english_command:
+        cache.put("get_command", key, str_english_command)
     return str_english_command
 
 # --- FIXED 'responser' FUNCTION ---
 
 def responser(text):
-    system_prompt = """
-You are Jarvis, the AI assistant from Iron Man movies. You speak in **Tanglish** - a natural mix of Tamil and English.
-
-**CRITICAL TANGLISH RULES:**
-1. **Mix English and Tamil words naturally** - like how people in Chennai actually speak
-2. **Use English for:** technical terms, modern concepts, actions (open, close, time, story, news, etc.)
-3. **Use Tamil for:** common verbs, connectors, casual words (panniten, irukku, vandhu, sollu, etc.)
-4. **NEVER add English translations in brackets** - NO "(Translation: ...)" EVER
-5. **Keep English words as English** - don't force Tamil pronunciation in text
-6. **Write everything in English letters only** - no Tamil script
-
-**Good Tanglish Examples:**
-✅ "Okay sir, Chrome open panniten"
-✅ "Sir, time ippo 9:30 PM irukku"
-✅ "Weather today romba nalla irukku, 25 degrees"
-✅ "Sari sir, volume increase panniten"
-✅ "News fetch panna try panren sir"
-
-**Bad Examples (AVOID):**
-❌ "Oru naal, oru chinna kaaka... (Translation: One day, a small crow...)"
-❌ Pure Tamil with no English
-❌ Pure English with no Tamil
-❌ Forcing Tamil on English words
-
-**Your Identity:**
-- Created by: Arun Kumar M
-- He studies: MS Data Science at VIT
-- He is: National chess silver medalist (2019), chess coach (vibewithchess.com)
-- Project: Mini Project for VIT
-
-**How to Handle Different Inputs:**
-
-1. **System Commands** (opening apps, volume, etc.)
-   Input: "Opening Notepad..."
-   Output: "Notepad open panniten, sir"
-
-2. **Time/Data Queries**
-   Input: "Right away. Getting the time. 09:30 PM"
-   Output: "Sir, ippo time 9:30 PM"
-
-3. **Stories** (MOST IMPORTANT FIX)
-   Input: "tell me a small story"
-   Output: "Sari sir. Once upon a time, oru small boy irundhan. Avan everyday park-ku poopan. One day, avan oru puppy-a paathaan, romba cute-a irundhuchu. Avan antha puppy-a adopt pannitan. Moral: small things kooda periya happiness tharum, sir."
-
-4. **Jokes**
-   Input: "tell me a joke"
-   Output: "Okay sir. Why did the computer go to the doctor? Because adha virus irundhuchu! Get it? Virus-nu both meanings-la work aagum, sir."
-
-5. **How are you**
-   Input: "how are you"
-   Output: "Naan nalla irukken sir, thanks for asking. Ungalukku eppadi help pannanum?"
-
-6. **Who created you**
-   Input: "who created you" or "I was created by..."
-   Output: "Enna create pannadhu Arun Kumar M, sir. Avar VIT-la MS Data Science padikuraru. National chess silver medalist kooda avar, 2019-la."
-
-7. **Failed Commands**
-   Input: "Sorry, I don't know..."
-   Output: "Sir, sorry, antha command enakku purila. Vera command try pannunga please."
-
-**STORY TEMPLATE (Use this for stories):**
-Keep stories SHORT (3-4 sentences max), use English words for nouns/actions, Tamil for connectors.
-Example: "Once oru day, hero office-ku late-a ponaan. Traffic romba heavy irundhuchu. But avan smart-a oru shortcut use pannan, on-time reach aayitan. Lesson: always Plan B ready-a irukanum, sir."
-
-**Remember:**
-- NO translations in brackets
-- Keep it conversational and natural
-- Mix languages like actual Chennai people talk
-- Max 2-3 sentences for most responses
-- Stories: max 4-5 sentences
-"""
-    
-    completion = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
+    if cache:
+        key = cache.make_key(text, RESPONSER_VERSION)
+        cached = cache.get("responser", key, variants=RESPONSER_VARIANTS)
+        if cached is not None:
+            print("LLM cache hit (responser).")
+            return cached
+
+    completion, ok = _call_with_policy(responser_policy, lambda hedge_after: llm.chat(
+        timeout=RESPONSER_TIMEOUT,
+        hedge_after=hedge_after,
+        model=MODEL,
         messages=[
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": responser_system_prompt()},
             {"role": "user", "content": text}
         ],
         temperature=0.8,  # Higher for creativity, but controlled by examples
         max_tokens=200,   # Reduced to prevent long rambling
         top_p=0.9
-    )
-    
-    final_response = completion.choices[0].message.content
+    ), RESPONSER_TIMEOUT)
+    if not ok:
+        return fallback_reply(text)
     
-    # Safety check: Remove any translations that slip through
-    if "(Translation:" in final_response or "(translation:" in final_response:
+    final_response = strip_translation(completion.choices[0].message.content)
+
+    if cache and final_response:
+        cache.put("responser", key, final_response, variants=RESPONSER_VARIANTS)
+    return final_response
+
+
+def strip_translation(text):
+    """Safety check: Remove any translations that slip through."""
+    if "(Translation:" in text or "(translation:" in text:
         # Split at translation and take only the first part
-        final_response = final_response.split("(Translation:")[0].split("(translation:")[0].strip()
-    
-    return final_response
\ No newline at end of file
+        text = text.split("(Translation:")[0].split("(translation:")[0].strip()
+    return text
+
+
+class SentenceSplitter:
+    """
+    Turns a token stream into speakable segments.
+
+    A segment ends at sentence punctuation, or at a comma/semicolon once it is
+    long enough to be worth speaking on its own. Anything from a
+    "(Translation:" marker onwards is dropped, and text after an open bracket
+    is held back until it is clear it isn't one.
+    """
+
+    SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s")
+    CLAUSE_END = re.compile(r"[,;:]\s")
+    MIN_CLAUSE_CHARS = 60
+    MARKER = "(translation:"
+
+    def __init__(self):
+        self._buffer = ""
+        self._stopped = False
+
+    def feed(self, token):
+        """Adds a token; returns the list of segments that are now complete."""
+        if self._stopped or not token:
+            return []
+        self._buffer += token
+
+        marker_at = self._buffer.lower().find(self.MARKER)
+        if marker_at != -1:
+            self._buffer = self._buffer[:marker_at]
+            self._stopped = True
+            return self.flush()
+
+        segments = []
+        while True:
+            # Hold back a trailing "(" that could still become the marker.
+            open_at = self._buffer.rfind("(")
+            scan = self._buffer
+            if open_at != -1 and len(self._buffer) - open_at < len(self.MARKER):
+                scan = self._buffer[:open_at]
+
+            m = self.SENTENCE_END.search(scan)
+            if m is None and len(scan) >= self.MIN_CLAUSE_CHARS:
+                m = self.CLAUSE_END.search(scan, self.MIN_CLAUSE_CHARS // 2)
+            if m is None:
+                return segments
+
+            segment = self._buffer[:m.end()].strip()
+            self._buffer = self._buffer[m.end():]
+            if segment:
+                segments.append(segment)
+
+    def flush(self):
+        """Returns whatever is left once the stream ends."""
+        segment = self._buffer.strip()
+        self._buffer = ""
+        return [segment] if segment else []
+
+
+def split_sentences(text):
+    splitter = SentenceSplitter()
+    return splitter.feed(text + " ") + splitter.flush()
+
+
+def responser_stream(text):
+    """
+    Streaming variant of responser(): yields the reply sentence by sentence
+    (or clause by clause) while later tokens are still being generated.
+    """
+    if cache:
+        key = cache.make_key(text, RESPONSER_VERSION)
+        cached = cache.get("responser", key, variants=RESPONSER_VARIANTS)
+        if cached is not None:
+            print("LLM cache hit (responser).")
+            yield from split_sentences(cached)
+            return
+
+    def open_stream(hedge_after):
+        # The policy times (and hedges) the wait for the first token.
+        stream = llm.chat_stream(
+            timeout=RESPONSER_TIMEOUT,
+            hedge_after=hedge_after,
+            model=MODEL,
+            messages=[
+                {"role": "system", "content": responser_system_prompt()},
+                {"role": "user", "content": text}
+            ],
+            temperature=0.8,
+            max_tokens=200,
+            top_p=0.9
+        )
+        return stream, next(stream, None)
+
+    opened, ok = _call_with_policy(responser_policy, open_stream, RESPONSER_TIMEOUT)
+    if not ok:
+        yield from split_sentences(fallback_reply(text))
+        return
+    stream, first = opened
+
+    splitter = SentenceSplitter()
+    spoken = []
+    try:
+        for chunk in itertools.chain([first], stream) if first is not None else []:
+            token = chunk.choices[0].delta.content if chunk.choices else None
+            for segment in splitter.feed(token):
+                spoken.append(segment)
+                yield segment
+    except concurrent.futures.CancelledError:
+        raise
+    except Exception as e:
+        # The stream broke off: keep what was said, or fall back if nothing was.
+        responser_policy.failed()
+        print(f"LLM stream failed (responser): {e}")
+        if not spoken:
+            responser_policy.fallbacks += 1
+            yield from split_sentences(fallback_reply(text))
+        return
+    for segment in splitter.flush():
+        spoken.append(segment)
+        yield segment
+
+    final_response = " ".join(spoken)
+    if cache and final_response:
+        cache.put("responser", key, final_response, variants=RESPONSER_VARIANTS)
@@ -0,0 +1,327 @@
+# intent_matcher.py
+# Local fast path that recognises the common fixed commands without calling the LLM.
+
+import re
+from difflib import SequenceMatcher
+
+# Below this confidence the utterance is handed to the LLM (get_command).
+CONFIDENCE_THRESHOLD = 0.85
+
+# --- Apps that can be opened (command -> spoken names) ---
+OPEN_TARGETS = {
+    "open_google_chrome": ["google chrome", "chrome", "browser", "the browser"],
+    "open_calculator": ["calculator", "calc"],
+    "open_notepad": ["notepad", "note pad", "text editor", "editor"],
+    "open_file_explorer": ["file explorer", "explorer", "files", "my files", "file manager"],
+    "open_cmd": ["cmd", "command prompt", "terminal"],
+    "open_task_manager": ["task manager"],
+    "open_windows_media_player": ["windows media player", "media player", "music player"],
+    "open_control_panel": ["control panel"],
+    "open_settings": ["settings", "system settings"],
+}
+
+# --- Apps that can be closed (process name -> spoken names) ---
+CLOSE_TARGETS = {
+    "chrome.exe": ["google chrome", "chrome", "browser", "the browser"],
+    "calculator.exe": ["calculator", "calc"],
+    "notepad.exe": ["notepad", "note pad", "text editor", "editor"],
+    "cmd.exe": ["cmd", "command prompt", "terminal"],
+    "taskmgr.exe": ["task manager"],
+    "wmplayer.exe": ["windows media player", "media player", "music player"],
+}
+
+# --- Fixed phrases (command -> example utterances) ---
+PHRASES = {
+    "get_time": ["what time is it", "what is the time", "whats the time", "tell me the time",
+                 "current time", "time now", "what time is it now", "time"],
+    "enable_wifi": ["turn on wifi", "enable wifi", "wifi on", "switch on wifi"],
+    "disable_wifi": ["turn off wifi", "disable wifi", "wifi off", "switch off wifi"],
+    "enable_bluetooth": ["turn on bluetooth", "enable bluetooth", "bluetooth on"],
+    "disable_bluetooth": ["turn off bluetooth", "disable bluetooth", "bluetooth off"],
+    "increase_volume": ["increase volume", "increase the volume", "volume up", "turn up the volume", "louder"],
+    "decrease_volume": ["decrease volume", "decrease the volume", "volume down", "turn down the volume", "lower the volume"],
+    "mute_volume": ["mute", "mute volume", "mute the volume", "mute sound"],
+    "unmute_volume": ["unmute", "unmute volume", "unmute the volume", "unmute sound"],
+    "increase_brightness": ["increase brightness", "increase the brightness", "brightness up"],
+    "decrease_brightness": ["decrease brightness", "decrease the brightness", "brightness down", "dim the screen"],
+    "shutdown_system": ["shutdown", "shut down", "shutdown the system", "shut down the computer", "shutdown my laptop"],
+    "restart_system": ["restart", "restart the system", "restart the computer", "reboot"],
+    "lock_screen": ["lock screen", "lock the screen", "lock my laptop", "lock the computer"],
+    "sign_out": ["sign out", "log out", "logout"],
+}
+
+# Destructive commands need a near-exact phrase before we skip the LLM.
+STRICT_COMMANDS = {"shutdown_system", "restart_system", "sign_out"}
+STRICT_CONFIDENCE = 0.95
+
+# Phrases are compared word by word: every content word of the alias must be
+# said (a single word may be misheard, down to TOKEN_SIMILARITY) and nothing
+# else may be, apart from FILLER_WORDS.
+TOKEN_SIMILARITY = 0.8
+FILLER_WORDS = {"the", "a", "an", "my", "me", "this", "that", "it", "is", "its", "to", "for", "of", "please"}
+# A clause with one of these is never guessed at ("don't turn on wifi").
+NEGATIONS = {"dont", "not", "never", "no", "cant", "cannot", "wont", "without"}
+# A word is never a mishearing of its opposite ("unlock" is not "lock").
+ANTONYM_PREFIXES = ("un", "dis", "de", "in", "non")
+ANTONYMS = [{"on", "off"}, {"up", "down"}, {"enable", "disable"}, {"increase", "decrease"},
+            {"lock", "unlock"}, {"mute", "unmute"}, {"open", "close"}, {"start", "stop"}]
+
+RESPONSES = {
+    "open_google_chrome": "Opening Google Chrome for you, sir.",
+    "open_calculator": "Opening Calculator...",
+    "open_notepad": "Opening Notepad...",
+    "open_file_explorer": "Opening File Explorer...",
+    "open_cmd": "Opening the command prompt...",
+    "open_task_manager": "Opening Task Manager...",
+    "open_windows_media_player": "Opening the media player...",
+    "open_control_panel": "Opening Control Panel...",
+    "open_settings": "Opening Settings...",
+    "get_time": "Right away. Getting the time.",
+    "enable_wifi": "Turning on WiFi.",
+    "disable_wifi": "Turning off WiFi.",
+    "enable_bluetooth": "Turning on Bluetooth.",
+    "disable_bluetooth": "Turning off Bluetooth.",
+    "increase_volume": "Increasing the volume.",
+    "decrease_volume": "Decreasing the volume.",
+    "mute_volume": "Muting the volume.",
+    "unmute_volume": "Unmuting the volume.",
+    "increase_brightness": "Increasing the brightness.",
+    "decrease_brightness": "Decreasing the brightness.",
+    "shutdown_system": "Shutting down the system.",
+    "restart_system": "Restarting the system.",
+    "lock_screen": "Locking the screen.",
+    "sign_out": "Signing you out.",
+}
+
+# Ready-made Tanglish replies for results that don't depend on the outcome
+# (used directly by process_command in parse-and-reply mode).
+TANGLISH_RESPONSES = {
+    "open_google_chrome": "Okay sir, Chrome open panniten.",
+    "open_calculator": "Calculator open panniten, sir.",
+    "open_notepad": "Notepad open panniten, sir.",
+    "open_file_explorer": "File Explorer open panniten, sir.",
+    "open_cmd": "Command prompt open panniten, sir.",
+    "open_task_manager": "Task Manager open panniten, sir.",
+    "open_windows_media_player": "Media player open panniten, sir.",
+    "open_control_panel": "Control Panel open panniten, sir.",
+    "open_settings": "Settings open panniten, sir.",
+    "enable_wifi": "WiFi on panniten, sir.",
+    "disable_wifi": "WiFi off panniten, sir.",
+    "increase_volume": "Sari sir, volume increase panniten.",
+    "decrease_volume": "Sari sir, volume decrease panniten.",
+    "mute_volume": "Volume mute panniten, sir.",
+    "unmute_volume": "Volume unmute panniten, sir.",
+    "increase_brightness": "Brightness increase panniten, sir.",
+    "decrease_brightness": "Brightness decrease panniten, sir.",
+    "shutdown_system": "Sari sir, system shutdown panren.",
+    "restart_system": "Sari sir, system restart panren.",
+    "lock_screen": "Screen lock panniten, sir.",
+    "sign_out": "Sari sir, sign out panren.",
+    "write_in_notepad": "Notepad-la ezhudhitten, sir.",
+}
+
+FILLER_PREFIXES = r"^(?:(?:hey|hi|ok|okay),?\s+)?(?:jarvis,?\s+)?(?:please\s+|can you\s+|could you\s+|would you\s+|i want you to\s+|i want to\s+)*"
+FILLER_SUFFIXES = r"(?:\s+(?:please|for me|right now|now|sir|jarvis))*$"
+
+OPEN_VERBS = r"(?:open|launch|start|run|show)"
+CLOSE_VERBS = r"(?:close|kill|quit|exit|stop|shut)"
+
+SEARCH_PATTERNS = [
+    r"^(?:google|search google for|search for|search|look up)\s+(?P<query>.+?)(?:\s+on google)?$",
+]
+NEWS_PATTERNS = [
+    r"^(?:(?:get|tell|show|give)\s+(?:me\s+)?)?(?:what(?:s| is)\s+)?(?:the\s+)?(?:latest\s+)?news\s+(?:on|about|regarding|for|in)\s+(?P<topic>.+)$",
+    r"^(?:(?:get|tell|show|give)\s+(?:me\s+)?)?(?:what(?:s| is| are)\s+)?(?P<topic>\w+(?:\s+\w+){0,3}?)\s+news$",
+]
+# Words that can surround a news topic without being one ("the latest news", "what is the news").
+NEWS_STOPWORDS = {"the", "a", "an", "latest", "todays", "today", "current", "recent", "top", "breaking",
+                  "some", "any", "me", "us", "my", "what", "whats", "is", "are", "on", "about", "for", "in", "of"}
+# write/type only starts a clause; anywhere else it's part of a sentence ("i want to type faster").
+WRITE_PATTERN = r"(?:^|,\s*|\s+(?:and then|then|and|also)\s+)(?:write|type)\s+(?:down\s+)?(?P<text>.+?)(?:\s+(?:in|into|on)\s+(?:the\s+)?(?:notepad|note pad|text editor))?$"
+# Asking for something to be written ("can you write a poem", "write me an essay") is a job for the LLM,
+# not text to type verbatim.
+REQUEST_FRAMING = r"^(?:(?:hey|hi|ok|okay),?\s+)?(?:jarvis,?\s+)?(?:(?:can|could|would|will)\s+you|i\s+(?:want|wanna|would like|need))\b"
+COMPOSE_TEXT = r"^(?:me\s+|us\s+)?(?:a|an|some|another)\s+"
+CLAUSE_SEPARATOR = r"\s*(?:,|\band then\b|\bthen\b|\band\b|\balso\b)\s*"
+
+
+def normalize(text):
+    """Lower-cases and strips punctuation and polite filler from a transcription."""
+    text = text.lower().strip()
+    text = re.sub(r"[^\w\s',]", " ", text)
+    text = text.replace("'", "")
+    text = re.sub(r"\s+", " ", text).strip()
+    text = re.sub(FILLER_PREFIXES, "", text)
+    return text.strip(" ,")
+
+
+def _opposite(a, b):
+    """True if one word negates the other ("unlock"/"lock", "enable"/"disable")."""
+    if {a, b} in ANTONYMS:
+        return True
+    short, long = sorted((a, b), key=len)
+    return any(long == prefix + short for prefix in ANTONYM_PREFIXES)
+
+
+def _word_similarity(a, b):
+    if a == b:
+        return 1.0
+    if _opposite(a, b):
+        return 0.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _content_words(text):
+    return [w for w in text.split() if w not in FILLER_WORDS]
+
+
+def _similarity(phrase, alias):
+    """
+    Mean word similarity when every content word of alias pairs up with a
+    distinct content word of phrase (at TOKEN_SIMILARITY or better) and phrase
+    has no content words left over; 0.0 otherwise.
+    """
+    said, wanted = _content_words(phrase), _content_words(alias)
+    if len(said) != len(wanted) or not wanted:
+        return 0.0
+    total = 0.0
+    for word in wanted:
+        best = max(said, key=lambda w: _word_similarity(w, word))
+        score = _word_similarity(best, word)
+        if score < TOKEN_SIMILARITY:
+            return 0.0
+        said.remove(best)
+        total += score
+    return total / len(wanted)
+
+
+def _negated(clause):
+    return any(word in NEGATIONS for word in clause.split())
+
+
+def _best_match(phrase, table):
+    """Returns (key, score) of the table entry whose alias is closest to phrase."""
+    best_key, best_score = None, 0.0
+    for key, aliases in table.items():
+        for alias in aliases:
+            score = _similarity(phrase, alias)
+            if score > best_score:
+                best_key, best_score = key, score
+    return best_key, best_score
+
+
+def _task(command, args=None, response=None, tanglish_response=None):
+    return {
+        "command": command,
+        "args": args or [],
+        "response": response or RESPONSES.get(command, "On it!"),
+        "tanglish_response": tanglish_response or TANGLISH_RESPONSES.get(command, ""),
+    }
+
+
+def _news_topic(phrase):
+    """The topic without the stopwords around it, or "" if nothing is left."""
+    words = phrase.split()
+    while words and words[0] in NEWS_STOPWORDS:
+        words.pop(0)
+    while words and words[-1] in NEWS_STOPWORDS:
+        words.pop()
+    return " ".join(words)
+
+
+def _match_clause(clause):
+    """Matches a single clause. Returns (task, confidence)."""
+    for pattern in SEARCH_PATTERNS:
+        m = re.match(pattern, clause)
+        if m:
+            query = m.group("query").strip()
+            return _task("google_search", [query], f"Searching Google for {query}.",
+                         f"Sari sir, {query} Google-la search panren."), 0.95
+
+    for pattern in NEWS_PATTERNS:
+        m = re.match(pattern, clause)
+        if m:
+            topic = _news_topic(m.group("topic"))
+            if topic:
+                return _task("get_news", [topic], f"Fetching the latest news on {topic}."), 0.95
+    if re.search(r"\bnews\b", clause):
+        # News without a topic we can name: let the LLM ask or pick one.
+        return None, 0.0
+
+    if _negated(clause):
+        return None, 0.0
+
+    # Open, close and fixed phrases compete; the closest match wins.
+    candidates = []
+
+    m = re.match(rf"^{OPEN_VERBS}\s+(?:the\s+|my\s+)?(?P<app>.+)$", clause)
+    if m:
+        command, score = _best_match(m.group("app"), OPEN_TARGETS)
+        if command:
+            candidates.append((score, _task(command)))
+
+    m = re.match(rf"^{CLOSE_VERBS}\s+(?:the\s+|my\s+)?(?P<app>.+)$", clause)
+    if m:
+        process, score = _best_match(m.group("app"), CLOSE_TARGETS)
+        if process:
+            name = CLOSE_TARGETS[process][0].title()
+            candidates.append((score, _task(process, [], f"Closing {name}...")))
+
+    command, score = _best_match(clause, PHRASES)
+    if command:
+        if command in STRICT_COMMANDS and score < STRICT_CONFIDENCE:
+            score = min(score, CONFIDENCE_THRESHOLD - 0.01)
+        candidates.append((score, _task(command)))
+
+    if not candidates:
+        return None, 0.0
+    score, task = max(candidates, key=lambda c: c[0])
+    return task, score
+
+
+def match_intent(text, available=None):
+    """
+    Tries to turn an utterance into tasks without the LLM.
+    Returns (tasks, confidence) where tasks has the same
+    [{command, args, response}] shape that parse_commands returns.
+    If `available` (a set of command names) is given, an utterance that
+    needs any other command is not matched.
+    """
+    clean = normalize(text or "")
+    if not clean:
+        return [], 0.0
+
+    tasks = []
+    confidence = 1.0
+
+    # "write ..." swallows the rest of the utterance, so split it off first.
+    write_text = None
+    m = re.search(WRITE_PATTERN, re.sub(r"(?:\s+please)+$", "", clean))
+    if m:
+        write_text = m.group("text").strip()
+        clean = clean[:m.start()].strip(" ,")
+        clean = re.sub(r"(?:\s*,|\s+and then|\s+then|\s+and)$", "", clean).strip()
+
+    for clause in re.split(CLAUSE_SEPARATOR, clean) if clean else []:
+        clause = re.sub(FILLER_SUFFIXES, "", clause.strip())
+        if not clause:
+            continue
+        task, score = _match_clause(clause)
+        if task is None:
+            return [], 0.0
+        tasks.append(task)
+        confidence = min(confidence, score)
+
+    if write_text:
+        # write_in_notepad launches the editor itself.
+        tasks.append(_task("write_in_notepad", [write_text], "And writing your text."))
+        raw = (text or "").strip().lower()
+        if raw.endswith("?") or re.match(REQUEST_FRAMING, raw) or re.match(COMPOSE_TEXT, write_text):
+            confidence = min(confidence, CONFIDENCE_THRESHOLD - 0.01)
+
+    if not tasks:
+        return [], 0.0
+    if available is not None and any(
+            t["command"] not in available and not t["command"].endswith(".exe") for t in tasks):
+        return [], 0.0
+    return tasks, confidence
@@ -0,0 +1,143 @@
+# llm_cache.py
+# Persistent LRU + TTL cache for LLM results, stored in SQLite so it survives restarts.
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+CACHE_DIR = "cache"
+CACHE_PATH = os.path.join(CACHE_DIR, "llm_cache.sqlite3")
+MAX_ENTRIES = 2000
+
+
+def normalize_text(text):
+    """Case/whitespace/punctuation-insensitive form of an utterance used in cache keys."""
+    text = (text or "").lower().strip()
+    text = re.sub(r"\s+", " ", text)
+    return text.strip(" .,!?")
+
+
+def prompt_version(*parts):
+    """Short hash of a prompt (and any call parameters) so prompt edits invalidate old entries."""
+    digest = hashlib.sha256("\x00".join(str(p) for p in parts).encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+class LLMCache:
+    """
+    A size-bounded LRU cache with a TTL per namespace (one namespace per LLM function).
+
+    A key can hold several variants: get() reports a miss until `variants`
+    answers are stored, then rotates through them so replies don't sound canned.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES, ttls=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttls = ttls or {}
+        self.hits = {}
+        self.misses = {}
+        self._rotation = {}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                variant INTEGER NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (namespace, key, variant)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON entries (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(text, version):
+        return hashlib.sha256(f"{version}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def get(self, namespace, key, variants=1):
+        """Returns a cached value, or None on a miss (or while variants are still being collected)."""
+        now = time.time()
+        with self._lock:
+            self._expire(namespace, key, now)
+            rows = self._conn.execute(
+                "SELECT variant, value FROM entries WHERE namespace = ? AND key = ? ORDER BY variant",
+                (namespace, key)
+            ).fetchall()
+
+            if len(rows) < variants or not rows:
+                self.misses[namespace] = self.misses.get(namespace, 0) + 1
+                return None
+
+            index = self._rotation.get((namespace, key), 0) % len(rows)
+            self._rotation[(namespace, key)] = index + 1
+            variant, value = rows[index]
+            self._conn.execute(
+                "UPDATE entries SET last_access = ? WHERE namespace = ? AND key = ? AND variant = ?",
+                (now, namespace, key, variant)
+            )
+            self._conn.commit()
+            self.hits[namespace] = self.hits.get(namespace, 0) + 1
+            return value
+
+    def put(self, namespace, key, value, variants=1):
+        """Stores a value, replacing the least recently used variant once `variants` are held."""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT variant FROM entries WHERE namespace = ? AND key = ? ORDER BY last_access",
+                (namespace, key)
+            ).fetchall()
+            used = {r[0] for r in rows}
+            if len(rows) < variants:
+                variant = next(i for i in range(variants) if i not in used)
+            else:
+                variant = rows[0][0]
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, variant, value, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, key, variant, value, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def stats(self):
+        """Hit/miss counters per namespace plus the number of stored entries."""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {"hits": dict(self.hits), "misses": dict(self.misses), "entries": size}
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def _expire(self, namespace, key, now):
+        ttl = self.ttls.get(namespace)
+        if ttl is None:
+            return
+        self._conn.execute(
+            "DELETE FROM entries WHERE namespace = ? AND key = ? AND created_at < ?",
+            (namespace, key, now - ttl)
+        )
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM entries WHERE rowid IN "
+                "(SELECT rowid FROM entries ORDER BY last_access LIMIT ?)",
+                (excess,)
+            )
@@ -0,0 +1,271 @@
+# llm_client.py
+# Shared, pre-warmed Groq client with connection pooling, timeouts and cancellation.
+
+import asyncio
+import concurrent.futures
+import os
+import queue
+import threading
+import time
+import httpx
+from groq import APITimeoutError, AsyncGroq
+
+REQUEST_TIMEOUT = 20.0     # default per-call timeout (seconds)
+CONNECT_TIMEOUT = 5.0
+MAX_CONNECTIONS = 10
+MAX_KEEPALIVE_CONNECTIONS = 5
+KEEPALIVE_EXPIRY = 120.0   # how long an idle pooled connection is kept
+KEEP_WARM_INTERVAL = 45.0  # re-touch the connection when idle this long (0 disables)
+
+
+class LLMClient:
+    """
+    Wraps AsyncGroq on a private event loop thread.
+
+    The async API (achat / astream) can be awaited from that loop; the sync
+    wrappers (chat / chat_stream) let QThreadPool workers use it without
+    managing an event loop. All calls share one pooled httpx connection,
+    which warm() opens ahead of the first turn. Calls are tagged with the
+    current turn, and new_turn() cancels whatever an older turn still has in
+    flight.
+    """
+
+    def __init__(self, api_key=None, base_url=None, timeout=REQUEST_TIMEOUT):
+        self.timeout = timeout
+        self.base_url = base_url or os.getenv("GROQ_BASE_URL") or None
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-client", daemon=True)
+        self._thread.start()
+
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(timeout, connect=CONNECT_TIMEOUT),
+        )
+        # No SDK retries: a retry would silently double the per-call timeout.
+        self.client = AsyncGroq(api_key=api_key, base_url=self.base_url, http_client=self._http, max_retries=0)
+
+        self._lock = threading.Lock()
+        self._turn = 0
+        self._inflight = {}
+        self._last_used = 0.0
+        self._keep_warm_future = None
+        self.hedges = 0
+
+    # --- Async API ---
+
+    async def achat(self, timeout=None, hedge_after=None, **kwargs):
+        """
+        Awaitable chat completion (non-streaming). With hedge_after, a duplicate
+        request is sent if the first hasn't answered by then; the first answer wins.
+        """
+        timeout = timeout or self.timeout
+        self._last_used = time.time()
+
+        async def attempt(remaining):
+            try:
+                return await self.client.chat.completions.create(timeout=remaining, **kwargs)
+            except APITimeoutError:
+                raise TimeoutError(f"LLM request timed out after {remaining:.1f}s")
+
+        return await self._hedged(attempt, timeout, hedge_after)
+
+    async def astream(self, timeout=None, hedge_after=None, **kwargs):
+        """
+        Async iterator over streamed completion chunks. With hedge_after, the
+        hedge races on the first chunk and the slower stream is dropped.
+        """
+        timeout = timeout or self.timeout
+        self._last_used = time.time()
+
+        async def attempt(remaining):
+            try:
+                stream = await self.client.chat.completions.create(stream=True, timeout=remaining, **kwargs)
+                chunks = stream.__aiter__()
+                try:
+                    first = await chunks.__anext__()
+                except StopAsyncIteration:
+                    first = None
+            except APITimeoutError:
+                raise TimeoutError(f"LLM request timed out after {remaining:.1f}s")
+            return first, chunks, stream
+
+        async def discard(result):
+            await result[2].close()
+
+        first, chunks, stream = await self._hedged(attempt, timeout, hedge_after, discard)
+        try:
+            if first is None:
+                return
+            yield first
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await stream.close()
+
+    async def _hedged(self, attempt, timeout, hedge_after=None, discard=None):
+        """
+        Runs attempt(timeout); if hedge_after elapses first, races a duplicate
+        attempt against it (with the remaining time budget). Returns the first
+        successful result, or raises the last error if every attempt failed.
+        """
+        tasks = {asyncio.ensure_future(attempt(timeout))}
+        winner = None
+        try:
+            if hedge_after is not None and hedge_after < timeout:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                if not done:
+                    self.hedges += 1
+                    print(f"LLM call slower than {hedge_after:.2f}s; sending a hedged request.")
+                    tasks.add(asyncio.ensure_future(attempt(timeout - hedge_after)))
+
+            error = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if winner is None:
+                            winner = task
+                    else:
+                        error = task.exception()
+                if winner is not None:
+                    return winner.result()
+            raise error
+        finally:
+            for task in tasks:
+                if task is winner:
+                    continue
+                if not task.done():
+                    task.cancel()
+                elif discard and not task.cancelled() and task.exception() is None:
+                    await discard(task.result())
+
+    # --- Sync wrappers ---
+
+    def submit(self, coro, turn=None):
+        """Schedules a coroutine on the client loop, tracked under the given (or current) turn."""
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        with self._lock:
+            turn = self._turn if turn is None else turn
+            self._inflight.setdefault(turn, set()).add(future)
+        future.add_done_callback(lambda f, t=turn: self._forget(t, f))
+        return future
+
+    def chat(self, timeout=None, hedge_after=None, **kwargs):
+        """
+        Blocking chat completion. Raises TimeoutError after `timeout` seconds
+        and concurrent.futures.CancelledError if a newer turn superseded it.
+        """
+        timeout = timeout or self.timeout
+        future = self.submit(self.achat(timeout=timeout, hedge_after=hedge_after, **kwargs))
+        try:
+            return future.result(timeout=timeout + 1.0)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"LLM request timed out after {timeout:.1f}s")
+
+    def chat_stream(self, timeout=None, hedge_after=None, **kwargs):
+        """Blocking generator over streamed chunks (same errors as chat())."""
+        timeout = timeout or self.timeout
+        chunks = queue.Queue()
+
+        async def pump():
+            try:
+                async for chunk in self.astream(timeout=timeout, hedge_after=hedge_after, **kwargs):
+                    chunks.put(("chunk", chunk))
+            except asyncio.CancelledError:
+                chunks.put(("error", concurrent.futures.CancelledError()))
+                raise
+            except Exception as e:
+                chunks.put(("error", e))
+            finally:
+                chunks.put(("end", None))
+
+        future = self.submit(pump())
+        try:
+            while True:
+                try:
+                    kind, item = chunks.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"LLM stream stalled for {timeout:.1f}s")
+                if kind == "end":
+                    return
+                if kind == "error":
+                    raise item
+                yield item
+        finally:
+            future.cancel()
+
+    # --- Connection management ---
+
+    def warm(self):
+        """
+        Opens (and keeps) the pooled TLS connection before the first turn.
+        Runs in the background; returns the future.
+        """
+        async def touch():
+            started = time.time()
+            try:
+                await self.client.models.list(timeout=CONNECT_TIMEOUT * 2)
+                print(f"LLM connection warmed in {time.time() - started:.2f}s")
+            except Exception as e:
+                print(f"LLM warm-up failed: {e}")
+            self._last_used = time.time()
+
+        if self._keep_warm_future is None and KEEP_WARM_INTERVAL > 0:
+            self._keep_warm_future = asyncio.run_coroutine_threadsafe(self._keep_warm(touch), self._loop)
+        return asyncio.run_coroutine_threadsafe(touch(), self._loop)
+
+    async def _keep_warm(self, touch):
+        while True:
+            await asyncio.sleep(KEEP_WARM_INTERVAL)
+            if time.time() - self._last_used >= KEEP_WARM_INTERVAL:
+                await touch()
+
+    # --- Turn tracking / cancellation ---
+
+    def new_turn(self):
+        """Starts a new turn and cancels requests still running for older turns."""
+        with self._lock:
+            self._turn += 1
+            stale = [f for turn, fs in self._inflight.items() if turn < self._turn for f in fs]
+        for future in stale:
+            future.cancel()
+        if stale:
+            print(f"Cancelled {len(stale)} superseded LLM request(s).")
+        return self._turn
+
+    def cancel_turn(self, turn):
+        """Cancels the requests one turn still has in flight (see turn_context.TurnContext)."""
+        with self._lock:
+            futures = list(self._inflight.get(turn, ()))
+        for future in futures:
+            future.cancel()
+        if futures:
+            print(f"Cancelled {len(futures)} LLM request(s) of an aborted turn.")
+
+    def cancel_all(self):
+        with self._lock:
+            futures = [f for fs in self._inflight.values() for f in fs]
+        for future in futures:
+            future.cancel()
+
+    def _forget(self, turn, future):
+        with self._lock:
+            futures = self._inflight.get(turn)
+            if futures is not None:
+                futures.discard(future)
+                if not futures:
+                    del self._inflight[turn]
+
+    def close(self):
+        self.cancel_all()
+        if self._keep_warm_future is not None:
+            self._keep_warm_future.cancel()
+        asyncio.run_coroutine_threadsafe(self._http.aclose(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
@@ -1,12 +1,15 @@
 # main.py
 # --- MODIFIED to be a 'logic' module for the GUI ---
 
-import librosa
+import asr_precision
 import command_and_response_giver
+import intent_matcher
 import numpy as np
-from transformers import pipeline
 from command_response_fetcher import parse_commands
-from open_or_close_decision_maker import open_or_close
+from open_or_close_decision_maker import produces_data
+from program_opener import registry
+import task_scheduler
+from model_manager import ModelManager
 import tts_player # This is no longer used here, but in the GUI
 import os
 from dotenv import load_dotenv
@@ -16,20 +19,57 @@ from dotenv import load_dotenv
 load_dotenv()
 # -----------------
 
-# --- Models Loaded Once ---
-print("Loading speech recognition model from local relative path...")
-speech_to_text_pipe = pipeline(
-    "automatic-speech-recognition",
-    model=r"whisper_medium/model",
-    tokenizer=r"whisper_medium/tokenizer",
-    feature_extractor=r"whisper_medium/feature_extractor",
-    generate_kwargs={"language": "en"}
+# --- Models Loaded in the Background ---
+WHISPER_GENERATE_KWARGS = {"language": "en"}
+WHISPER_MODEL_DIR = r"whisper_medium/model"
+WHISPER_TOKENIZER_DIR = r"whisper_medium/tokenizer"
+WHISPER_FEATURE_EXTRACTOR_DIR = r"whisper_medium/feature_extractor"
+
+# --- ASR Precision ---
+# "fp32" (the default), "int8" (dynamically quantized linear layers), "bf16"
+# (CPUs with native bf16), or "auto": the most precise supported mode whose
+# weights fit ASR_MEMORY_BUDGET_MB. Opt in per deployment in .env after
+# comparing them with `python -m benchmarks.asr_benchmark`.
+ASR_PRECISION = os.getenv("ASR_PRECISION", asr_precision.FP32)
+ASR_MEMORY_BUDGET_MB = asr_precision.parse_budget(os.getenv("ASR_MEMORY_BUDGET_MB"))
+
+
+def _load_speech_to_text_pipe():
+    precision = asr_precision.resolve(ASR_PRECISION, WHISPER_MODEL_DIR, ASR_MEMORY_BUDGET_MB)
+    print(f"Loading speech recognition model from local relative path ({precision})...")
+    return asr_precision.load_pipeline(
+        WHISPER_MODEL_DIR,
+        WHISPER_TOKENIZER_DIR,
+        WHISPER_FEATURE_EXTRACTOR_DIR,
+        precision,
+        generate_kwargs=WHISPER_GENERATE_KWARGS
+    )
+
+
+def _warm_up_speech_to_text_pipe(pipe):
+    # One second of silence pays the graph/allocator warm-up before the first real command.
+    pipe(np.zeros(16000, dtype=np.float32))
+
+
+speech_to_text_model = ModelManager(
+    "whisper-medium",
+    loader=_load_speech_to_text_pipe,
+    warmup=_warm_up_speech_to_text_pipe
 )
-print("Model loaded. Ready for your command!")
+
+# Decode while the user is still speaking (see streaming_asr.py).
+STREAMING_ASR = True
+
+# Speak the reply sentence by sentence while the LLM is still generating it.
+STREAMING_REPLY = True
+
+# Let the user interrupt a reply by talking over it (see barge_in.py).
+BARGE_IN = True
 
 
 def load_audio_with_librosa(audio_path, target_sr=16000):
     try:
+        import librosa
         audio, _ = librosa.load(audio_path, sr=target_sr)
         return audio
     except Exception as e:
@@ -37,33 +77,139 @@ def load_audio_with_librosa(audio_path, target_sr=16000):
         return None
 
 
-def process_command(audio_path="recorded_audio.wav"):
+def _cancel_criteria(context):
+    """A StoppingCriteria that ends Whisper's decoding loop once the turn is cancelled."""
+    import torch
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    class TurnCancelledCriteria(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            return torch.full((input_ids.shape[0],), context.cancelled, dtype=torch.bool, device=input_ids.device)
+
+    return StoppingCriteriaList([TurnCancelledCriteria()])
+
+
+def transcribe(audio_array, context=None):
+    """
+    Runs whisper on a float32 16 kHz array and returns the text. With a
+    turn_context.TurnContext, decoding stops at the next token once the
+    turn is cancelled (and TurnCancelled is raised instead of returning).
+    """
+    speech_to_text_pipe = speech_to_text_model.get()
+    if context is None:
+        return speech_to_text_pipe(audio_array)['text']
+    context.check()
+    # Call-time generate_kwargs replace the pipeline's, so the language is passed again.
+    text = speech_to_text_pipe(audio_array, generate_kwargs={
+        **WHISPER_GENERATE_KWARGS,
+        "stopping_criteria": _cancel_criteria(context),
+    })['text']
+    context.check()
+    return text
+
+
+def _reply(text, stream):
+    """Tanglish reply for text: a string, or an iterator of segments when streaming."""
+    if stream:
+        return command_and_response_giver.responser_stream(text)
+    return command_and_response_giver.responser(text)
+
+
+def task_failure_reply(failures):
+    """An apology naming tasks that failed in the background (the reply didn't wait for them, so it assumed they worked)."""
+    names = ", ".join(task.get("command", "").replace("_", " ") for task, _ in failures)
+    return f"Sir, sorry, {names} panna mudiyala."
+
+
+def on_task_failures(context, callback):
+    """
+    Calls callback(apology) once the turn's background tasks have finished,
+    if any of them failed. Nothing waits for them: the callback runs on the
+    tool thread that finished last, possibly after the turn is over.
+    """
+    run = context.tasks if context is not None else None
+    if run is None:
+        return
+
+    def report(failures):
+        for task, error in failures:
+            print(f"Task {task.get('command')} failed after the reply: {error}")
+        callback(task_failure_reply(failures))
+
+    run.on_failures(report)
+
+
+def _ready_replies(tasks):
+    """
+    The tanglish_response of every task, or None if any task needs the
+    responser (it returns data, or the reply is missing).
+    """
+    replies = []
+    for task in tasks:
+        command = task.get("command")
+        if command is None or command == "no_action":
+            continue
+        reply = (task.get("tanglish_response") or "").strip()
+        if produces_data(command) or not reply:
+            return None
+        replies.append(reply)
+    return replies or None
+
+
+def process_command(audio, transcriber=None, stream=False, context=None):
     """
     Processes audio, determines command, and returns text.
+    `audio` is the float32 16 kHz array from audio_recorder (a WAV path still works).
+    If a streaming transcriber ran during recording, only its tail is decoded here.
     MODIFIED: Returns (final_response, user_transcription)
+    With stream=True, final_response is an iterator of reply segments instead.
+
+    With a turn_context.TurnContext, cancelling it stops the Whisper decode,
+    the turn's LLM requests and any tool that hasn't started yet, and this
+    function raises TurnCancelled at the next stage instead of returning.
     """
-    audio_array = load_audio_with_librosa(audio_path)
-    if audio_array is None:
-        return "Could not process the audio file.", "Error processing audio."
+    # Anything an older turn still has in flight with the LLM is cancelled.
+    llm_turn = command_and_response_giver.llm.new_turn()
+    if context is not None:
+        context.on_cancel(lambda: command_and_response_giver.llm.cancel_turn(llm_turn))
+        if transcriber is not None:
+            context.on_cancel(transcriber.cancel)
+        context.check()
+
+    if transcriber is not None:
+        print("\nFinishing streaming transcription...")
+        unstr_english_command = transcriber.finish()
+    else:
+        audio_array = load_audio_with_librosa(audio) if isinstance(audio, str) else audio
+        if audio_array is None or len(audio_array) == 0:
+            message = "Could not process the audio file."
+            return (iter([message]) if stream else message), "Error processing audio."
 
-    print("\nTranscribing audio...")
-    unstr_english_command = speech_to_text_pipe(audio_array.copy())['text']
+        print("\nTranscribing audio...")
+        unstr_english_command = transcribe(audio_array, context)
     print(f"Heard: '{unstr_english_command}'")
     
     if not unstr_english_command or not unstr_english_command.strip():
         print("Empty transcription. Nothing to process.")
-        final_response = command_and_response_giver.responser("Sorry, I didn't hear anything.")
+        final_response = _reply("Sorry, I didn't hear anything.", stream)
         return final_response, "(Silence)"
 
-    print("Getting structured command from LLM...")
-    command_response_text = command_and_response_giver.get_command(unstr_english_command)
-    print(f"LLM Output:\n{command_response_text}")
-    
-    tasks = parse_commands(command_response_text)
+    # Known fixed commands are resolved locally; only ambiguous input goes to the LLM.
+    tasks, confidence = intent_matcher.match_intent(unstr_english_command, registry.available_commands())
+    if confidence >= intent_matcher.CONFIDENCE_THRESHOLD:
+        print(f"Local intent match ({confidence:.2f}): {tasks}")
+    else:
+        print("Getting structured command from LLM...")
+        command_response_text = command_and_response_giver.get_command(unstr_english_command)
+        if context is not None:
+            context.check()
+        print(f"LLM Output:\n{command_response_text}")
+
+        tasks = parse_commands(command_response_text)
     
     if not tasks:
         print("Could not parse any valid commands from LLM response.")
-        final_response = command_and_response_giver.responser("Sorry, I had trouble understanding that.")
+        final_response = _reply("Sorry, I had trouble understanding that.", stream)
         return final_response, unstr_english_command
 
     first_command = tasks[0].get("command")
@@ -72,37 +218,45 @@ def process_command(audio_path="recorded_audio.wav"):
         print("Detected conversational turn.")
         conversational_text = tasks[0].get("response", "I'm not sure how to respond.")
         print("Generating conversational response...")
-        final_response = command_and_response_giver.responser(conversational_text)
+        final_response = _reply(conversational_text, stream)
         
         # RETURN both strings
         return final_response, unstr_english_command
     else:
         print("Detected action command(s). Executing sequence.")
-        all_initial_responses = []
-        final_execution_result = ""
+        tasks = [t for t in tasks if t.get("command") not in (None, "no_action")]
+        all_initial_responses = [t.get("response", "Working on it...") for t in tasks]
 
-        for task in tasks:
-            command = task.get("command")
-            args = task.get("args", [])
-            response = task.get("response", "Working on it...")
+        # Tools run in the background; the reply only joins on tasks whose result it reads out.
+        run = task_scheduler.run_tasks(tasks, context)
+        if context is not None:
+            context.tasks = run
 
-            if command is None or command == "no_action":
-                continue
+        # Parse-and-reply mode: get_command already wrote the Tanglish reply,
+        # so the responser round trip is only needed when a result must be read out.
+        ready_replies = _ready_replies(tasks)
+        if ready_replies is not None:
+            print("Using Tanglish reply from get_command (no responser call).")
+            final_response = " ".join(ready_replies)
+            if stream:
+                final_response = iter(command_and_response_giver.split_sentences(final_response))
+            return final_response, unstr_english_command
 
-            print(f"Executing Task: {command}, Arguments: {args}")
-            all_initial_responses.append(response)
-            execution_result = open_or_close(command, args)
-            
-            if execution_result:
-                final_execution_result = str(execution_result)
-            
-            print(f"Task result: {execution_result}")
+        final_execution_result = ""
+        if run.needs_results():
+            print("Waiting for task results needed by the reply...")
+            # Every result the reply reads out, in the order the user asked for them.
+            final_execution_result = " ".join(run.data_results())
+            if context is not None:
+                context.check()
+        else:
+            print("Reply doesn't depend on task results; generating it in parallel.")
 
         combined_initial_response = " ".join(all_initial_responses)
         full_response = f"{combined_initial_response} {final_execution_result}".strip()
         
         print("Generating final Tanglish response...")
-        final_response = command_and_response_giver.responser(full_response)
+        final_response = _reply(full_response, stream)
         
         # RETURN both strings
         return final_response, unstr_english_command
@@ -4,12 +4,21 @@ from PySide6.QtWidgets import (
     QWidget, QTextEdit, QLabel, QFrame, QComboBox, QGroupBox
 )
 from PySide6.QtCore import QObject, Signal, QRunnable, QThreadPool, Slot, Qt
-from PySide6.QtGui import QIcon, QFont
+from PySide6.QtGui import QIcon, QFont, QTextCursor
 
 import audio_recorder
+import command_and_response_giver
+from program_opener import news
+import concurrent.futures
 import main as processing_logic
+import streaming_asr
+import barge_in
+import playback_engine
 import tts_player
+import turn_context
+import wake_word
 import os
+import threading
 
 # --- Worker Signals ---
 class WorkerSignals(QObject):
@@ -17,57 +26,146 @@ class WorkerSignals(QObject):
     error = Signal(tuple)
     status_update = Signal(str)
     conversation_update = Signal(str, str)
+    audio_ready = Signal(object, object)
+    speaking = Signal()
+    barge_in = Signal()
+    task_failed = Signal(str)
 
 # --- 1. Audio Recorder Worker ---
 class AudioWorker(QRunnable):
-    def __init__(self, signals):
+    def __init__(self, signals, wake_word=None, stop_event=None, barge_in=None):
         super().__init__()
         self.signals = signals
+        self.wake_word = wake_word
+        self.stop_event = stop_event
+        self.barge_in = barge_in
 
     @Slot()
     def run(self):
         try:
-            self.signals.status_update.emit("🎤 Listening... (Speak now)")
-            audio_recorder.record_with_immediate_stop()
+            if self.wake_word is not None:
+                self.signals.status_update.emit(f"👂 Hands-free: say '{wake_word.WAKE_WORD}'...")
+            elif self.barge_in is None:
+                self.signals.status_update.emit("🎤 Listening... (Speak now)")
+
+            transcriber = None
+            if processing_logic.STREAMING_ASR:
+                transcriber = streaming_asr.StreamingTranscriber(
+                    processing_logic.transcribe,
+                    on_partial=lambda text: self.signals.status_update.emit(f"🎤 Heard so far: {text}")
+                ).start()
+
+            audio = audio_recorder.record_with_immediate_stop(
+                transcriber=transcriber,
+                wake_word=self.wake_word,
+                stop_event=self.stop_event,
+                on_wake=self.on_wake,
+                barge_in=self.barge_in
+            )
+            if self.stop_event is not None and self.stop_event.is_set():
+                # Hands-free listening was switched off, a manual turn took the mic,
+                # or the reply being watched for barge-in finished.
+                if transcriber is not None:
+                    transcriber.cancel()
+                self.signals.finished.emit()
+                return
+            self.signals.audio_ready.emit(audio, transcriber)
             self.signals.finished.emit()
         except Exception as e:
             self.signals.error.emit((e, "Audio recording failed"))
 
-# --- 2. Command Processor Worker ---
+    def on_wake(self):
+        if self.barge_in is not None:
+            self.signals.barge_in.emit()
+        self.signals.status_update.emit("🎤 Listening... (Speak now)")
+
+# --- 2. Model Warm-up Worker ---
+class ModelWarmupWorker(QRunnable):
+    def __init__(self, model, signals):
+        super().__init__()
+        self.model = model
+        self.signals = signals
+
+    @Slot()
+    def run(self):
+        try:
+            self.model.get()
+            self.signals.finished.emit()
+        except Exception as e:
+            self.signals.error.emit((e, "Speech model failed to load"))
+
+# --- 3. Command Processor Worker ---
 class CommandWorker(QRunnable):
-    def __init__(self, audio_path, signals, voice_config):
+    def __init__(self, audio, signals, voice_config, transcriber=None, context=None):
         super().__init__()
         self.signals = signals
-        self.audio_path = audio_path
+        self.audio = audio
         self.voice_config = voice_config
+        self.transcriber = transcriber
+        self.context = context or turn_context.TurnContext()
 
     @Slot()
     def run(self):
         try:
-            if not os.path.exists(self.audio_path):
-                self.signals.status_update.emit(f"❌ Error: {self.audio_path} not found.")
+            if self.audio is None or len(self.audio) == 0:
+                if self.transcriber is not None:
+                    self.transcriber.cancel()
+                self.signals.status_update.emit("❌ Error: No audio captured.")
+                self.signals.finished.emit()
                 return
 
             self.signals.status_update.emit("🧠 Thinking... (Transcribing & processing)")
             
-            final_response, user_transcription = processing_logic.process_command(self.audio_path)
+            if processing_logic.STREAMING_REPLY:
+                self.run_streaming()
+                return
+
+            final_response, user_transcription = processing_logic.process_command(
+                self.audio, self.transcriber, context=self.context
+            )
+            self.context.check()
             
             if not user_transcription.strip():
                 user_transcription = "(No speech detected)"
                 
             self.signals.conversation_update.emit(user_transcription, final_response)
             self.signals.status_update.emit("🗣️ Speaking...")
+            self.signals.speaking.emit()
             
             # Use selected voice configuration
-            tts_player.speak(final_response, **self.voice_config)
+            tts_player.speak(final_response, context=self.context, **self.voice_config)
             
             self.signals.finished.emit()
 
+        except concurrent.futures.CancelledError:
+            print("CommandWorker: turn cancelled; its ASR, LLM requests, tools and playback were released.")
+            self.signals.finished.emit()
         except Exception as e:
             self.signals.error.emit((e, "Command processing failed"))
             print(f"Error in CommandWorker: {e}")
 
-# --- 3. Main GUI Window ---
+    def run_streaming(self):
+        """Speaks the reply segment by segment and logs each one as it arrives."""
+        segments, user_transcription = processing_logic.process_command(
+            self.audio, self.transcriber, stream=True, context=self.context
+        )
+        self.context.check()
+        if not user_transcription.strip():
+            user_transcription = "(No speech detected)"
+
+        self.signals.conversation_update.emit(user_transcription, "")
+        self.signals.status_update.emit("🗣️ Speaking...")
+        self.signals.speaking.emit()
+
+        def logged(segments):
+            for segment in segments:
+                self.signals.conversation_update.emit("", segment)
+                yield segment
+
+        tts_player.speak_segments(logged(segments), context=self.context, **self.voice_config)
+        self.signals.finished.emit()
+
+# --- 4. Main GUI Window ---
 class AssistantWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -80,10 +178,37 @@ class AssistantWindow(QMainWindow):
         
         # Default voice configuration
         self.voice_config = {"lang": "en-IN", "gender": "FEMALE"}
+
+        # Streamed replies are appended to the current JARVIS line
+        self.reply_in_progress = False
+        self.reply_started = False
+
+        # Hands-free mode: enrolled wake word templates (loaded on first use)
+        # and the stop event of the wake word listener currently holding the mic.
+        self.wake_templates = None
+        self.wake_threshold = None
+        self.wake_stop = None
+
+        # The turn in progress (a turn_context.TurnContext, None when idle):
+        # cancelling it releases its ASR, LLM requests, tools and playback, and
+        # its workers' late signals are ignored. While its reply plays, a
+        # barge-in listener watches the mic.
+        self.turn_context = None
+        self.barge_in_stop = None
+        self.echo_coupling = None
+        self.barge_in_detector = None
+
+        # Tools that fail after their turn's reply are apologised for in an
+        # entry of their own, once no turn is in progress.
+        self.task_signals = WorkerSignals()
+        self.task_signals.task_failed.connect(self.on_task_failed)
+        self.pending_apologies = []
         
         self.init_ui()
         self.apply_stylesheet()
+        self.warm_up_models()
         self.greet_user()
+        tts_player.prewarm_cache()
 
     def init_ui(self):
         # --- Main Container ---
@@ -152,6 +277,13 @@ class AssistantWindow(QMainWindow):
         self.listen_button.setObjectName("listenButton")
         self.listen_button.setCursor(Qt.PointingHandCursor)
         self.listen_button.clicked.connect(self.start_listening)
+
+        # --- Hands-free Toggle ---
+        self.hands_free_button = QPushButton(f"👂 HANDS-FREE ('{wake_word.WAKE_WORD}'): OFF")
+        self.hands_free_button.setObjectName("handsFreeButton")
+        self.hands_free_button.setCheckable(True)
+        self.hands_free_button.setCursor(Qt.PointingHandCursor)
+        self.hands_free_button.toggled.connect(self.toggle_hands_free)
         
         # --- Conversation Log ---
         conv_label = QLabel("Conversation History")
@@ -166,6 +298,7 @@ class AssistantWindow(QMainWindow):
         main_layout.addWidget(self.status_label)
         main_layout.addWidget(voice_group)
         main_layout.addWidget(self.listen_button)
+        main_layout.addWidget(self.hands_free_button)
         main_layout.addWidget(conv_label)
         main_layout.addWidget(self.conversation_log, stretch=1)
         
@@ -301,6 +434,22 @@ class AssistantWindow(QMainWindow):
                 border: 2px solid rgba(255, 255, 255, 0.1);
             }
             
+            #handsFreeButton {
+                font-size: 14px;
+                font-weight: bold;
+                padding: 10px;
+                background: rgba(0, 0, 0, 0.3);
+                color: #a8dadc;
+                border-radius: 10px;
+                border: 1px solid rgba(0, 212, 255, 0.3);
+            }
+            
+            #handsFreeButton:checked {
+                background: rgba(78, 204, 163, 0.25);
+                color: #4ecca3;
+                border: 1px solid #4ecca3;
+            }
+            
             #sectionLabel {
                 font-size: 14px;
                 font-weight: bold;
@@ -362,8 +511,47 @@ class AssistantWindow(QMainWindow):
         
         self.voice_info_label.setText(voice_names.get((lang, gender), "🎵 Voice Selected"))
 
+    def warm_up_models(self):
+        # Open the TLS connection to the LLM API before the first turn needs it.
+        command_and_response_giver.warm_up()
+
+        # Keep the configured news topics (news.PREFETCH_TOPICS) fresh in the background.
+        news.get_service().start_prefetch()
+
+        # Open the output device now so the greeting doesn't pay for it.
+        try:
+            playback_engine.get_engine().start()
+        except Exception as e:
+            print(f"Audio output not available yet ({e}); will retry on the first reply.")
+
+        # Open the microphone once for the session; its noise floor is calibrated
+        # now and kept current, so no turn has to wait for a quiet moment.
+        try:
+            audio_recorder.get_capture_service().start()
+        except Exception as e:
+            print(f"Microphone not available yet ({e}); will retry on the first turn.")
+
+        # Whisper loads on a background thread; the mic can record meanwhile
+        # and the first command simply waits for the model to become ready.
+        model = processing_logic.speech_to_text_model
+        model.start()
+        if model.is_ready():
+            return
+
+        self.update_status("⏳ Warming up speech model... (you can already speak)")
+
+        warmup_signals = WorkerSignals()
+        warmup_signals.finished.connect(self.on_models_ready)
+        warmup_signals.error.connect(self.on_error)
+        self.thread_pool.start(ModelWarmupWorker(model, warmup_signals))
+
+    def on_models_ready(self):
+        # Don't overwrite the status of a turn that is already in progress.
+        if self.is_idle():
+            self.update_status("🟢 System Online - Ready for commands")
+
     def greet_user(self):
-        greeting = "Vanakkam sir, system online. Ready for your command."
+        greeting = tts_player.GREETING
         self.update_conversation_log("", greeting)
         
         # Play greeting with default voice
@@ -373,34 +561,187 @@ class AssistantWindow(QMainWindow):
         greeting_worker = QRunnable.create(greet)
         self.thread_pool.start(greeting_worker)
 
+    def toggle_hands_free(self, enabled):
+        if not enabled:
+            self.hands_free_button.setText(f"👂 HANDS-FREE ('{wake_word.WAKE_WORD}'): OFF")
+            self.stop_wake_listening()
+            if self.is_idle():
+                self.update_status("🟢 System Online - Ready for commands")
+            return
+
+        if self.wake_templates is None:
+            self.wake_templates = wake_word.load_templates()
+            if self.wake_templates is None:
+                self.update_status("❌ No wake word enrolled. Run: python wake_word.py enroll")
+                self.hands_free_button.setChecked(False)
+                return
+            self.wake_threshold = wake_word.calibrate_threshold(self.wake_templates)
+
+        self.hands_free_button.setText(f"👂 HANDS-FREE ('{wake_word.WAKE_WORD}'): ON")
+        # A turn in progress re-arms the listener when it finishes (reset_button).
+        if self.is_idle():
+            self.start_wake_listening()
+
+    def start_wake_listening(self):
+        """Keeps the mic open for the wake word; the LISTEN button still works meanwhile."""
+        if self.wake_stop is not None:
+            return
+        self.wake_stop = threading.Event()
+        spotter = wake_word.WakeWordSpotter(
+            self.wake_templates, self.wake_threshold,
+            noise_floor=audio_recorder.get_capture_service().noise_floor
+        )
+
+        audio_signals = WorkerSignals()
+        audio_signals.status_update.connect(self.update_status)
+        audio_signals.audio_ready.connect(self.on_wake_audio)
+        audio_signals.error.connect(self.on_wake_error)
+
+        self.thread_pool.start(AudioWorker(audio_signals, wake_word=spotter, stop_event=self.wake_stop))
+
+    def stop_wake_listening(self):
+        if self.wake_stop is not None:
+            self.wake_stop.set()
+            self.wake_stop = None
+
+    def on_wake_audio(self, audio, transcriber=None):
+        self.wake_stop = None
+        self.listen_button.setEnabled(False)
+        self.start_processing(audio, transcriber)
+
+    def on_wake_error(self, error_tuple):
+        # Don't keep re-arming a listener that can't open the mic.
+        self.wake_stop = None
+        self.hands_free_button.setChecked(False)
+        self.on_error(error_tuple)
+
+    def is_idle(self):
+        return self.turn_context is None and self.listen_button.isEnabled()
+
+    def start_barge_in_listening(self):
+        """Watches the mic while the reply plays; talking over it interrupts the turn."""
+        if self.barge_in_stop is not None:
+            return
+        self.barge_in_stop = threading.Event()
+        # The echo coupling measured during one reply carries over to the next.
+        self.remember_echo_coupling()
+        self.barge_in_detector = barge_in.BargeInDetector(
+            playback_engine.get_engine(),
+            noise_floor=audio_recorder.get_capture_service().noise_floor,
+            coupling=self.echo_coupling
+        )
+
+        audio_signals = WorkerSignals()
+        audio_signals.status_update.connect(self.update_status)
+        audio_signals.barge_in.connect(self.on_barge_in)
+        audio_signals.audio_ready.connect(self.on_barge_in_audio)
+        audio_signals.error.connect(self.on_barge_in_error)
+
+        self.thread_pool.start(
+            AudioWorker(audio_signals, stop_event=self.barge_in_stop, barge_in=self.barge_in_detector)
+        )
+
+    def remember_echo_coupling(self):
+        if self.barge_in_detector is not None and self.barge_in_detector.learned_coupling:
+            self.echo_coupling = self.barge_in_detector.learned_coupling
+
+    def stop_barge_in_listening(self):
+        if self.barge_in_stop is not None:
+            self.barge_in_stop.set()
+            self.barge_in_stop = None
+
+    def interrupt_turn(self, reason="superseded"):
+        """Cancels the turn in progress; everything it still has running stops at once."""
+        context, self.turn_context = self.turn_context, None
+        self.reply_in_progress = False
+        self.stop_barge_in_listening()
+        if context is not None:
+            context.cancel(reason)
+
+    def on_speaking(self):
+        # The reply can be cut short: LISTEN works again, and with BARGE_IN
+        # simply talking over it does the same.
+        self.listen_button.setEnabled(True)
+        self.listen_button.setText("🎤 LISTEN")
+        if processing_logic.BARGE_IN:
+            self.update_status("🗣️ Speaking... (talk to interrupt)")
+            self.start_barge_in_listening()
+
+    def on_barge_in(self):
+        # The detector has already stopped playback; its listener now records
+        # the new command, so it must survive interrupt_turn().
+        self.barge_in_stop = None
+        self.interrupt_turn("barge-in")
+        self.listen_button.setEnabled(False)
+        self.listen_button.setText("⏺️ LISTENING...")
+
+    def on_barge_in_audio(self, audio, transcriber=None):
+        if audio is None:
+            if transcriber is not None:
+                transcriber.cancel()
+            self.reset_button()
+            return
+        self.start_processing(audio, transcriber)
+
+    def on_barge_in_error(self, error_tuple):
+        self.barge_in_stop = None
+        if self.turn_context is None:
+            # It had already taken over from the interrupted turn.
+            self.on_error(error_tuple)
+            return
+        e, message = error_tuple
+        print(f"Barge-in listener stopped: {message}\n{e}")
+
     def start_listening(self):
+        # A manual turn takes the mic from the wake word listener, and
+        # interrupts a reply that is still playing.
+        self.stop_wake_listening()
+        if self.turn_context is not None:
+            self.interrupt_turn()
         self.listen_button.setEnabled(False)
         self.listen_button.setText("⏺️ LISTENING...")
-        
+
+        # The turn starts with the recording, which stops if the turn is cancelled.
+        context = self.turn_context = turn_context.TurnContext()
         audio_signals = WorkerSignals()
-        audio_signals.status_update.connect(self.update_status)
-        audio_signals.finished.connect(self.start_processing)
-        audio_signals.error.connect(self.on_error)
+        audio_signals.status_update.connect(self.for_turn(context, self.update_status))
+        audio_signals.audio_ready.connect(self.for_turn(context, self.start_processing))
+        audio_signals.error.connect(self.for_turn(context, self.on_error))
         
-        audio_worker = AudioWorker(audio_signals)
+        audio_worker = AudioWorker(audio_signals, stop_event=context)
         self.thread_pool.start(audio_worker)
 
-    def start_processing(self):
+    def start_processing(self, audio, transcriber=None):
+        # Wake word and barge-in turns begin here; a manual turn already has its context.
+        if self.turn_context is None:
+            self.turn_context = turn_context.TurnContext()
+        turn = self.turn_context
+        self.listen_button.setEnabled(False)
         self.listen_button.setText("🧠 PROCESSING...")
         self.update_status("🧠 Processing audio...")
 
         command_signals = WorkerSignals()
-        command_signals.status_update.connect(self.update_status)
-        command_signals.conversation_update.connect(self.update_conversation_log)
-        command_signals.finished.connect(self.reset_button)
-        command_signals.error.connect(self.on_error)
+        command_signals.status_update.connect(self.for_turn(turn, self.update_status))
+        command_signals.conversation_update.connect(self.for_turn(turn, self.update_conversation_log))
+        command_signals.speaking.connect(self.for_turn(turn, self.on_speaking))
+        command_signals.finished.connect(self.for_turn(turn, self.reset_button))
+        command_signals.error.connect(self.for_turn(turn, self.on_error))
         
-        command_worker = CommandWorker("recorded_audio.wav", command_signals, self.voice_config)
+        command_worker = CommandWorker(audio, command_signals, self.voice_config, transcriber, turn)
         self.thread_pool.start(command_worker)
 
+    def for_turn(self, turn, slot):
+        """Wraps slot so that it is skipped once the turn has been cancelled or replaced."""
+        def guarded(*args):
+            if turn is self.turn_context:
+                slot(*args)
+        return guarded
+
     def update_status(self, message):
         status_colors = {
             "🟢": "#4ecca3",
+            "👂": "#4ecca3",
+            "⏳": "#fbbf24",
             "🎤": "#00d4ff",
             "🧠": "#a78bfa",
             "🗣️": "#fbbf24",
@@ -425,6 +766,8 @@ class AssistantWindow(QMainWindow):
         """)
 
     def update_conversation_log(self, user_text, ai_text):
+        # A user line with no reply opens a streamed reply; the segments that
+        # follow (user_text == "") are appended to the same JARVIS line.
         if user_text:
             self.conversation_log.append(
                 f"<div style='margin: 10px 0;'>"
@@ -432,6 +775,15 @@ class AssistantWindow(QMainWindow):
                 f"<span style='color: #e0e0e0;'>{user_text}</span>"
                 f"</div>"
             )
+            self.reply_in_progress = not ai_text
+            self.reply_started = False
+        elif ai_text and self.reply_in_progress and self.reply_started:
+            cursor = self.conversation_log.textCursor()
+            cursor.movePosition(QTextCursor.End)
+            cursor.insertText(f" {ai_text}")
+            ai_text = ""
+        elif ai_text and self.reply_in_progress:
+            self.reply_started = True
         if ai_text:
             self.conversation_log.append(
                 f"<div style='margin: 10px 0;'>"
@@ -444,9 +796,29 @@ class AssistantWindow(QMainWindow):
         scrollbar.setValue(scrollbar.maximum())
 
     def reset_button(self):
+        finished, self.turn_context = self.turn_context, None
+        self.stop_barge_in_listening()
+        self.reply_in_progress = False
         self.listen_button.setEnabled(True)
         self.listen_button.setText("🎤 LISTEN")
         self.update_status("🟢 System Online - Ready for commands")
+        # Its tools may still be running; a failure is reported whenever it happens.
+        processing_logic.on_task_failures(finished, self.task_signals.task_failed.emit)
+        self.report_task_failures()
+        if self.hands_free_button.isChecked():
+            self.start_wake_listening()
+
+    def on_task_failed(self, apology):
+        self.pending_apologies.append(apology)
+        if self.turn_context is None:
+            self.report_task_failures()
+
+    def report_task_failures(self):
+        """Logs and speaks the apologies for failed tools that came in during a turn."""
+        apologies, self.pending_apologies = self.pending_apologies, []
+        for apology in apologies:
+            self.update_conversation_log("", apology)
+            self.thread_pool.start(QRunnable.create(lambda apology=apology: tts_player.speak(apology, **self.voice_config)))
         
     def on_error(self, error_tuple):
         e, message = error_tuple
@@ -455,6 +827,12 @@ class AssistantWindow(QMainWindow):
         self.update_conversation_log("", f"Sorry sir, an error occurred: {message}")
         self.reset_button()
 
+    def closeEvent(self, event):
+        # Don't leave a turn's ASR, LLM requests or playback running after the window is gone.
+        self.stop_wake_listening()
+        self.interrupt_turn("window closed")
+        super().closeEvent(event)
+
 
 if __name__ == "__main__":
     from dotenv import load_dotenv
@@ -0,0 +1,70 @@
+# model_manager.py
+# Loads heavy models on a background thread so the GUI can open immediately.
+
+import threading
+import time
+from concurrent.futures import Future
+
+IDLE = "idle"
+LOADING = "loading"
+WARMING = "warming up"
+READY = "ready"
+FAILED = "failed"
+
+
+class ModelManager:
+    """
+    Owns one lazily loaded model.
+
+    start() kicks off loading (and an optional warm-up call) on a daemon
+    thread and returns immediately. Callers that need the model call get(),
+    which waits on the readiness future instead of blocking at import time.
+    """
+
+    def __init__(self, name, loader, warmup=None):
+        self.name = name
+        self.loader = loader
+        self.warmup = warmup
+        self.state = IDLE
+        self.load_time = None
+        self.ready = Future()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Starts loading in the background. Safe to call more than once."""
+        with self._lock:
+            if self.state != IDLE:
+                return self.ready
+            self.state = LOADING
+        threading.Thread(target=self._load, name=f"load-{self.name}", daemon=True).start()
+        return self.ready
+
+    def get(self, timeout=None):
+        """Returns the loaded model, waiting for (or starting) the load if needed."""
+        self.start()
+        if not self.ready.done():
+            print(f"⏳ Waiting for {self.name} to finish loading...")
+        return self.ready.result(timeout=timeout)
+
+    def is_ready(self):
+        return self.state == READY
+
+    def _load(self):
+        started = time.time()
+        try:
+            print(f"Loading {self.name} in the background...")
+            model = self.loader()
+
+            if self.warmup is not None:
+                self.state = WARMING
+                print(f"Warming up {self.name}...")
+                self.warmup(model)
+
+            self.load_time = time.time() - started
+            self.state = READY
+            print(f"✅ {self.name} ready ({self.load_time:.1f}s).")
+            self.ready.set_result(model)
+        except Exception as e:
+            self.state = FAILED
+            print(f"❌ Failed to load {self.name}: {e}")
+            self.ready.set_exception(e)
@@ -1,6 +1,15 @@
 import re
 import program_closer
 import opener_decision_maker
+from program_opener import registry
+
+def produces_data(command):
+    """True if the spoken reply depends on what the command returns."""
+    if re.search(r"\.exe$", command or ""):
+        return True
+    handler = registry.get(command)
+    # An unknown command, or one that can't run here, replies with an apology, so that has to be read out too.
+    return handler is None or handler.returns_data or not handler.available()
 
 def open_or_close(command, args=None):
     if args is None:
@@ -0,0 +1,194 @@
+# playback_engine.py
+# One output stream for the whole session, fed from a queue of in-memory PCM buffers.
+
+import collections
+import threading
+import time
+import numpy as np
+import sounddevice as sd
+
+SAMPLE_RATE = 24000   # edge-tts voices are 24 kHz; other rates are resampled on write
+BLOCK_SIZE = 480      # 20 ms per callback
+LEVEL_HISTORY = 50    # output levels kept for echo gating (barge_in.py), one per callback
+
+
+def resample(pcm, source_rate, target_rate):
+    """Linear-interpolation resampling (speech only, so this is plenty)."""
+    if source_rate == target_rate or not len(pcm):
+        return pcm
+    count = int(round(len(pcm) * target_rate / source_rate))
+    positions = np.arange(count) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(len(pcm)), pcm).astype(np.float32)
+
+
+class Playback:
+    """
+    One utterance on the engine. write() may be called while it is already
+    playing (streamed synthesis); close() says no more audio follows.
+    `started` is set when the first sample reaches the device and `done`
+    when the last one has (or after stop()).
+    """
+
+    def __init__(self, engine, requested_at=None):
+        self.engine = engine
+        self.requested_at = requested_at or time.time()
+        self.started = threading.Event()
+        self.done = threading.Event()
+        self.start_latency = None
+        self.underruns = 0
+        self._buffers = collections.deque()
+        self._offset = 0
+        self._closed = False
+        self._stopped = False
+
+    @property
+    def stopped(self):
+        return self._stopped
+
+    def write(self, pcm, sample_rate):
+        if self._stopped:
+            return
+        pcm = np.asarray(pcm, dtype=np.float32)
+        if pcm.ndim > 1:
+            pcm = pcm.mean(axis=1)
+        pcm = resample(pcm, sample_rate, self.engine.sample_rate)
+        if len(pcm):
+            self._buffers.append(np.ascontiguousarray(pcm))
+
+    def close(self):
+        self._closed = True
+
+    def stop(self):
+        """Drops whatever hasn't been played yet."""
+        self._stopped = True
+        self._closed = True
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+    def _finish(self):
+        self._buffers.clear()
+        self.done.set()
+
+
+class PlaybackEngine:
+    """
+    Keeps one sd.OutputStream open and plays queued Playback objects back
+    to back from its callback; between them the stream outputs silence.
+    Nothing is opened, decoded or polled per utterance.
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, block_size=BLOCK_SIZE):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self._queue = collections.deque()
+        self._stream = None
+        self._lock = threading.Lock()
+        self.output_latency = 0.0
+        self.latencies = collections.deque(maxlen=50)
+        self.levels = collections.deque(maxlen=LEVEL_HISTORY)   # (time, RMS) of recent output blocks
+
+    def start(self):
+        """Opens the output stream if it isn't running. Returns self."""
+        with self._lock:
+            if self._stream is not None and self._stream.active:
+                return self
+            if self._stream is not None:
+                self._stream.close()
+            self._stream = sd.OutputStream(
+                samplerate=self.sample_rate,
+                channels=1,
+                dtype="float32",
+                blocksize=self.block_size,
+                latency="low",
+                callback=self._callback
+            )
+            self._stream.start()
+            self.output_latency = float(self._stream.latency)
+        return self
+
+    def close(self):
+        self.stop_all()
+        with self._lock:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+
+    def open(self, requested_at=None):
+        """A new Playback queued behind the current ones; write() to it, then close()."""
+        self.start()
+        playback = Playback(self, requested_at)
+        self._queue.append(playback)
+        return playback
+
+    def play(self, pcm, sample_rate, requested_at=None):
+        playback = self.open(requested_at)
+        playback.write(pcm, sample_rate)
+        playback.close()
+        return playback
+
+    def stop_all(self):
+        for playback in list(self._queue):
+            playback.stop()
+
+    def is_playing(self):
+        return any(p.started.is_set() and not p.done.is_set() for p in list(self._queue))
+
+    def output_level(self, window):
+        """
+        RMS of the loudest output block sent within the last `window` seconds
+        plus the device's output latency (i.e. what may still be audible now).
+        """
+        since = time.monotonic() - window - self.output_latency
+        return max((level for at, level in list(self.levels) if at >= since), default=0.0)
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        return {
+            "playbacks": len(latencies),
+            "start_latency_p50": latencies[len(latencies) // 2] if latencies else None,
+            "output_latency": self.output_latency,
+        }
+
+    def _callback(self, outdata, frames, time_info, status):
+        out = outdata[:, 0]
+        filled = 0
+        while filled < frames and self._queue:
+            playback = self._queue[0]
+            if playback._stopped or (playback._closed and not playback._buffers):
+                playback._finish()
+                self._queue.popleft()
+                continue
+            if not playback._buffers:
+                # The synthesizer hasn't caught up; keep the stream running on silence.
+                if playback.started.is_set():
+                    playback.underruns += 1
+                break
+            buffer = playback._buffers[0]
+            count = min(frames - filled, len(buffer) - playback._offset)
+            out[filled:filled + count] = buffer[playback._offset:playback._offset + count]
+            if not playback.started.is_set():
+                # Time until the first sample is audible: queueing plus the device's own latency.
+                playback.start_latency = time.time() - playback.requested_at + self.output_latency
+                self.latencies.append(playback.start_latency)
+                playback.started.set()
+            playback._offset += count
+            filled += count
+            if playback._offset >= len(buffer):
+                playback._buffers.popleft()
+                playback._offset = 0
+        out[filled:] = 0
+        self.levels.append((time.monotonic(), float(np.sqrt(np.dot(out, out) / len(out))) if filled else 0.0))
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """The shared PlaybackEngine, created on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = PlaybackEngine()
+        return _engine
@@ -1,5 +1,12 @@
 import psutil
 
+# Programs the assistant offers to close (process name -> spoken name); listed in the LLM prompt.
+KNOWN_PROCESSES = {
+    "chrome.exe": "Google Chrome",
+    "calculator.exe": "Calculator",
+    "notepad.exe": "Notepad",
+}
+
 def kill_program(program_name):
     response = ""
     found = False
@@ -1,23 +1,44 @@
-from .utils import run_os_command
+from .utils import Alternatives, run_os_command
+from .capabilities import resolve
+from .registry import command
+from .window_wait import focused_window_title, type_text, wait_until_ready
+import shlex
 import urllib.parse
-import pyautogui  
 import time
 
 # Define cross-platform commands
 CMD_NOTEPAD = {
     "windows": "start notepad",
     "darwin": "open -a TextEdit",
-    "linux": "gedit" # 'gedit' or 'kate' or 'xdg-open' for default
+    "linux": Alternatives("gedit", "gnome-text-editor", "kate", "mousepad", "xed")
+}
+# How to recognise each CMD_NOTEPAD entry once it is up (focused window title /
+# process name), keyed by the command as written there.
+NOTEPAD_WINDOW = {
+    "start notepad": {"titles": ["Notepad"], "processes": ["notepad.exe"]},
+    "open -a TextEdit": {"titles": ["TextEdit"], "processes": ["TextEdit"]},
+    "gedit": {"titles": ["gedit", "Untitled Document"], "processes": ["gedit"]},
+    "gnome-text-editor": {"titles": ["Text Editor"], "processes": ["gnome-text-editor"]},
+    "kate": {"titles": ["Kate"], "processes": ["kate"]},
+    "mousepad": {"titles": ["Mousepad"], "processes": ["mousepad"]},
+    "xed": {"titles": ["xed"], "processes": ["xed"]},
 }
 CMD_CHROME = {
     "windows": "start chrome",
     "darwin": "open -a 'Google Chrome'",
-    "linux": "google-chrome" # or 'chromium-browser'
+    "linux": Alternatives("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "firefox")
+}
+# A URL can also be handed to the desktop's default browser when none of the above is installed.
+CMD_BROWSE_URL = {
+    "windows": "start chrome",
+    "darwin": "open -a 'Google Chrome'",
+    "linux": Alternatives("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "firefox",
+                          "xdg-open")
 }
 CMD_CALCULATOR = {
     "windows": "start calc",
     "darwin": "open -a Calculator",
-    "linux": "gnome-calculator" # or 'kcalc'
+    "linux": Alternatives("gnome-calculator", "kcalc", "galculator", "qalculate-gtk")
 }
 CMD_FILE_EXPLORER = {
     "windows": "start explorer",
@@ -27,38 +48,50 @@ CMD_FILE_EXPLORER = {
 CMD_CMD = {
     "windows": "start cmd",
     "darwin": "open -a Terminal",
-    "linux": "gnome-terminal" # or 'konsole'
+    "linux": Alternatives("gnome-terminal", "konsole", "xfce4-terminal", "x-terminal-emulator", "xterm")
 }
 CMD_TASK_MANAGER = {
     "windows": "start taskmgr",
     "darwin": "open -a 'Activity Monitor'",
-    "linux": "gnome-system-monitor"
+    "linux": Alternatives("gnome-system-monitor", "plasma-systemmonitor", "ksysguard", "xfce4-taskmanager")
 }
 CMD_MEDIA_PLAYER = {
     "windows": "start wmplayer",
     "darwin": "open -a 'Music'", # or QuickTime Player
-    "linux": "rhythmbox" # or vlc
+    "linux": Alternatives("rhythmbox", "vlc", "totem", "celluloid")
 }
 CMD_CONTROL_PANEL = {
     "windows": "control",
     "darwin": "open -a 'System Settings'",
-    "linux": "gnome-control-center"
+    "linux": Alternatives("gnome-control-center", "systemsettings", "xfce4-settings-manager")
 }
 CMD_SETTINGS = {
     "windows": "start ms-settings:",
     "darwin": "open -a 'System Settings'",
-    "linux": "gnome-control-center"
+    "linux": Alternatives("gnome-control-center", "systemsettings", "xfce4-settings-manager")
 }
 
+def notepad_window():
+    """The NOTEPAD_WINDOW entry of the editor CMD_NOTEPAD resolved to on this machine."""
+    argv = resolve(CMD_NOTEPAD)
+    return NOTEPAD_WINDOW.get(shlex.join(argv), {}) if argv else {}
+
+@command(args=("text",), missing_args_reply="Please tell me what to write.",
+         after=("open_notepad",), resource="keyboard", requires=(CMD_NOTEPAD,))
 def write_in_notepad(text: str):
-    """Opens a text editor and types the given text into it."""
+    """Opens a text editor and types the given text into it as soon as it has focus."""
+    previous_title = focused_window_title()
+    launched_at = time.time()
     run_os_command(CMD_NOTEPAD)
-    time.sleep(2) # Wait for app to focus
-    pyautogui.typewrite(text)
+    wait_until_ready(notepad_window(), previous_title, launched_at)
+    print(f"Editor ready after {time.time() - launched_at:.2f}s")
+    type_text(text)
 
+@command(requires=(CMD_CHROME,))
 def open_google_chrome():
     run_os_command(CMD_CHROME)
 
+@command(group="web", args=("query",), after=("enable_wifi",), requires=(CMD_BROWSE_URL,))
 def google_search(query: str):
     """Opens Google Chrome and searches for the given query."""
     if not query:
@@ -68,28 +101,36 @@ def google_search(query: str):
     search_url = f"https://www.google.com/search?q={urllib.parse.quote_plus(query)}"
     
     # We need to pass the URL as an argument to the base command
-    run_os_command(CMD_CHROME, search_url)
+    run_os_command(CMD_BROWSE_URL, search_url)
     
+@command(requires=(CMD_NOTEPAD,))
 def open_notepad():
     run_os_command(CMD_NOTEPAD)
 
+@command(requires=(CMD_CALCULATOR,))
 def open_calculator():
     run_os_command(CMD_CALCULATOR)
 
+@command(requires=(CMD_FILE_EXPLORER,))
 def open_file_explorer():
     run_os_command(CMD_FILE_EXPLORER)
 
+@command(requires=(CMD_CMD,))
 def open_cmd():
     run_os_command(CMD_CMD)
 
+@command(requires=(CMD_TASK_MANAGER,))
 def open_task_manager():
     run_os_command(CMD_TASK_MANAGER)
 
+@command(requires=(CMD_MEDIA_PLAYER,))
 def open_windows_media_player():
     run_os_command(CMD_MEDIA_PLAYER)
 
+@command(requires=(CMD_CONTROL_PANEL,))
 def open_control_panel():
     run_os_command(CMD_CONTROL_PANEL)
 
+@command(requires=(CMD_SETTINGS,))
 def open_settings():
     run_os_command(CMD_SETTINGS)
\ No newline at end of file
@@ -0,0 +1,102 @@
+# capabilities.py
+# Probes every CMD_* table once, resolves it to an installed argv and caches the result.
+
+import os
+import shlex
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .utils import Alternatives, get_os
+
+PROBE_WORKERS = 8
+
+# Where `open -a <App>` looks on macOS.
+MAC_APP_DIRS = [
+    "/Applications",
+    "/Applications/Utilities",
+    "/System/Applications",
+    "/System/Applications/Utilities",
+    os.path.expanduser("~/Applications"),
+]
+
+_resolved = {}   # id(table) -> argv list, or None if nothing in its chain is installed
+_lock = threading.Lock()
+
+
+def _candidates(command_dict, os_name):
+    value = command_dict.get(os_name)
+    if not value:
+        return []
+    return list(value) if isinstance(value, Alternatives) else [value]
+
+
+def _argv(command):
+    return shlex.split(command) if isinstance(command, str) else list(command)
+
+
+def is_installed(argv, os_name):
+    """Whether the executable behind argv exists on this machine (nothing is run)."""
+    executable = argv[0]
+    if os_name == "windows" and executable == "start":
+        return True  # the shell resolves it (App Paths, URI handlers like ms-settings:)
+    if executable == "sudo" and len(argv) > 1:
+        executable = argv[1]
+    if os_name == "darwin" and executable == "open" and "-a" in argv[:-1]:
+        app = argv[argv.index("-a") + 1]
+        return any(os.path.exists(os.path.join(d, app + ".app")) for d in MAC_APP_DIRS)
+    return shutil.which(executable) is not None
+
+
+def _probe(command_dict, os_name):
+    for command in _candidates(command_dict, os_name):
+        argv = _argv(command)
+        if argv and is_installed(argv, os_name):
+            return argv
+    return None
+
+
+def resolve(command_dict):
+    """
+    The argv to run for a CMD_* table on this OS: the first installed entry
+    of its fallback chain, or None. Probed once; returns a fresh copy.
+    """
+    key = id(command_dict)
+    with _lock:
+        if key in _resolved:
+            argv = _resolved[key]
+            return list(argv) if argv else None
+    argv = _probe(command_dict, get_os())
+    with _lock:
+        _resolved[key] = argv
+    return list(argv) if argv else None
+
+
+def is_available(command_dict):
+    return resolve(command_dict) is not None
+
+
+def command_tables():
+    """Every CMD_* table in the handler modules, as {"module.CMD_NAME": table}."""
+    from . import app, system, power
+    tables = {}
+    for module in (app, system, power):
+        for name, value in vars(module).items():
+            if name.startswith("CMD_") and isinstance(value, dict):
+                tables[f"{module.__name__.rsplit('.', 1)[-1]}.{name}"] = value
+    return tables
+
+
+def probe_all():
+    """
+    Resolves every table in parallel (once; later calls hit the cache) and
+    returns {name: argv or None}.
+    """
+    started = time.time()
+    tables = command_tables()
+    with ThreadPoolExecutor(max_workers=PROBE_WORKERS, thread_name_prefix="probe") as pool:
+        resolved = dict(zip(tables, pool.map(resolve, tables.values())))
+    missing = sorted(name for name, argv in resolved.items() if argv is None)
+    print(f"Probed {len(resolved)} commands in {time.time() - started:.2f}s"
+          + (f"; not installed: {', '.join(missing)}" if missing else ""))
+    return resolved
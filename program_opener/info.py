@@ -1,5 +1,7 @@
 import datetime
+from .registry import command
 
+@command("get_time", group="info", returns_data=True, side_effect_free=True)
 def get_current_time():
     """Gets the current time in a user-friendly format."""
     now = datetime.datetime.now()
@@ -1,35 +1,181 @@
 import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from .registry import command
 
-def get_news(topic: str):
-    load_dotenv()
+load_dotenv()
+
+NEWS_API_URL = "https://newsapi.org/v2/everything"
+REQUEST_TIMEOUT = (3.05, 5.0)  # (connect, read) seconds
+CACHE_TTL = 10 * 60            # headlines per topic are reused for this long
+PAGE_SIZE = 3                  # only ask for the headlines we read out
+MAX_WORKERS = 4
+
+# Topics to keep warm in the background (e.g. ["cricket", "technology"]); empty disables prefetch.
+PREFETCH_TOPICS = []
+PREFETCH_INTERVAL = CACHE_TTL - 60
+
+
+class NewsError(Exception):
+    """The news service could not be reached or answered with an error."""
+
+
+class NewsService:
     """
-    Fetches and formats the top 3 news headlines for a given topic.
+    Fetches headlines from NewsAPI over one pooled session, with strict
+    timeouts and a per-topic TTL cache. Several topics are fetched
+    concurrently, and concurrent requests for the same topic share one fetch.
     """
-    API_KEY = os.getenv("NEWS_API_KEY")
-    # Use the 'everything' endpoint to search by topic (q=topic)
-    url = f'https://newsapi.org/v2/everything?qInTitle={topic}&apiKey={API_KEY}&language=en&sortBy=publishedAt'
-    
-    try:
-        response = requests.get(url)
-        response.raise_for_status() 
-        
-        news_data = response.json()
-        articles = news_data.get("articles", [])
-
-        if not articles:
+
+    def __init__(self, api_key=None, url=NEWS_API_URL, ttl=CACHE_TTL, timeout=REQUEST_TIMEOUT,
+                 page_size=PAGE_SIZE, session=None):
+        self.api_key = api_key or os.getenv("NEWS_API_KEY")
+        self.url = url
+        self.ttl = ttl
+        self.timeout = timeout
+        self.page_size = page_size
+        self.session = session or self._make_session()
+        self.hits = 0
+        self.misses = 0
+        self._cache = {}      # topic key -> (fetched_at, headlines)
+        self._inflight = {}   # topic key -> Future
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="news")
+        self._prefetch_thread = None
+
+    @staticmethod
+    def _make_session():
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=MAX_WORKERS, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @staticmethod
+    def _key(topic):
+        return " ".join(topic.lower().split())
+
+    def _fetch(self, topic):
+        params = {
+            "qInTitle": topic,
+            "language": "en",
+            "sortBy": "publishedAt",
+            "pageSize": self.page_size,
+        }
+        try:
+            # The key goes in a header so it never shows up in logged URLs.
+            response = self.session.get(self.url, params=params, headers={"X-Api-Key": self.api_key or ""},
+                                        timeout=self.timeout)
+            response.raise_for_status()
+            articles = response.json().get("articles", [])
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise NewsError(str(e)) from e
+        return [a["title"] for a in articles[:self.page_size] if a.get("title")]
+
+    def lookup(self, topic, refresh=False):
+        """
+        A Future for topic's headline titles: already done on a cache hit,
+        otherwise the fetch in flight for it (started if needed). refresh
+        skips the cache.
+        """
+        key = self._key(topic)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and not refresh and time.time() - cached[0] < self.ttl:
+                self.hits += 1
+                future = Future()
+                future.set_result(cached[1])
+                return future
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            self.misses += 1
+            future = self._executor.submit(self._fetch, topic)
+            self._inflight[key] = future
+        # Outside the lock: if the fetch already failed (e.g. connection refused),
+        # the callback runs right here and _store takes the lock itself.
+        future.add_done_callback(lambda f, key=key: self._store(key, f))
+        return future
+
+    def headlines(self, topic):
+        """Up to page_size headline titles for topic, from the cache while fresh. Raises NewsError."""
+        return self.lookup(topic).result()
+
+    def _store(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            if future.exception() is None:
+                self._cache[key] = (time.time(), future.result())
+
+    def get_news(self, topic, *topics):
+        """
+        Formatted top headlines for one or more topics (fetched concurrently),
+        in the same wording the assistant has always read out.
+        """
+        topics = [t for t in (topic,) + topics if t]
+        lookups = [(t, self.lookup(t)) for t in topics]
+        return " ".join(self._format(t, future) for t, future in lookups)
+
+    @staticmethod
+    def _format(topic, future):
+        try:
+            titles = future.result()
+        except NewsError as e:
+            print(f"Error connecting to News API: {e}")
+            return "Sorry, I'm having trouble connecting to the news service right now."
+        except Exception as e:
+            print(f"An unexpected error occurred: {e}")
+            return "An unexpected error occurred while fetching the news."
+
+        if not titles:
             return f"Sorry, I couldn't find any recent news headlines about {topic}."
+        headlines = [f"{i+1}. {title}" for i, title in enumerate(titles)]
+        return f"Here are the top headlines on {topic}: {' '.join(headlines)}"
+
+    def prefetch(self, topics):
+        """Refreshes the cache for topics in the background. Returns the futures."""
+        return [self.lookup(topic, refresh=True) for topic in topics]
+
+    def start_prefetch(self, topics=None, interval=PREFETCH_INTERVAL):
+        """Keeps the given (or configured) topics fresh from a daemon thread."""
+        topics = list(topics if topics is not None else PREFETCH_TOPICS)
+        if not topics or self._prefetch_thread is not None:
+            return
+        def loop():
+            while True:
+                for future in self.prefetch(topics):
+                    if future.exception() is not None:
+                        print(f"News prefetch failed: {future.exception()}")
+                time.sleep(interval)
+        self._prefetch_thread = threading.Thread(target=loop, name="news-prefetch", daemon=True)
+        self._prefetch_thread.start()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "topics": len(self._cache)}
+
 
-        # Format the top 3 headlines into a single, clean string
-        headlines = [f"{i+1}. {article['title']}" for i, article in enumerate(articles[:3])]
-        formatted_news = f"Here are the top headlines on {topic}: {' '.join(headlines)}"
-        
-        return formatted_news
-
-    except requests.exceptions.RequestException as e:
-        print(f"Error connecting to News API: {e}")
-        return "Sorry, I'm having trouble connecting to the news service right now."
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        return "An unexpected error occurred while fetching the news."
\ No newline at end of file
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service():
+    """The shared NewsService, created on first use."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = NewsService()
+        return _service
+
+
+@command(group="info", args=("topic", "*topics"), returns_data=True, side_effect_free=True,
+         missing_args_reply="Please specify a topic for the news.", after=("enable_wifi",))
+def get_news(topic: str, *topics: str):
+    """
+    Fetches and formats the top 3 news headlines for each given topic.
+    """
+    return get_service().get_news(topic, *topics)
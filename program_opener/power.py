@@ -1,4 +1,5 @@
 from .utils import run_os_command
+from .registry import command
 
 CMD_SHUTDOWN = {
     "windows": "shutdown /s /t 1",
@@ -22,16 +23,20 @@ CMD_SIGN_OUT = {
 }
 
 
+@command(group="power", barrier=True, requires=(CMD_SHUTDOWN,))
 def shutdown_system():
     print("Executing shutdown. May require admin privileges (sudo) on Linux/macOS.")
     run_os_command(CMD_SHUTDOWN)
 
+@command(group="power", barrier=True, requires=(CMD_RESTART,))
 def restart_system():
     print("Executing restart. May require admin privileges (sudo) on Linux/macOS.")
     run_os_command(CMD_RESTART)
 
+@command(group="power", barrier=True, requires=(CMD_LOCK,))
 def lock_screen():
     run_os_command(CMD_LOCK)
 
+@command(group="power", barrier=True, requires=(CMD_SIGN_OUT,))
 def sign_out():
     run_os_command(CMD_SIGN_OUT)
\ No newline at end of file
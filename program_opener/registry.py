@@ -0,0 +1,138 @@
+# registry.py
+# Table of every command the assistant can run: dispatch, metadata and the LLM prompt list.
+
+# name -> Command. Filled in by the @command decorators in app/system/power/info/news.
+COMMANDS = {}
+
+# Order (and labels) of the groups in the generated prompt list.
+GROUPS = [
+    ("apps", "Apps"),
+    ("system", "System"),
+    ("power", "Power"),
+    ("web", "Web search"),
+    ("info", "Info"),
+]
+
+
+class Command:
+    """
+    One dispatchable command.
+
+    args is the argument schema: a tuple of argument names, passed to the
+    handler positionally from the task's "args" list (a last name starting
+    with "*" takes any further arguments). returns_data marks
+    commands whose result has to be read out; side_effect_free ones only
+    read state and are safe to run speculatively or in parallel.
+
+    The scheduling hints are used by task_scheduler: `after` names commands
+    that must finish first when they come earlier in the same request,
+    commands sharing a `resource` (e.g. the keyboard) never run at the same
+    time, and a `barrier` command waits for everything before it and
+    holds back everything after it.
+
+    requires lists the CMD_* tables the handler runs; the command is only
+    offered (to the prompt and the intent matcher) if all of them resolve
+    to something installed on this machine.
+    """
+
+    def __init__(self, name, handler, group, args=(), returns_data=False,
+                 side_effect_free=False, missing_args_reply=None,
+                 after=(), resource=None, barrier=False, requires=()):
+        self.name = name
+        self.handler = handler
+        self.group = group
+        self.args = tuple(args)
+        self.returns_data = returns_data
+        self.side_effect_free = side_effect_free
+        self.missing_args_reply = missing_args_reply
+        self.after = tuple(after)
+        self.resource = resource
+        self.barrier = barrier
+        self.requires = tuple(requires)
+
+    def available(self):
+        from .capabilities import is_available
+        return all(is_available(table) for table in self.requires)
+
+    def __call__(self, args=None):
+        if not self.available():
+            print(f"{self.name} is not available on this system.")
+            return "Sorry, that app isn't installed on this computer."
+        fixed = [a for a in self.args if not a.startswith("*")]
+        args = list(args or [])
+        if len(fixed) == len(self.args):
+            args = args[:len(fixed)]
+        if self.missing_args_reply and len([a for a in args[:len(fixed)] if a]) < len(fixed):
+            return self.missing_args_reply
+        args += [None] * (len(fixed) - len(args))
+        return self.handler(*args)
+
+    def signature(self):
+        """Compact prompt form: name, or name(arg, ...)."""
+        names = [a if not a.startswith("*") else "..." for a in self.args]
+        return f"{self.name}({', '.join(names)})" if self.args else self.name
+
+
+def command(name=None, group="apps", args=(), returns_data=False,
+            side_effect_free=False, missing_args_reply=None,
+            after=(), resource=None, barrier=False, requires=()):
+    """Decorator that registers a handler function under `name` (default: its own name)."""
+    def register(handler):
+        key = name or handler.__name__
+        COMMANDS[key] = Command(key, handler, group, args, returns_data,
+                                side_effect_free, missing_args_reply,
+                                after, resource, barrier, requires)
+        return handler
+    return register
+
+
+def load():
+    """Imports every handler module so their commands are registered. Returns COMMANDS."""
+    from . import app, system, power, info, news  # noqa: F401
+    return COMMANDS
+
+
+def get(name):
+    return load().get(name)
+
+
+_available = None
+
+
+def available_commands():
+    """
+    Names of the commands that can run here. The first call probes every
+    CMD_* table (in parallel); the result is cached for the session.
+    """
+    global _available
+    if _available is None:
+        from .capabilities import probe_all
+        commands = load()
+        probe_all()
+        _available = frozenset(name for name, c in commands.items() if c.available())
+    return _available
+
+
+def dispatch(name, args=None):
+    """Runs a registered command. Raises KeyError for unknown names."""
+    return load()[name](args)
+
+
+def prompt_command_list(closable=None):
+    """
+    The "Supported commands" section of the get_command prompt, generated
+    from the registry: one line per group listing the commands available
+    on this machine, plus the process names that can be closed
+    (closable: process name -> spoken name).
+    """
+    commands = load()
+    available = available_commands()
+    lines = []
+    for group, label in GROUPS:
+        names = [c.signature() for c in commands.values() if c.group == group and c.name in available]
+        if names:
+            lines.append(f"{label}: {', '.join(names)}")
+    if closable:
+        examples = ", ".join(f"{process} ({label})" for process, label in closable.items())
+        lines.append(f"Close an app: use its process name as the command, e.g. {examples}")
+    return "\n".join(lines)
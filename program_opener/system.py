@@ -1,5 +1,11 @@
 from .utils import run_os_command
-import pyautogui # Using pyautogui for media keys is the most reliable cross-OS method
+from .registry import command
+
+# Using pyautogui for media keys is the most reliable cross-OS method.
+# It needs a display, so it is imported on first use.
+def _press(key):
+    import pyautogui
+    pyautogui.press(key)
 
 # --- WiFi / Bluetooth ---
 # These are complex, admin-level tasks that vary wildly.
@@ -17,17 +23,21 @@ CMD_WIFI_ON = {
 }
 # Bluetooth is even less standardized. We'll skip implementation for now.
 
+@command(group="system", requires=(CMD_WIFI_OFF,))
 def disable_wifi():
     print("WARNING: Disabling WiFi. May require admin privileges.")
     run_os_command(CMD_WIFI_OFF)
 
+@command(group="system", requires=(CMD_WIFI_ON,))
 def enable_wifi():
     print("WARNING: Enabling WiFi. May require admin privileges.")
     run_os_command(CMD_WIFI_ON)
 
+@command(group="system")
 def disable_bluetooth():
     print("Bluetooth control is highly platform-specific and not implemented.")
 
+@command(group="system")
 def enable_bluetooth():
     print("Bluetooth control is highly platform-specific and not implemented.")
 
@@ -35,26 +45,32 @@ def enable_bluetooth():
 # Using pyautogui to press media keys is the simplest cross-platform solution.
 # This assumes the user has a keyboard with these keys.
 
+@command(group="system", resource="keyboard")
 def mute_volume():
-    pyautogui.press('volumemute')
+    _press('volumemute')
 
+@command(group="system", resource="keyboard")
 def unmute_volume():
-    pyautogui.press('volumemute') # Toggles
+    _press('volumemute') # Toggles
 
+@command(group="system", resource="keyboard")
 def increase_volume():
-    pyautogui.press('volumeup')
+    _press('volumeup')
 
+@command(group="system", resource="keyboard")
 def decrease_volume():
-    pyautogui.press('volumedown')
+    _press('volumedown')
 
+@command(group="system", resource="keyboard")
 def increase_brightness():
     try:
-        pyautogui.press('brightnessup')
+        _press('brightnessup')
     except Exception as e:
         print(f"Could not press brightness key: {e}")
 
+@command(group="system", resource="keyboard")
 def decrease_brightness():
     try:
-        pyautogui.press('brightnessdown')
+        _press('brightnessdown')
     except Exception as e:
         print(f"Could not press brightness key: {e}")
\ No newline at end of file
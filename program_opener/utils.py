@@ -1,8 +1,19 @@
+import functools
 import platform
 import subprocess
-import shlex
-import sys
 
+
+class Alternatives(tuple):
+    """
+    A fallback chain for one OS in a CMD_* table: the first command whose
+    executable is installed is used (see capabilities.py).
+    """
+
+    def __new__(cls, *commands):
+        return super().__new__(cls, commands)
+
+
+@functools.lru_cache(maxsize=None)
 def get_os():
     """Returns 'windows', 'linux', or 'darwin' (for macOS)."""
     system = platform.system().lower()
@@ -13,22 +24,20 @@ def run_os_command(command_dict, *args):
     Runs a command based on the detected OS.
     
     :param command_dict: A dict with keys 'windows', 'linux', 'darwin'.
-                         The value can be a string or a list of strings.
+                         The value can be a string, a list of strings (argv)
+                         or Alternatives(...) to fall back through.
     :param args: Additional arguments to be appended to the command.
     """
+    from .capabilities import resolve
+
     os_name = get_os()
-    command_base = command_dict.get(os_name)
+    # Probed and split once per table; a copy we can extend.
+    command_list = resolve(command_dict)
     
-    if not command_base:
-        print(f"No command specified for OS: {os_name}")
+    if not command_list:
+        print(f"No installed command for OS: {os_name}")
         return
         
-    # Ensure command_base is a list
-    if isinstance(command_base, str):
-        command_list = shlex.split(command_base)
-    else:
-        command_list = list(command_base) # Make a copy
-        
     # Add any extra arguments
     command_list.extend(args)
     
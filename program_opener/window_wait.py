@@ -0,0 +1,171 @@
+# window_wait.py
+# Waits for a launched app to be ready for input, and pastes text through the clipboard.
+
+import os
+import shutil
+import subprocess
+import time
+from .utils import get_os
+
+READY_TIMEOUT = 10.0   # give up waiting (and type anyway) after this long
+POLL_INTERVAL = 0.05
+SETTLE_TIME = 0.4      # an already-focused window still gets this long to take the new document
+PROCESS_SETTLE = 0.8   # without focus information: time between process start and a usable window
+PASTE_MIN_CHARS = 40   # longer text (or any non-ASCII text) is pasted instead of typed
+CLIPBOARD_RESTORE_DELAY = 0.3   # the app reads the clipboard after the paste keystroke, so restore it later
+
+
+def focused_window_title():
+    """
+    Title (or, on macOS, app name) of the focused window, or None if it
+    can't be determined on this system (e.g. Wayland without xdotool).
+    """
+    os_name = get_os()
+    try:
+        if os_name == "windows":
+            import ctypes
+            user32 = ctypes.windll.user32
+            hwnd = user32.GetForegroundWindow()
+            length = user32.GetWindowTextLengthW(hwnd)
+            buffer = ctypes.create_unicode_buffer(length + 1)
+            user32.GetWindowTextW(hwnd, buffer, length + 1)
+            return buffer.value
+        if os_name == "darwin":
+            script = 'tell application "System Events" to get name of first application process whose frontmost is true'
+            return subprocess.run(["osascript", "-e", script], capture_output=True, text=True, timeout=1).stdout.strip()
+        if os_name == "linux" and os.environ.get("DISPLAY") and shutil.which("xdotool"):
+            return subprocess.run(["xdotool", "getactivewindow", "getwindowname"],
+                                  capture_output=True, text=True, timeout=1).stdout.strip()
+    except Exception as e:
+        print(f"Could not read the focused window: {e}")
+    return None
+
+
+def running_processes(names):
+    """Start times of running processes whose name matches one of names (case-insensitive)."""
+    import psutil
+    wanted = [n.lower() for n in names]
+    started = []
+    for proc in psutil.process_iter(["name", "create_time"]):
+        name = (proc.info["name"] or "").lower()
+        if any(w == name or name.startswith(w) for w in wanted):
+            started.append(proc.info["create_time"] or 0.0)
+    return started
+
+
+def wait_until_ready(window, previous_title=None, launched_at=None, timeout=READY_TIMEOUT,
+                     get_focused_title=focused_window_title, list_processes=running_processes):
+    """
+    Polls until the app described by `window` (a {"titles": [...],
+    "processes": [...]} entry for this OS) can take keyboard input.
+
+    Ready means a matching window is focused: at once if its title differs
+    from `previous_title` (the focused title before the launch, i.e. a new
+    window), otherwise after SETTLE_TIME (an editor that was already open).
+    Where the focused window can't be read, a matching process that has
+    been running for PROCESS_SETTLE is enough. Returns True when ready,
+    False on timeout. The probes can be replaced for testing.
+    """
+    launched_at = launched_at or time.time()
+    titles = [t.lower() for t in window.get("titles", [])]
+    processes = window.get("processes", [])
+    deadline = launched_at + timeout
+
+    title = get_focused_title()
+    focus_readable = title is not None
+    while True:
+        now = time.time()
+        if focus_readable:
+            if title and any(t in title.lower() for t in titles):
+                if title != previous_title or now - launched_at >= SETTLE_TIME:
+                    return True
+        elif processes:
+            started = list_processes(processes)
+            if started and now - max(min(started), launched_at) >= PROCESS_SETTLE:
+                return True
+        elif now - launched_at >= SETTLE_TIME:
+            return True
+        if now >= deadline:
+            print(f"App not ready after {timeout:.1f}s; typing anyway.")
+            return False
+        time.sleep(POLL_INTERVAL)
+        if focus_readable:
+            title = get_focused_title()
+
+
+# Clipboard writers per OS, tried in order. Each reads the text from stdin.
+CLIPBOARD_COMMANDS = {
+    "windows": [(["clip"], "utf-16")],
+    "darwin": [(["pbcopy"], "utf-8")],
+    "linux": [
+        (["wl-copy"], "utf-8"),
+        (["xclip", "-selection", "clipboard"], "utf-8"),
+        (["xsel", "--clipboard", "--input"], "utf-8"),
+    ],
+}
+
+
+# Clipboard readers per OS, tried in order. Each writes the text to stdout.
+CLIPBOARD_READERS = {
+    "windows": [(["powershell", "-NoProfile", "-Command", "Get-Clipboard -Raw"], "utf-8")],
+    "darwin": [(["pbpaste"], "utf-8")],
+    "linux": [
+        (["wl-paste", "--no-newline"], "utf-8"),
+        (["xclip", "-selection", "clipboard", "-o"], "utf-8"),
+        (["xsel", "--clipboard", "--output"], "utf-8"),
+    ],
+}
+
+
+def _clipboard_tools(table):
+    """The (command, encoding) entries of table that can run on this system."""
+    for command, encoding in table.get(get_os(), []):
+        if command[0].startswith("wl-") and not os.environ.get("WAYLAND_DISPLAY"):
+            continue
+        if shutil.which(command[0]):
+            yield command, encoding
+
+
+def read_clipboard():
+    """Text currently on the system clipboard, or None if it can't be read (or isn't text)."""
+    for command, encoding in _clipboard_tools(CLIPBOARD_READERS):
+        try:
+            completed = subprocess.run(command, capture_output=True, check=True, timeout=2)
+            return completed.stdout.decode(encoding)
+        except Exception as e:
+            print(f"Clipboard read with {command[0]} failed: {e}")
+    return None
+
+
+def copy_to_clipboard(text):
+    """Puts text on the system clipboard. Returns False if no clipboard tool is available."""
+    os_name = get_os()
+    for command, encoding in _clipboard_tools(CLIPBOARD_COMMANDS):
+        try:
+            subprocess.run(command, input=text.encode(encoding), check=True, timeout=2,
+                           shell=(os_name == "windows"))
+            return True
+        except Exception as e:
+            print(f"Clipboard copy with {command[0]} failed: {e}")
+    return False
+
+
+def type_text(text, keyboard=None):
+    """
+    Types text into the focused window: short ASCII text key by key, longer
+    or non-ASCII text with one clipboard paste. The user's clipboard text is
+    put back after the paste. Falls back to typing if the clipboard can't be
+    used.
+    """
+    if keyboard is None:
+        import pyautogui as keyboard  # needs a display; imported on first use
+    if len(text) >= PASTE_MIN_CHARS or not text.isascii():
+        saved = read_clipboard()
+        if copy_to_clipboard(text):
+            keyboard.hotkey("command" if get_os() == "darwin" else "ctrl", "v")
+            if saved is not None:
+                time.sleep(CLIPBOARD_RESTORE_DELAY)
+                copy_to_clipboard(saved)
+            return "paste"
+    keyboard.typewrite(text)
+    return "type"
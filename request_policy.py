@@ -0,0 +1,143 @@
+# request_policy.py
+# Latency-aware policies for LLM calls: rolling percentiles, hedging delay and a circuit breaker.
+
+import threading
+import time
+from collections import deque
+
+LATENCY_WINDOW = 50        # most recent successful calls kept per operation
+MIN_SAMPLES = 8            # below this we don't trust the percentile and never hedge
+HEDGE_PERCENTILE = 95
+MIN_HEDGE_DELAY = 0.3      # never fire a duplicate sooner than this (seconds)
+
+FAILURE_THRESHOLD = 3      # consecutive failures that open the breaker
+RESET_TIMEOUT = 30.0       # seconds the breaker stays open before letting one trial call through
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class LatencyTracker:
+    """Rolling window of call latencies with nearest-rank percentiles."""
+
+    def __init__(self, window=LATENCY_WINDOW, min_samples=MIN_SAMPLES):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p):
+        """The p-th percentile of the window, or None until min_samples calls were seen."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < self.min_samples:
+            return None
+        rank = max(0, min(len(samples) - 1, int(round(p / 100.0 * len(samples))) - 1))
+        return samples[rank]
+
+    def count(self):
+        with self._lock:
+            return len(self._samples)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures. While open, allow()
+    is False; after `reset_timeout` seconds one trial call is let through
+    (half-open) and its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.time() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.time()
+                self._trial_in_flight = False
+
+    def record_abandoned(self):
+        """A call that ended without an outcome (e.g. cancelled by a newer turn)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class RequestPolicy:
+    """Latency tracker + circuit breaker for one kind of LLM call."""
+
+    def __init__(self, name, hedge=True, hedge_percentile=HEDGE_PERCENTILE,
+                 tracker=None, breaker=None):
+        self.name = name
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.latency = tracker or LatencyTracker()
+        self.breaker = breaker or CircuitBreaker()
+        self.fallbacks = 0
+
+    def allow(self):
+        return self.breaker.allow()
+
+    def hedge_delay(self, timeout=None):
+        """
+        How long to wait before sending a duplicate request: the rolling p95,
+        or None (no hedging) until there is enough history.
+        """
+        if not self.hedge:
+            return None
+        p = self.latency.percentile(self.hedge_percentile)
+        if p is None:
+            return None
+        delay = max(MIN_HEDGE_DELAY, p)
+        if timeout is not None and delay >= timeout / 2:
+            return None
+        return delay
+
+    def succeeded(self, seconds):
+        self.latency.record(seconds)
+        self.breaker.record_success()
+
+    def failed(self):
+        self.breaker.record_failure()
+
+    def abandoned(self):
+        self.breaker.record_abandoned()
+
+    def stats(self):
+        return {
+            "state": self.breaker.state,
+            "failures": self.breaker.failures,
+            "samples": self.latency.count(),
+            "p50": self.latency.percentile(50),
+            "p95": self.latency.percentile(95),
+            "fallbacks": self.fallbacks,
+        }
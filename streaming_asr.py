@@ -0,0 +1,187 @@
+# streaming_asr.py
+# Incremental transcription that runs while the user is still speaking.
+
+import threading
+import time
+import numpy as np
+import turn_context
+
+SAMPLE_RATE = 16000
+DECODE_INTERVAL = 0.75     # seconds between background decodes
+MIN_SEGMENT_DURATION = 1.0 # never commit a segment shorter than this
+MAX_WINDOW_DURATION = 8.0  # force a cut once the open window gets this long
+MIN_NEW_AUDIO = 0.5        # only refresh the partial after this much new audio
+
+
+class StreamingTranscriber:
+    """
+    Decodes the live recording in growing windows on a background thread.
+
+    The recorder calls feed() for every block it keeps and mark_pause() when
+    the speaker pauses. Audio up to a pause is decoded once and committed; the
+    open window after the last commit is re-decoded to keep a partial
+    transcript. When the endpoint fires, finish() only has to decode the tail
+    after the last commit (or nothing, if the last partial already covers it).
+
+    transcribe_fn is called as transcribe_fn(audio, context); cancel() cancels
+    that context, so a decode in progress stops early and nothing more is
+    decoded.
+    """
+
+    def __init__(self, transcribe_fn, on_partial=None, sample_rate=SAMPLE_RATE):
+        self.transcribe_fn = transcribe_fn
+        self.on_partial = on_partial
+        self.sample_rate = sample_rate
+
+        self._lock = threading.Lock()
+        self._blocks = []
+        self._block_ends = []       # cumulative sample count after each block
+        self._pause_blocks = []     # block indices where a pause started
+        self._commit_block = 0      # first block not yet committed
+        self._committed = []
+
+        self._partial_text = ""
+        self._partial_end_block = 0
+        self._previous_partial = ""
+
+        self._stop = threading.Event()
+        self._worker = None
+        self.context = turn_context.TurnContext("streaming transcription")
+
+    # --- Recorder side (called from the audio callback, must stay cheap) ---
+
+    def feed(self, block):
+        """Adds a captured block. The caller must pass a copy it owns."""
+        with self._lock:
+            total = self._block_ends[-1] if self._block_ends else 0
+            self._blocks.append(block)
+            self._block_ends.append(total + len(block))
+
+    def mark_pause(self):
+        """Records that the speaker paused after the last fed block."""
+        with self._lock:
+            if self._blocks:
+                self._pause_blocks.append(len(self._blocks))
+
+    # --- Lifecycle ---
+
+    def start(self):
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+        return self
+
+    def cancel(self, reason="aborted"):
+        """Drops the recording without decoding it; a finish() in progress raises TurnCancelled."""
+        self._stop.set()
+        self.context.cancel(reason)
+
+    def finish(self):
+        """Stops the background worker and returns the full transcript."""
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join()
+        self.context.check()
+
+        with self._lock:
+            block_count = len(self._blocks)
+
+        if self._commit_block < block_count:
+            if self._partial_end_block == block_count:
+                print("🧩 Streaming ASR: tail already decoded.")
+                self._committed.append(self._partial_text)
+            else:
+                tail_text = self._decode(self._commit_block, block_count)
+                self._committed.append(tail_text)
+            self._commit_block = block_count
+
+        return self._joined(self._committed)
+
+    @property
+    def partial_text(self):
+        """Committed text plus the part of the open window two decodes agree on."""
+        stable = _common_prefix(self._previous_partial, self._partial_text)
+        return self._joined(self._committed + [stable])
+
+    # --- Background worker ---
+
+    def _run(self):
+        while not self._stop.wait(DECODE_INTERVAL):
+            try:
+                self._step()
+            except turn_context.TurnCancelled:
+                return
+            except Exception as e:
+                print(f"Streaming ASR error: {e}")
+
+    def _step(self):
+        with self._lock:
+            block_count = len(self._blocks)
+            block_ends = self._block_ends[:]
+            pauses = [p for p in self._pause_blocks if p > self._commit_block]
+
+        if block_count <= self._commit_block:
+            return
+
+        start_sample = block_ends[self._commit_block - 1] if self._commit_block else 0
+        min_samples = int(MIN_SEGMENT_DURATION * self.sample_rate)
+        cut = None
+
+        # Prefer the latest pause that leaves a reasonably long segment.
+        for pause in reversed(pauses):
+            if block_ends[pause - 1] - start_sample >= min_samples:
+                cut = pause
+                break
+
+        window_samples = block_ends[-1] - start_sample
+        if cut is None and window_samples >= MAX_WINDOW_DURATION * self.sample_rate:
+            cut = self._quietest_cut(self._commit_block, block_count)
+
+        if cut is not None:
+            text = self._decode(self._commit_block, cut)
+            self._committed.append(text)
+            self._commit_block = cut
+            self._previous_partial = ""
+            self._partial_text = ""
+            self._partial_end_block = cut
+        else:
+            new_samples = block_ends[-1] - (block_ends[self._partial_end_block - 1] if self._partial_end_block else 0)
+            if new_samples < MIN_NEW_AUDIO * self.sample_rate:
+                return
+            self._previous_partial = self._partial_text
+            self._partial_text = self._decode(self._commit_block, block_count)
+            self._partial_end_block = block_count
+
+        if self.on_partial:
+            self.on_partial(self.partial_text)
+
+    def _quietest_cut(self, first, last):
+        """Cuts at the quietest block boundary in the second half of the window."""
+        with self._lock:
+            blocks = self._blocks[first:last]
+        energies = np.array([np.mean(np.square(b)) for b in blocks])
+        half = len(blocks) // 2
+        return first + half + int(np.argmin(energies[half:])) + 1
+
+    def _decode(self, first, last):
+        with self._lock:
+            blocks = self._blocks[first:last]
+        audio = np.concatenate(blocks, axis=0).reshape(-1)
+        started = time.time()
+        text = self.transcribe_fn(audio, self.context).strip()
+        self.context.check()
+        print(f"🧩 Streaming ASR: decoded {len(audio) / self.sample_rate:.2f}s in {time.time() - started:.2f}s -> '{text}'")
+        return text
+
+    @staticmethod
+    def _joined(parts):
+        return " ".join(p for p in parts if p).strip()
+
+
+def _common_prefix(a, b):
+    """Returns the words two consecutive hypotheses agree on."""
+    words = []
+    for x, y in zip(a.split(), b.split()):
+        if x != y:
+            break
+        words.append(x)
+    return " ".join(words)
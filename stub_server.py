@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Groq (OpenAI-compatible) chat API.
+
+Lets the LLM client be exercised without network access or an API key:
+
+    python stub_server.py --port 8765
+    GROQ_BASE_URL=http://127.0.0.1:8765 GROQ_API_KEY=stub python main_gui.py
+
+Tail latency and outages can be injected to exercise hedging and the
+circuit breaker:
+
+    python stub_server.py --slow-rate 0.1 --slow-delay 3 --error-rate 0.2
+
+NewsStubHandler stands in for NewsAPI's /v2/everything in the same way
+(--api news).
+
+Command-parser requests are answered by the local intent matcher (or from
+answers recorded off the real API with benchmarks/prompt_benchmark.py), and
+--ms-per-prompt-token makes long prompts cost time the way prefill does.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import intent_matcher
+
+
+def recording_key(system, user):
+    """Key of a recorded answer: the exact system prompt and user message."""
+    return hashlib.sha256(f"{system}\x00{user}".encode("utf-8")).hexdigest()
+
+
+def load_recordings(path):
+    """Reads a JSONL file of {"key", "content"} records into a dict."""
+    recordings = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                recordings[record["key"]] = record["content"]
+    return recordings
+
+
+def count_tokens(text):
+    # Same rough estimate as prompts.estimate_tokens (words and punctuation).
+    return len(re.findall(r"\w+|[^\w\s]", text))
+
+
+def canned_reply(messages, recordings=None):
+    """
+    Deterministic answer: a recorded one if available, the local intent
+    matcher's JSON for the command parser, an echo otherwise.
+    """
+    system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+    user = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+    if recordings:
+        recorded = recordings.get(recording_key(system, user))
+        if recorded is not None:
+            return recorded
+    if "command parser" in system:
+        tasks, confidence = intent_matcher.match_intent(user)
+        if not tasks or confidence < intent_matcher.CONFIDENCE_THRESHOLD:
+            tasks = [{"command": "no_action", "args": [], "response": user, "tanglish_response": ""}]
+        if "tanglish_response" not in system:
+            tasks = [{k: v for k, v in t.items() if k != "tanglish_response"} for t in tasks]
+        return json.dumps(tasks[0] if len(tasks) == 1 else tasks)
+    return f"Sari sir. {user}"
+
+
+class LLMStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    config = {"delay": 0.0, "slow_rate": 0.0, "slow_delay": 0.0, "error_rate": 0.0, "seed": None,
+              "ms_per_prompt_token": 0.0, "recordings": None}
+    _random = random.Random()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "llama-3.1-8b-instant", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        if self._random.random() < self.config["error_rate"]:
+            self._send_json(503, {"error": {"message": "injected failure", "type": "service_unavailable"}})
+            return
+        messages = request.get("messages", [])
+        prompt_tokens = sum(count_tokens(m.get("content") or "") for m in messages)
+        delay = self.config["delay"] + prompt_tokens * self.config["ms_per_prompt_token"] / 1000.0
+        if self._random.random() < self.config["slow_rate"]:
+            delay += self.config["slow_delay"]
+        time.sleep(delay)
+        content = canned_reply(messages, self.config["recordings"])
+        model = request.get("model", "stub")
+        created = int(time.time())
+
+        if not request.get("stream"):
+            self._send_json(200, {
+                "id": "stub", "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": count_tokens(content),
+                          "total_tokens": prompt_tokens + count_tokens(content)},
+            })
+            return
+
+        # Server-sent events, one word per chunk
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            delta = {"content": word + (" " if i < len(words) - 1 else "")}
+            chunk = {"id": "stub", "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(0.02)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+class NewsStubHandler(BaseHTTPRequestHandler):
+    """Serves /v2/everything with made-up articles for the requested topic."""
+
+    protocol_version = "HTTP/1.1"
+    config = {"delay": 0.0, "error_rate": 0.0, "seed": None, "articles": 20}
+    _random = random.Random()
+    requests_served = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    _send_json = LLMStubHandler._send_json
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if not url.path.rstrip("/").endswith("/everything"):
+            self._send_json(404, {"status": "error", "message": "not found"})
+            return
+        type(self).requests_served += 1
+        query = parse_qs(url.query)
+        if self._random.random() < self.config["error_rate"]:
+            self._send_json(503, {"status": "error", "code": "unavailable", "message": "injected failure"})
+            return
+        time.sleep(self.config["delay"])
+        topic = query.get("qInTitle", query.get("q", [""]))[0]
+        page_size = int(query.get("pageSize", [100])[0])
+        articles = [{"title": f"{topic.title()} headline {i + 1}", "description": "x" * 200,
+                     "content": "x" * 2000, "url": f"https://example.com/{i}"}
+                    for i in range(min(page_size, self.config["articles"]))]
+        self._send_json(200, {"status": "ok", "totalResults": self.config["articles"], "articles": articles})
+
+
+def start_server(handler=LLMStubHandler, port=0, **config):
+    """Starts a stub server on a background thread. Returns (server, base_url)."""
+    config = {**handler.config, **config}
+    handler = type(handler.__name__, (handler,), {"config": config, "_random": random.Random(config["seed"])})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Groq chat API (or NewsAPI)")
+    parser.add_argument("--api", choices=["llm", "news"], default="llm")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to wait before answering")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of requests that get --slow-delay on top")
+    parser.add_argument("--slow-delay", type=float, default=0.0, help="extra seconds for the slow requests")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with HTTP 503")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible injection")
+    parser.add_argument("--ms-per-prompt-token", type=float, default=0.0, help="simulated prefill cost")
+    parser.add_argument("--recordings", default=None, help="JSONL of recorded answers to replay")
+    args = parser.parse_args()
+
+    if args.api == "news":
+        server, url = start_server(NewsStubHandler, port=args.port, delay=args.delay,
+                                   error_rate=args.error_rate, seed=args.seed)
+        print(f"NewsAPI stub listening on {url}/v2/everything (Ctrl+C to stop)")
+    else:
+        server, url = start_server(port=args.port, delay=args.delay, slow_rate=args.slow_rate,
+                                   slow_delay=args.slow_delay, error_rate=args.error_rate, seed=args.seed,
+                                   ms_per_prompt_token=args.ms_per_prompt_token,
+                                   recordings=load_recordings(args.recordings) if args.recordings else None)
+        print(f"LLM stub listening on {url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,209 @@
+# task_scheduler.py
+# Runs parsed tasks in the background so the spoken reply doesn't wait on them.
+# Independent tasks run concurrently; real dependencies keep their order.
+
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ThreadPoolExecutor, wait
+from open_or_close_decision_maker import open_or_close, produces_data
+from program_opener import registry
+
+MAX_WORKERS = 4
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="tasks")
+
+# One lock per shared resource, so e.g. keyboard input from two turns never interleaves.
+_resource_locks = {}
+_resource_locks_guard = threading.Lock()
+
+
+def _resource_lock(resource):
+    with _resource_locks_guard:
+        return _resource_locks.setdefault(resource, threading.Lock())
+
+
+def _is_close(command):
+    return bool(re.search(r"\.exe$", command or ""))
+
+
+def build_dependencies(tasks):
+    """
+    For each task, the indices of earlier tasks it has to wait for:
+    - commands listed in its registry `after` (e.g. open_notepad before write_in_notepad),
+    - the previous task using the same resource,
+    - every earlier task if it is a barrier (power commands), and any earlier barrier,
+    - for closing a program, the earlier app launches (it may be the one just opened).
+    """
+    commands = [task.get("command") for task in tasks]
+    entries = [registry.get(command) for command in commands]
+    dependencies = []
+    for i, entry in enumerate(entries):
+        deps = set()
+        earlier = range(i)
+        if entry is not None:
+            for name in entry.after:
+                matches = [j for j in earlier if commands[j] == name]
+                if matches:
+                    deps.add(matches[-1])
+            if entry.resource:
+                matches = [j for j in earlier if entries[j] is not None and entries[j].resource == entry.resource]
+                if matches:
+                    deps.add(matches[-1])
+            if entry.barrier:
+                deps.update(earlier)
+        elif _is_close(commands[i]):
+            deps.update(j for j in earlier if entries[j] is not None and entries[j].group in ("apps", "web"))
+        deps.update(j for j in earlier if entries[j] is not None and entries[j].barrier)
+        dependencies.append(sorted(deps))
+    return dependencies
+
+
+class TaskRun:
+    """
+    Handle to a set of tasks that is executing in the background. With a
+    turn_context.TurnContext, cancelling the turn cancels every task that
+    hasn't started yet (a tool that is already running is left to finish).
+    """
+
+    def __init__(self, tasks, context=None):
+        self.tasks = tasks
+        self.futures = [Future() for _ in tasks]
+        self.dependencies = build_dependencies(tasks)
+        self.started = time.time()
+        self.context = context
+        self._abandoned = Future()   # cancelled by cancel(), so waiting callers return at once
+
+    def cancel(self):
+        # Abandoned first, so the done callbacks of the tasks cancelled below see it.
+        if self._abandoned.cancel():
+            self._abandoned.set_running_or_notify_cancel()   # wakes wait() callers
+        cancelled = sum(future.cancel() for future in self.futures)
+        if cancelled:
+            print(f"Cancelled {cancelled} pending task(s).")
+
+    def _result(self, future, timeout=None):
+        wait([future, self._abandoned], timeout=timeout, return_when=FIRST_COMPLETED)
+        if self._abandoned.cancelled():
+            raise CancelledError("task run cancelled")
+        return future.result(timeout=0)
+
+    def needs_results(self):
+        """True if the reply has to wait for at least one task's result."""
+        return any(produces_data(task.get("command")) for task in self.tasks)
+
+    def data_results(self, timeout=None):
+        """
+        Waits only for the tasks whose result the reply needs and returns
+        their non-empty results in order. Other tasks keep running.
+        """
+        results = []
+        for task, future in zip(self.tasks, self.futures):
+            if produces_data(task.get("command")):
+                result = self._result(future, timeout)
+                if result:
+                    results.append(str(result))
+        return results
+
+    def failures(self, timeout=None):
+        """
+        Waits (up to timeout) for the tasks whose result the reply didn't
+        need and returns (task, exception) for each one that raised, in
+        order. Returns [] if the run was cancelled.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        failures = []
+        for task, future in zip(self.tasks, self.futures):
+            if produces_data(task.get("command")):
+                continue
+            remaining = None if deadline is None else max(0.0, deadline - time.time())
+            wait([future, self._abandoned], timeout=remaining, return_when=FIRST_COMPLETED)
+            if self._abandoned.cancelled():
+                return []
+            if future.done() and not future.cancelled() and future.exception() is not None:
+                failures.append((task, future.exception()))
+        return failures
+
+    def on_failures(self, callback):
+        """
+        Calls callback(failures), with failures() as the argument, once every
+        task the reply didn't need has finished. It runs on the thread that
+        finished the last of them. Not called if none failed or the run was
+        cancelled.
+        """
+        background = [future for task, future in zip(self.tasks, self.futures)
+                      if not produces_data(task.get("command"))]
+        remaining = [len(background)]
+        lock = threading.Lock()
+
+        def on_done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            failures = self.failures(timeout=0)
+            if failures:
+                callback(failures)
+
+        for future in background:
+            future.add_done_callback(on_done)
+
+    def wait(self, timeout=None):
+        """Waits for every task and returns all results in order."""
+        return [self._result(future, timeout) for future in self.futures]
+
+
+def _execute(run, index):
+    task = run.tasks[index]
+    future = run.futures[index]
+    command = task.get("command")
+    args = task.get("args", [])
+    entry = registry.get(command)
+    lock = _resource_lock(entry.resource) if entry is not None and entry.resource else None
+
+    if not future.set_running_or_notify_cancel():
+        return
+    print(f"Executing Task: {command}, Arguments: {args}")
+    try:
+        if lock:
+            with lock:
+                result = open_or_close(command, args)
+        else:
+            result = open_or_close(command, args)
+        print(f"Task result: {result} ({time.time() - run.started:.2f}s)")
+        future.set_result(result)
+    except Exception as e:
+        print(f"Task {command} failed: {e}")
+        future.set_exception(e)
+
+
+def run_tasks(tasks, context=None):
+    """
+    Starts the tasks on the worker pool and returns a TaskRun. A task is
+    submitted as soon as the tasks it depends on have finished (whether or
+    not they succeeded, or were cancelled); results stay in the order the user gave.
+    """
+    run = TaskRun(tasks, context)
+    remaining = [len(deps) for deps in run.dependencies]
+    dependents = [[] for _ in tasks]
+    for i, deps in enumerate(run.dependencies):
+        for j in deps:
+            dependents[j].append(i)
+    lock = threading.Lock()
+
+    def on_done(index):
+        for i in dependents[index]:
+            with lock:
+                remaining[i] -= 1
+                ready = remaining[i] == 0
+            if ready:
+                _executor.submit(_execute, run, i)
+
+    for i, future in enumerate(run.futures):
+        future.add_done_callback(lambda _, i=i: on_done(i))
+    for i, count in enumerate(remaining):
+        if count == 0:
+            _executor.submit(_execute, run, i)
+    if context is not None:
+        context.on_cancel(run.cancel)
+    return run
@@ -0,0 +1,43 @@
+import pytest
+import asr_precision
+
+
+def test_parse_budget_reads_megabytes():
+    assert asr_precision.parse_budget("1024") == 1024.0
+
+
+def test_parse_budget_falls_back_on_unset_or_bad_values():
+    for value in (None, "", "2GB", "-1", "0"):
+        assert asr_precision.parse_budget(value) == asr_precision.DEFAULT_BUDGET_MB
+
+
+def test_unknown_precision_falls_back_to_fp32():
+    assert asr_precision.resolve("int4") == asr_precision.FP32
+    assert asr_precision.resolve(None) == asr_precision.FP32
+
+
+def test_fp32_loads_a_local_model_without_accelerate(tmp_path, monkeypatch):
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+
+    config = transformers.WhisperConfig(
+        vocab_size=64, num_mel_bins=8, d_model=16,
+        encoder_layers=1, encoder_attention_heads=2, encoder_ffn_dim=32,
+        decoder_layers=1, decoder_attention_heads=2, decoder_ffn_dim=32,
+        max_source_positions=16, max_target_positions=16,
+        pad_token_id=0, bos_token_id=1, eos_token_id=2, decoder_start_token_id=1,
+    )
+    transformers.WhisperForConditionalGeneration(config).save_pretrained(tmp_path)
+
+    calls = []
+    from_pretrained = transformers.AutoModelForSpeechSeq2Seq.from_pretrained
+
+    def recording(*args, **kwargs):
+        calls.append(kwargs)
+        return from_pretrained(*args, **kwargs)
+
+    monkeypatch.setattr(transformers.AutoModelForSpeechSeq2Seq, "from_pretrained", recording)
+    model = asr_precision.load_model(str(tmp_path), asr_precision.FP32)
+    assert not model.training
+    assert next(model.parameters()).dtype == torch.float32
+    assert calls and all("low_cpu_mem_usage" not in kwargs for kwargs in calls)
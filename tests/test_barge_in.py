@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+import barge_in
+from benchmarks import barge_in_benchmark as bench
+
+
+@pytest.mark.parametrize("coupling", [0.1, 0.9, 1.8])
+def test_own_echo_never_interrupts(monkeypatch, coupling):
+    monkeypatch.setattr(bench, "COUPLING", (coupling, coupling))
+    rng = np.random.default_rng(0)
+    for _ in range(8):
+        detected, _, detector = bench.run(bench.make_clip(rng), bench.SimulatedOutput)
+        assert detected is None
+        assert detector.learned_coupling is not None
+
+
+def test_user_over_echo_interrupts_with_onset_kept():
+    rng = np.random.default_rng(1)
+    detected = 0
+    for _ in range(10):
+        clip = bench.make_clip(rng, user_db=12)
+        position, start, _ = bench.run(clip, bench.SimulatedOutput)
+        if position is None:
+            continue
+        assert position >= clip["onset"]
+        assert start <= clip["onset"]
+        assert (position - clip["onset"]) / bench.SAMPLE_RATE < 0.3
+        detected += 1
+    assert detected >= 9
+
+
+def test_learned_coupling_skips_warm_up():
+    output = bench.SilentOutput(np.zeros(bench.OUTPUT_BLOCK * 10, dtype=np.float32))
+    assert barge_in.BargeInDetector(output, coupling=0.3).learned_coupling == 0.3
+    assert barge_in.BargeInDetector(output).learned_coupling is None
@@ -0,0 +1,30 @@
+from program_opener import app, capabilities
+
+
+def test_search_falls_back_to_xdg_open(monkeypatch):
+    monkeypatch.setattr(capabilities, "_resolved", {})
+    monkeypatch.setattr(capabilities, "get_os", lambda: "linux")
+    monkeypatch.setattr(capabilities.shutil, "which", lambda name: "/usr/bin/xdg-open" if name == "xdg-open" else None)
+    assert capabilities.resolve(app.CMD_BROWSE_URL) == ["xdg-open"]
+    assert capabilities.resolve(app.CMD_CHROME) is None
+
+
+def test_first_installed_alternative_wins(monkeypatch):
+    installed = {"chromium", "firefox", "xdg-open"}
+    monkeypatch.setattr(capabilities, "_resolved", {})
+    monkeypatch.setattr(capabilities, "get_os", lambda: "linux")
+    monkeypatch.setattr(capabilities.shutil, "which", lambda name: f"/usr/bin/{name}" if name in installed else None)
+    assert capabilities.resolve(app.CMD_BROWSE_URL) == ["chromium"]
+
+
+def test_every_editor_alternative_has_a_readiness_entry():
+    for os_name in ("windows", "darwin", "linux"):
+        for editor in capabilities._candidates(app.CMD_NOTEPAD, os_name):
+            assert editor in app.NOTEPAD_WINDOW, editor
+
+
+def test_readiness_follows_the_resolved_editor(monkeypatch):
+    monkeypatch.setattr(capabilities, "_resolved", {})
+    monkeypatch.setattr(capabilities, "get_os", lambda: "linux")
+    monkeypatch.setattr(capabilities.shutil, "which", lambda name: "/usr/bin/kate" if name == "kate" else None)
+    assert app.notepad_window() == app.NOTEPAD_WINDOW["kate"]
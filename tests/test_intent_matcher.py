@@ -0,0 +1,64 @@
+import pytest
+import intent_matcher
+from intent_matcher import CONFIDENCE_THRESHOLD, match_intent
+
+
+def commands(text):
+    tasks, confidence = match_intent(text)
+    return [(t["command"], t["args"]) for t in tasks], confidence
+
+
+@pytest.mark.parametrize("text", ["tell me the news", "show me the news", "what is the news",
+                                  "give me today's news", "news about the"])
+def test_news_without_topic_goes_to_llm(text):
+    assert commands(text) == ([], 0.0)
+
+
+@pytest.mark.parametrize("text, topic", [
+    ("cricket news", "cricket"),
+    ("get the latest cricket news", "cricket"),
+    ("what is the cricket news", "cricket"),
+    ("what's the latest news on artificial intelligence", "artificial intelligence"),
+    ("news about the world cup", "world cup"),
+])
+def test_news_topic(text, topic):
+    tasks, confidence = commands(text)
+    assert tasks == [("get_news", [topic])]
+    assert confidence >= CONFIDENCE_THRESHOLD
+
+
+@pytest.mark.parametrize("text", ["Can you write a poem about the sea?", "I want to type faster",
+                                  "Jarvis, write a poem about the sea"])
+def test_write_requests_are_left_to_llm(text):
+    assert commands(text)[1] < CONFIDENCE_THRESHOLD
+
+
+def test_write_is_anchored_to_a_clause():
+    assert commands("open notepad and write my name is jarvis") == (
+        [("open_notepad", []), ("write_in_notepad", ["my name is jarvis"])], 1.0)
+    assert commands("type hello world") == ([("write_in_notepad", ["hello world"])], 1.0)
+
+
+def test_fixed_phrases_still_match():
+    assert commands("tell me the time") == ([("get_time", [])], 1.0)
+    tasks, confidence = commands("shut down")
+    assert tasks == [("shutdown_system", [])] and confidence >= intent_matcher.STRICT_CONFIDENCE
+
+
+@pytest.mark.parametrize("text, command", [
+    ("switch on the wifi", "enable_wifi"),
+    ("turn the volume up", "increase_volume"),
+    ("open calculater", "open_calculator"),
+    ("show me the task manager", "open_task_manager"),
+])
+def test_word_order_fillers_and_one_misheard_word_still_match(text, command):
+    tasks, confidence = commands(text)
+    assert tasks == [(command, [])] and confidence >= CONFIDENCE_THRESHOLD
+
+
+@pytest.mark.parametrize("text", [
+    "unlock the screen", "bluetooth", "brightness", "lock",
+    "don't turn on wifi", "do not shut down", "dont mute", "never open chrome",
+])
+def test_near_misses_and_negations_go_to_llm(text):
+    assert commands(text)[1] < CONFIDENCE_THRESHOLD
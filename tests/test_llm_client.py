@@ -0,0 +1,89 @@
+import concurrent.futures
+import threading
+import time
+import pytest
+
+pytest.importorskip("groq")
+
+import stub_server
+from llm_client import LLMClient
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+@pytest.fixture
+def stub():
+    servers, clients = [], []
+
+    def start(handler=stub_server.LLMStubHandler, **config):
+        server, url = stub_server.start_server(handler, **config)
+        client = LLMClient(api_key="stub", base_url=url)
+        servers.append(server)
+        clients.append(client)
+        return client
+
+    yield start
+    for client in clients:
+        client.close()
+    for server in servers:
+        server.shutdown()
+
+
+def test_chat_and_stream(stub):
+    client = stub()
+    assert client.warm().result(timeout=5) is None
+    completion = client.chat(model="stub", messages=MESSAGES)
+    assert completion.choices[0].message.content == "Sari sir. hello"
+    tokens = [c.choices[0].delta.content for c in client.chat_stream(model="stub", messages=MESSAGES)]
+    assert "".join(t for t in tokens if t) == "Sari sir. hello"
+
+
+def test_timeout(stub):
+    client = stub(delay=2.0)
+    started = time.time()
+    with pytest.raises(TimeoutError):
+        client.chat(model="stub", messages=MESSAGES, timeout=0.3)
+    assert time.time() - started < 1.5
+
+
+def test_new_turn_cancels_older_requests(stub):
+    client = stub(delay=2.0)
+    client.new_turn()
+    outcome = {}
+
+    def call():
+        try:
+            client.chat(model="stub", messages=MESSAGES, timeout=5)
+        except concurrent.futures.CancelledError as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=call)
+    thread.start()
+    time.sleep(0.2)
+    started = time.time()
+    client.new_turn()
+    thread.join(5)
+    assert "error" in outcome
+    assert time.time() - started < 1.0
+
+
+class FirstRequestSlowHandler(stub_server.LLMStubHandler):
+    """The first chat request stalls, the ones after it answer at once."""
+
+    slow = threading.Event()
+
+    def do_POST(self):
+        if not self.slow.is_set():
+            self.slow.set()
+            time.sleep(2.0)
+        super().do_POST()
+
+
+def test_hedged_request_answers_when_the_first_stalls(stub):
+    FirstRequestSlowHandler.slow = threading.Event()
+    client = stub(FirstRequestSlowHandler)
+    started = time.time()
+    completion = client.chat(model="stub", messages=MESSAGES, timeout=5, hedge_after=0.2)
+    assert completion.choices[0].message.content == "Sari sir. hello"
+    assert time.time() - started < 1.0
+    assert client.hedges == 1
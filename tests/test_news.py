@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import Future
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from program_opener.news import NewsService
+
+
+class InlineExecutor:
+    """Runs each job before submit() returns, as a fetch that fails at once effectively does."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+class RefusingSession:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        raise requests.exceptions.ConnectionError("connection refused")
+
+
+class FakeResponse:
+    def __init__(self, titles):
+        self.titles = titles
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"articles": [{"title": title} for title in self.titles]}
+
+
+class HeadlineSession:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, params=None, **kwargs):
+        self.calls += 1
+        return FakeResponse([f"{params['qInTitle']} headline {i}" for i in range(5)])
+
+
+def call_with_timeout(fn, *args, timeout=5):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", fn(*args)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "deadlocked"
+    return result["value"]
+
+
+def test_fetch_that_fails_immediately_does_not_deadlock():
+    session = RefusingSession()
+    service = NewsService(api_key="test", session=session)
+    service._executor = InlineExecutor()
+    reply = call_with_timeout(service.get_news, "cricket")
+    assert reply == "Sorry, I'm having trouble connecting to the news service right now."
+    # The failure isn't cached, and the lock is free for the next call.
+    call_with_timeout(service.get_news, "cricket")
+    assert session.calls == 2
+
+
+def test_headlines_are_cached_per_topic():
+    session = HeadlineSession()
+    service = NewsService(api_key="test", session=session)
+    first = service.get_news("cricket", "technology")
+    assert first.startswith("Here are the top headlines on cricket: 1. cricket headline 0")
+    assert "3. technology headline 2" in first and "headline 3" not in first
+    assert "1. cricket headline 0" in service.get_news("Cricket")
+    assert "1. cricket headline 0" in service.get_news("  cricket ")
+    assert session.calls == 2
+    assert service.stats()["hits"] == 2
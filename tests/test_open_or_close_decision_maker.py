@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip("psutil")
+
+from open_or_close_decision_maker import produces_data
+from program_opener import registry
+
+
+@pytest.fixture
+def commands(monkeypatch):
+    registry.load()
+    monkeypatch.setitem(registry.COMMANDS, "open_test_app",
+                        registry.Command("open_test_app", lambda: None, "apps"))
+    monkeypatch.setitem(registry.COMMANDS, "get_test_data",
+                        registry.Command("get_test_data", lambda: "42", "info", returns_data=True))
+
+
+def test_plain_action_has_no_data(commands):
+    assert not produces_data("open_test_app")
+
+
+def test_data_commands_and_closes(commands):
+    assert produces_data("get_test_data")
+    assert produces_data("chrome.exe")
+
+
+def test_unknown_command_replies_with_its_apology(commands):
+    # opener() answers "Sorry, I don't know how to do that." -- the canned success line must not be used.
+    assert produces_data("open_hyperdrive")
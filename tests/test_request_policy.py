@@ -0,0 +1,113 @@
+import concurrent.futures
+import time
+import pytest
+from request_policy import CLOSED, HALF_OPEN, OPEN, MIN_HEDGE_DELAY, CircuitBreaker, LatencyTracker, RequestPolicy
+
+
+def test_percentiles_need_enough_samples():
+    tracker = LatencyTracker(window=10, min_samples=4)
+    for seconds in (0.1, 0.2, 0.3):
+        tracker.record(seconds)
+    assert tracker.percentile(95) is None
+    tracker.record(0.4)
+    assert tracker.percentile(50) == 0.2
+    assert tracker.percentile(95) == 0.4
+
+
+def test_window_forgets_old_latencies():
+    tracker = LatencyTracker(window=4, min_samples=1)
+    for seconds in (5.0, 0.1, 0.1, 0.1, 0.1):
+        tracker.record(seconds)
+    assert tracker.percentile(100) == 0.1
+
+
+def test_breaker_opens_and_recovers_through_one_trial():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()   # only one trial at a time
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+
+def test_abandoned_trial_lets_another_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_abandoned()
+    assert breaker.allow()
+
+
+def test_hedge_delay():
+    policy = RequestPolicy("test", tracker=LatencyTracker(min_samples=3))
+    assert policy.hedge_delay(timeout=10) is None
+    for seconds in (0.5, 0.8, 1.0):
+        policy.succeeded(seconds)
+    assert policy.hedge_delay(timeout=10) == 1.0
+    assert policy.hedge_delay(timeout=1.5) is None   # a hedge that late couldn't finish in time
+    policy = RequestPolicy("fast", tracker=LatencyTracker(min_samples=1))
+    policy.succeeded(0.01)
+    assert policy.hedge_delay(timeout=10) == MIN_HEDGE_DELAY
+    assert RequestPolicy("off", hedge=False).hedge_delay(timeout=10) is None
+
+
+# --- Local fallbacks in command_and_response_giver ---
+
+def _giver(monkeypatch):
+    pytest.importorskip("groq")
+    pytest.importorskip("psutil")
+    monkeypatch.setenv("GROQ_API_KEY", "stub")
+    import command_and_response_giver
+    return command_and_response_giver
+
+
+def test_open_breaker_answers_locally_without_calling(monkeypatch):
+    giver = _giver(monkeypatch)
+    policy = RequestPolicy("test", breaker=CircuitBreaker(failure_threshold=3, reset_timeout=60))
+    calls = []
+
+    def failing(hedge_after):
+        calls.append(hedge_after)
+        raise ConnectionError("503")
+
+    for _ in range(3):
+        assert giver._call_with_policy(policy, failing, 5) == (None, False)
+    assert giver._call_with_policy(policy, failing, 5) == (None, False)
+    assert len(calls) == 3
+    assert policy.breaker.state == OPEN and policy.fallbacks == 4
+
+
+def test_cancellation_is_not_a_failure(monkeypatch):
+    giver = _giver(monkeypatch)
+    policy = RequestPolicy("test", breaker=CircuitBreaker(failure_threshold=1))
+
+    def cancelled(hedge_after):
+        raise concurrent.futures.CancelledError()
+
+    with pytest.raises(concurrent.futures.CancelledError):
+        giver._call_with_policy(policy, cancelled, 5)
+    assert policy.breaker.state == CLOSED and policy.fallbacks == 0
+
+
+def test_fallback_reply_keeps_task_results(monkeypatch):
+    giver = _giver(monkeypatch)
+    reply = giver.fallback_reply("Opening Calculator... Right away. Getting the time. It is 10:30 AM.")
+    assert reply.startswith("Calculator open panniten, sir.")
+    assert reply.endswith("It is 10:30 AM.")
+    assert giver.fallback_reply("Tell me a joke") == giver.FALLBACK_OFFLINE_REPLY
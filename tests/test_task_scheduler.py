@@ -0,0 +1,86 @@
+import threading
+import pytest
+
+pytest.importorskip("psutil")
+
+import task_scheduler
+from program_opener import registry
+
+
+@pytest.fixture
+def commands(monkeypatch):
+    registry.load()
+    for name in ("open_test_app", "open_broken_app"):
+        monkeypatch.setitem(registry.COMMANDS, name, registry.Command(name, lambda: None, "apps"))
+    monkeypatch.setitem(registry.COMMANDS, "get_test_data",
+                        registry.Command("get_test_data", lambda: None, "info", returns_data=True))
+    release = threading.Event()
+
+    def open_or_close(command, args=None):
+        if command == "open_broken_app":
+            raise OSError("launch failed")
+        if command == "open_slow_app":
+            release.wait(5)
+        return f"{command} result" if command.startswith("get_") else None
+
+    monkeypatch.setattr(task_scheduler, "open_or_close", open_or_close)
+    return release
+
+
+def task(command):
+    return {"command": command, "args": []}
+
+
+def test_failures_of_background_tasks_are_reported(commands):
+    tasks = [task("open_test_app"), task("open_broken_app"), task("get_test_data")]
+    run = task_scheduler.run_tasks(tasks)
+    assert run.data_results(timeout=5) == ["get_test_data result"]
+    failures = run.failures(timeout=5)
+    assert [(t["command"], type(e)) for t, e in failures] == [("open_broken_app", OSError)]
+
+
+def test_no_failures(commands):
+    run = task_scheduler.run_tasks([task("open_test_app")])
+    assert run.failures(timeout=5) == []
+
+
+def test_cancelled_run_reports_nothing(commands, monkeypatch):
+    monkeypatch.setitem(registry.COMMANDS, "open_slow_app",
+                        registry.Command("open_slow_app", lambda: None, "apps"))
+    run = task_scheduler.run_tasks([task("open_slow_app"), task("open_broken_app")])
+    run.cancel()
+    assert run.failures(timeout=5) == []
+    commands.set()
+
+
+def test_data_results_keep_every_result_in_order(commands, monkeypatch):
+    monkeypatch.setitem(registry.COMMANDS, "get_other_data",
+                        registry.Command("get_other_data", lambda: None, "info", returns_data=True))
+    run = task_scheduler.run_tasks([task("get_test_data"), task("open_test_app"), task("get_other_data")])
+    assert run.data_results(timeout=5) == ["get_test_data result", "get_other_data result"]
+
+
+def test_on_failures_reports_once_the_background_tasks_finish(commands, monkeypatch):
+    monkeypatch.setitem(registry.COMMANDS, "open_slow_app",
+                        registry.Command("open_slow_app", lambda: None, "apps"))
+    reported = []
+    done = threading.Event()
+    run = task_scheduler.run_tasks([task("open_broken_app"), task("open_slow_app")])
+    run.on_failures(lambda failures: (reported.append(failures), done.set()))
+    assert not done.wait(0.1)   # the slow task is still running; nothing blocks on it
+    commands.set()
+    assert done.wait(5)
+    assert [[(t["command"], type(e)) for t, e in failures] for failures in reported] == [
+        [("open_broken_app", OSError)]]
+
+
+def test_on_failures_is_silent_for_a_cancelled_run(commands, monkeypatch):
+    monkeypatch.setitem(registry.COMMANDS, "open_slow_app",
+                        registry.Command("open_slow_app", lambda: None, "apps"))
+    reported = []
+    run = task_scheduler.run_tasks([task("open_slow_app"), task("open_broken_app")])
+    run.on_failures(reported.append)
+    run.cancel()
+    commands.set()
+    run.failures(timeout=5)
+    assert reported == []
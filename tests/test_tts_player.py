@@ -0,0 +1,142 @@
+import concurrent.futures
+import threading
+import time
+import numpy as np
+import pytest
+
+pytest.importorskip("edge_tts")
+pytest.importorskip("sounddevice")
+
+import intent_matcher
+import playback_engine
+import tts_player
+from tts_cache import AudioCache
+
+SAMPLE_RATE = playback_engine.SAMPLE_RATE
+
+
+class FakeEngine:
+    """Plays each Playback by draining its buffers on a thread instead of a device."""
+
+    sample_rate = SAMPLE_RATE
+
+    def __init__(self):
+        self.played = []
+
+    def open(self, requested_at=None):
+        playback = playback_engine.Playback(self, requested_at)
+        threading.Thread(target=self._play, args=(playback,), daemon=True).start()
+        return playback
+
+    def _play(self, playback):
+        while not playback.stopped:
+            if playback._buffers:
+                self.played.append(playback._buffers.popleft())
+                playback.started.set()
+            elif playback._closed:
+                break
+            else:
+                time.sleep(0.005)
+        playback._finish()
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr(playback_engine, "get_engine", lambda: engine)
+    monkeypatch.setattr(tts_player, "audio_cache", None)
+    return engine
+
+
+def tone(seconds=0.1):
+    return np.full(int(seconds * SAMPLE_RATE), 0.1, dtype=np.float32)
+
+
+def test_streaming_failure_after_audio_is_not_replayed(monkeypatch, engine):
+    def synthesize(text, voice, put, communicate_factory=None, stopped=None):
+        put(tone(), SAMPLE_RATE)
+        time.sleep(0.05)
+        raise ConnectionError("stream dropped")
+
+    retries = []
+
+    async def whole_reply(text, voice, style):
+        retries.append(text)
+        return b"mp3"
+
+    monkeypatch.setattr(tts_player, "_synthesize_pcm", synthesize)
+    monkeypatch.setattr(tts_player, "_synthesize_mp3", whole_reply)
+    monkeypatch.setattr(tts_player, "_decode_mp3", lambda data: (tone(), SAMPLE_RATE))
+    tts_player.speak("hello there")
+    assert retries == []
+    assert len(engine.played) == 1
+
+
+def test_streaming_failure_before_audio_falls_back(monkeypatch, engine):
+    def synthesize(text, voice, put, communicate_factory=None, stopped=None):
+        raise ConnectionError("no connection")
+
+    async def whole_reply(text, voice, style):
+        return b"mp3"
+
+    monkeypatch.setattr(tts_player, "_synthesize_pcm", synthesize)
+    monkeypatch.setattr(tts_player, "_synthesize_mp3", whole_reply)
+    monkeypatch.setattr(tts_player, "_decode_mp3", lambda data: (tone(), SAMPLE_RATE))
+    tts_player.speak("hello there")
+    assert len(engine.played) == 1
+
+
+def test_segments_error_reaches_caller_after_playback(monkeypatch, engine):
+    def synthesize(text, voice, put, communicate_factory=None, stopped=None):
+        put(tone(), SAMPLE_RATE)
+        return tone(), SAMPLE_RATE
+
+    monkeypatch.setattr(tts_player, "_synthesize_pcm", synthesize)
+
+    def reply():
+        yield "First sentence."
+        raise TimeoutError("LLM stream timed out")
+
+    with pytest.raises(TimeoutError):
+        tts_player.speak_segments(reply())
+    assert len(engine.played) == 1
+
+
+def test_cancelled_segments_are_not_an_error(engine):
+    def reply():
+        yield from ()
+        raise concurrent.futures.CancelledError()
+
+    tts_player.speak_segments(reply())
+    assert engine.played == []
+
+
+def test_prewarmed_replies_are_cache_hits(monkeypatch, engine, tmp_path):
+    pytest.importorskip("groq")
+    pytest.importorskip("psutil")
+    pytest.importorskip("requests")
+    monkeypatch.setenv("GROQ_API_KEY", "stub")
+    from command_and_response_giver import split_sentences
+
+    synthesized = []
+
+    async def synthesize_mp3(text, voice, style):
+        synthesized.append(text)
+        return b"mp3"
+
+    def synthesize_pcm(text, voice, put, communicate_factory=None, stopped=None):
+        synthesized.append(text)
+        put(tone(), SAMPLE_RATE)
+        return tone(), SAMPLE_RATE
+
+    monkeypatch.setattr(tts_player, "audio_cache", AudioCache(directory=str(tmp_path), extension=".wav"))
+    monkeypatch.setattr(tts_player, "_synthesize_mp3", synthesize_mp3)
+    monkeypatch.setattr(tts_player, "_synthesize_pcm", synthesize_pcm)
+    monkeypatch.setattr(tts_player, "_decode_mp3", lambda data: (tone(), SAMPLE_RATE))
+    tts_player.prewarm_cache(voices=[tts_player.DEFAULT_VOICE]).join()
+    synthesized.clear()
+
+    tts_player.speak(intent_matcher.TANGLISH_RESPONSES["open_notepad"])
+    tts_player.speak_segments(split_sentences(tts_player.APOLOGY))
+    assert synthesized == []
+    assert len(engine.played) == 3
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+import vad
+from benchmarks import vad_benchmark
+
+SAMPLE_RATE = vad.SAMPLE_RATE
+
+
+# --- RingBuffer ---
+
+def test_ring_read_within_capacity():
+    ring = vad.RingBuffer(10)
+    ring.write(np.arange(6, dtype=np.float32))
+    assert ring.total == 6 and ring.oldest() == 0
+    assert ring.read(2, 5).tolist() == [2, 3, 4]
+    assert ring.read(0).tolist() == list(range(6))
+
+
+def test_ring_wraps_and_reads_across_the_seam():
+    ring = vad.RingBuffer(10)
+    for start in range(0, 24, 4):
+        ring.write(np.arange(start, start + 4, dtype=np.float32))
+    assert ring.total == 24 and ring.oldest() == 14
+    assert ring.read(14).tolist() == list(range(14, 24))    # wraps inside the storage
+    assert ring.read(18, 22).tolist() == [18, 19, 20, 21]
+
+
+def test_ring_clamps_reads_to_what_is_held():
+    ring = vad.RingBuffer(10)
+    ring.write(np.arange(15, dtype=np.float32))
+    assert ring.read(0, 8).tolist() == [5, 6, 7]             # older samples were overwritten
+    assert ring.read(12, 100).tolist() == [12, 13, 14]
+    assert len(ring.read(20)) == 0
+
+
+def test_ring_write_larger_than_capacity_keeps_the_newest():
+    ring = vad.RingBuffer(10)
+    ring.write(np.arange(3, dtype=np.float32))
+    ring.write(np.arange(100, 125, dtype=np.float32))
+    assert ring.total == 28 and ring.oldest() == 18
+    assert ring.read(ring.oldest()).tolist() == list(range(115, 125))
+
+
+# --- Endpointing on the synthetic benchmark clips ---
+
+@pytest.fixture(scope="module")
+def results():
+    clips = vad_benchmark.synthetic_clips(seed=0)
+    return [(clip, vad_benchmark.evaluate(clip, vad_benchmark.run_vad)) for clip in clips]
+
+
+def test_every_utterance_is_detected_and_none_ends_early(results):
+    assert not [clip["name"] for clip, r in results if r["missed"]]
+    assert not [clip["name"] for clip, r in results if r["early"]]
+
+
+def test_no_speech_is_clipped(results):
+    for clip, r in results:
+        assert r["lost"] == 0.0, clip["name"]
+        assert r["onset_clip"] == 0.0, clip["name"]
+
+
+def test_endpoint_latency(results):
+    stops = {}
+    for clip, r in results:
+        stops.setdefault(clip["condition"].split(",")[0], []).append(r["stop_after"])
+    for label, values in stops.items():
+        assert max(values) <= vad.MAX_HANGOVER + 0.1, label
+    # Short commands end well before the old fixed 1.0 s of silence.
+    assert np.median(stops["short command"]) < 0.7
+    assert np.median([v for values in stops.values() for v in values]) < 0.75
+
+
+def test_hangover_grows_with_speech_and_pauses():
+    detector = vad.VoiceActivityDetector(noise_floor=0.001)
+    assert detector.hangover() == pytest.approx(vad.MIN_HANGOVER)
+    detector.speech_samples = 2 * SAMPLE_RATE
+    assert detector.hangover() == pytest.approx(vad.MIN_HANGOVER + 2 * vad.HANGOVER_PER_SPEECH_SECOND)
+    detector.longest_pause = int(0.7 * SAMPLE_RATE)
+    assert detector.hangover() == pytest.approx(min(vad.MAX_HANGOVER, vad.PAUSE_MARGIN * 0.7))
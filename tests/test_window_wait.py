@@ -0,0 +1,88 @@
+import time
+import pytest
+from program_opener import window_wait
+
+EDITOR = {"titles": ["Text Editor"], "processes": ["gedit"]}
+
+
+class FakeWindows:
+    """Focused-window probe: reports `before` until `after` seconds, then the editor's title."""
+
+    def __init__(self, before, title, after):
+        self.before, self.title = before, title
+        self.shown_at = time.time() + after
+
+    def __call__(self):
+        return self.title if time.time() >= self.shown_at else self.before
+
+
+class FakeKeyboard:
+    def __init__(self):
+        self.typed, self.hotkeys = [], []
+
+    def typewrite(self, text):
+        self.typed.append(text)
+
+    def hotkey(self, *keys):
+        self.hotkeys.append(keys)
+
+
+@pytest.fixture(autouse=True)
+def fast(monkeypatch):
+    monkeypatch.setattr(window_wait, "POLL_INTERVAL", 0.005)
+    monkeypatch.setattr(window_wait, "SETTLE_TIME", 0.1)
+    monkeypatch.setattr(window_wait, "PROCESS_SETTLE", 0.1)
+    monkeypatch.setattr(window_wait, "CLIPBOARD_RESTORE_DELAY", 0.0)
+
+
+def test_ready_as_soon_as_a_new_editor_window_has_focus():
+    probe = FakeWindows("Terminal", "Untitled - Text Editor", after=0.05)
+    started = time.time()
+    assert window_wait.wait_until_ready(EDITOR, "Terminal", started, timeout=2, get_focused_title=probe)
+    assert 0.05 <= time.time() - started < 0.5
+
+
+def test_editor_that_was_already_focused_gets_settle_time():
+    probe = FakeWindows("notes.txt - Text Editor", "notes.txt - Text Editor", after=0)
+    started = time.time()
+    assert window_wait.wait_until_ready(EDITOR, "notes.txt - Text Editor", started, timeout=2,
+                                        get_focused_title=probe)
+    assert time.time() - started >= window_wait.SETTLE_TIME
+
+
+def test_times_out_when_the_editor_never_appears():
+    probe = FakeWindows("Terminal", "Terminal", after=0)
+    assert not window_wait.wait_until_ready(EDITOR, "Terminal", time.time(), timeout=0.1, get_focused_title=probe)
+
+
+def test_process_probe_without_focus_information():
+    launched = time.time()
+    assert window_wait.wait_until_ready(EDITOR, None, launched, timeout=2, get_focused_title=lambda: None,
+                                        list_processes=lambda names: [launched])
+    assert time.time() - launched >= window_wait.PROCESS_SETTLE
+
+
+def test_short_text_is_typed():
+    keyboard = FakeKeyboard()
+    assert window_wait.type_text("hello", keyboard) == "type"
+    assert keyboard.typed == ["hello"]
+
+
+def test_long_text_is_pasted_and_the_clipboard_restored(monkeypatch):
+    clipboard = ["the user's clipboard"]
+    monkeypatch.setattr(window_wait, "read_clipboard", lambda: clipboard[-1])
+    monkeypatch.setattr(window_wait, "copy_to_clipboard", lambda text: clipboard.append(text) or True)
+    keyboard = FakeKeyboard()
+    text = "a sentence long enough to be pasted instead of typed"
+    assert window_wait.type_text(text, keyboard) == "paste"
+    assert keyboard.typed == [] and len(keyboard.hotkeys) == 1
+    assert clipboard == ["the user's clipboard", text, "the user's clipboard"]
+
+
+def test_paste_falls_back_to_typing_without_a_clipboard(monkeypatch):
+    monkeypatch.setattr(window_wait, "read_clipboard", lambda: None)
+    monkeypatch.setattr(window_wait, "copy_to_clipboard", lambda text: False)
+    keyboard = FakeKeyboard()
+    text = "a sentence long enough to be pasted instead of typed"
+    assert window_wait.type_text(text, keyboard) == "type"
+    assert keyboard.typed == [text]
@@ -0,0 +1,100 @@
+# tts_cache.py
+# Content-addressed cache of synthesized speech, bounded by a disk budget.
+
+import hashlib
+import os
+import threading
+
+CACHE_DIR = os.path.join("cache", "tts")
+MAX_BYTES = 50 * 1024 * 1024
+
+
+class AudioCache:
+    """
+    Stores one audio file per (text, voice, rate, pitch).
+
+    File modification times double as the LRU clock: a hit touches the file,
+    and when the directory grows past max_bytes the oldest files are removed.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_BYTES, extension=".mp3"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(text, voice, rate, pitch):
+        raw = "\x00".join([text.strip(), voice, rate, pitch])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key + self.extension)
+
+    def get(self, key):
+        """Returns the cached file path, or None on a miss."""
+        path = self.path_for(key)
+        with self._lock:
+            if os.path.exists(path) and os.path.getsize(path) > 0:
+                try:
+                    os.utime(path, None)
+                except OSError:
+                    pass
+                self.hits += 1
+                return path
+            self.misses += 1
+            return None
+
+    def contains(self, key):
+        path = self.path_for(key)
+        return os.path.exists(path) and os.path.getsize(path) > 0
+
+    def temp_path(self, key):
+        """A scratch path in the cache directory to synthesize into before store()."""
+        return os.path.join(self.directory, f"{key}.{threading.get_ident()}.tmp")
+
+    def store(self, key, temp_path):
+        """Atomically moves a finished file into the cache and enforces the disk budget."""
+        path = self.path_for(key)
+        with self._lock:
+            os.replace(temp_path, path)
+            self._evict(keep=path)
+        return path
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "bytes": self._total_bytes()}
+
+    def _files(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.extension):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _total_bytes(self):
+        return sum(size for _, size, _ in self._files())
+
+    def _evict(self, keep=None):
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                # Probably still open for playback; try again next time.
+                pass
+
@@ -2,106 +2,504 @@
 # --- MODIFIED to support dynamic Tanglish voice selection ---
 
 import asyncio
+import concurrent.futures
 import edge_tts
+import io
 import os
-import pygame
-import tempfile
+import threading
+import time
+import numpy as np
+import soundfile as sf
+import playback_engine
+from tts_cache import AudioCache
 
 # --- Configuration for Edge TTS ---
 # These are no longer hardcoded globals.
 # VOICE = "en-IN-NeerjaNeural"
 # STYLE = "expressive"
 
-async def _generate_speech(text: str, output_file: str, voice: str, style: str):
+# Voice map for your project
+VOICE_MAP = {
+    ("ta-IN", "MALE"): "ta-IN-ValluvarNeural",
+    ("ta-IN", "FEMALE"): "ta-IN-PallaviNeural",
+    ("en-IN", "FEMALE"): "en-IN-NeerjaNeural",
+    ("en-IN", "MALE"): "en-IN-PrabhatNeural",
+}
+DEFAULT_VOICE = "en-IN-NeerjaNeural"
+RATE = "+0%"
+PITCH = "+0Hz"
+
+# --- Phrase Cache ---
+# Identical (text, voice, rate, pitch) requests are played from disk without synthesis.
+# edge-tts only delivers MP3, so each phrase is decoded once and cached as 16-bit PCM WAV;
+# a hit is a plain read with no decoding.
+CACHE_ENABLED = True
+PCM_CACHE_DIR = os.path.join("cache", "tts_pcm")
+audio_cache = AudioCache(directory=PCM_CACHE_DIR, extension=".wav") if CACHE_ENABLED else None
+
+# Fixed replies synthesized for every VOICE_MAP voice in the background at
+# startup, together with intent_matcher's canned replies (see prewarm_phrases).
+GREETING = "Vanakkam sir, system online. Ready for your command."
+APOLOGY = "Sir, sorry, antha command enakku purila. Vera command try pannunga please."
+PREWARM_PHRASES = [GREETING, APOLOGY]
+
+
+# --- Streaming Playback ---
+# Start playing after the first few MP3 frames arrive instead of waiting for the whole file.
+STREAMING_PLAYBACK = True
+STREAM_FIRST_SEGMENT_FRAMES = 8   # ~0.2 s of 24 kHz audio before playback starts
+STREAM_SEGMENT_FRAMES = 40        # ~1 s per later decode
+STREAM_OVERLAP_FRAMES = 6         # frames re-decoded as context (bit reservoir + MDCT overlap)
+
+
+def resolve_voice(lang="en-IN", gender="FEMALE"):
+    """Returns (voice, style) for a language/gender pair, defaulting to Neerja."""
+    voice = VOICE_MAP.get((lang, gender.upper()), DEFAULT_VOICE)
+    style = "expressive" if "en-" in lang else "default"
+    return voice, style
+
+async def _synthesize_mp3(text: str, voice: str, style: str):
     """
-    Internal async function to generate and save the speech MP3.
+    Internal async function that synthesizes the speech MP3 into memory.
     """
     print(f"TTS: Synthesizing '{text}' with voice {voice} ({style})...")
     try:
-        communicate = edge_tts.Communicate(text, voice, rate="+0%", pitch="+0Hz")
-        await communicate.save(output_file)
+        communicate = edge_tts.Communicate(text, voice, rate=RATE, pitch=PITCH)
+        return await _collect_audio(communicate)
     except Exception as e:
         print(f"TTS Warning: Error during synthesis: {e}")
         # Fallback without style if needed
         communicate = edge_tts.Communicate(text, voice)
-        await communicate.save(output_file)
+        return await _collect_audio(communicate)
+
+async def _collect_audio(communicate):
+    audio = bytearray()
+    async for chunk in communicate.stream():
+        if chunk.get("type") == "audio" and chunk.get("data"):
+            audio.extend(chunk["data"])
+    return bytes(audio)
+
+def _decode_mp3(mp3_bytes):
+    """Decodes a complete MP3 in memory; returns (mono float32 pcm, sample_rate)."""
+    pcm, sample_rate = sf.read(io.BytesIO(mp3_bytes), dtype="float32")
+    return (pcm.mean(axis=1) if pcm.ndim > 1 else pcm), sample_rate
+
+def synthesize_to_cache(text: str, voice: str, style: str = "default"):
+    """
+    Returns the cached PCM path for the text, synthesizing (and decoding) it first on a miss.
+    """
+    key = audio_cache.key(text, voice, RATE, PITCH)
+    cached_path = audio_cache.get(key)
+    if cached_path:
+        print(f"TTS: Cache hit for '{text[:40]}'")
+        return cached_path
+
+    mp3_bytes = asyncio.run(_synthesize_mp3(text, voice, style))
+    if not mp3_bytes:
+        print("TTS Error: Synthesis returned no audio.")
+        return None
+    pcm, sample_rate = _decode_mp3(mp3_bytes)
+    return _store_in_cache(text, voice, pcm, sample_rate)
+
+def prewarm_phrases():
+    """
+    PREWARM_PHRASES and every canned reply, whole (as speak() looks them up)
+    and split into sentences (as speak_segments() gets a streamed reply).
+    """
+    import intent_matcher
+    from command_and_response_giver import split_sentences
+
+    phrases = []
+    for reply in PREWARM_PHRASES + list(intent_matcher.TANGLISH_RESPONSES.values()):
+        for phrase in [reply] + split_sentences(reply):
+            if phrase not in phrases:
+                phrases.append(phrase)
+    return phrases
+
+def prewarm_cache(phrases=None, voices=None):
+    """
+    Synthesizes common phrases (prewarm_phrases() by default) for every voice
+    on a background thread. Returns the thread (or None when caching is disabled).
+    """
+    if audio_cache is None:
+        return None
+
+    phrases = prewarm_phrases() if phrases is None else phrases
+    voices = list(VOICE_MAP.values()) if voices is None else voices
+
+    def warm():
+        for voice in voices:
+            for phrase in phrases:
+                if audio_cache.contains(audio_cache.key(phrase, voice, RATE, PITCH)):
+                    continue
+                try:
+                    synthesize_to_cache(phrase, voice)
+                except Exception as e:
+                    print(f"TTS Warning: Pre-warm failed for {voice}: {e}")
+        print(f"TTS: Pre-warm complete ({len(phrases)} phrases x {len(voices)} voices).")
+
+    thread = threading.Thread(target=warm, name="tts-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+# --- MP3 frame handling for progressive decoding ---
+_MP3_BITRATES = {
+    "mpeg1": [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    "mpeg2": [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+def _parse_mp3_header(data, pos):
+    """Returns (frame_length, samples_per_frame) for a Layer III header at pos, or None."""
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+    version = (data[pos + 1] >> 3) & 0x3
+    layer = (data[pos + 1] >> 1) & 0x3
+    bitrate_index = (data[pos + 2] >> 4) & 0xF
+    rate_index = (data[pos + 2] >> 2) & 0x3
+    padding = (data[pos + 2] >> 1) & 0x1
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    bitrate = _MP3_BITRATES["mpeg1" if version == 3 else "mpeg2"][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    if version == 3:
+        return 144 * bitrate // sample_rate + padding, 1152
+    return 72 * bitrate // sample_rate + padding, 576
+
+def split_mp3_frames(data):
+    """
+    Splits a byte buffer into complete MP3 frames.
+    Returns (frames, samples_per_frame, consumed_bytes); the rest stays buffered.
+    """
+    frames, samples_per_frame, pos = [], None, 0
+    while pos + 4 <= len(data):
+        header = _parse_mp3_header(data, pos)
+        if header is None:
+            pos += 1  # resync on garbage / tags
+            continue
+        length, samples_per_frame = header
+        if pos + length > len(data):
+            break
+        frames.append(bytes(data[pos:pos + length]))
+        pos += length
+    return frames, samples_per_frame, pos
+
+class ProgressiveMP3Decoder:
+    """
+    Decodes an MP3 byte stream in batches of whole frames as it arrives.
+
+    Each batch is decoded together with the last few already-played frames
+    so the bit reservoir is available, and the samples of those context
+    frames are dropped from the output.
+    """
+
+    def __init__(self, first_frames=STREAM_FIRST_SEGMENT_FRAMES, segment_frames=STREAM_SEGMENT_FRAMES,
+                 overlap_frames=STREAM_OVERLAP_FRAMES):
+        self.first_frames = first_frames
+        self.segment_frames = segment_frames
+        self.overlap_frames = overlap_frames
+        self.sample_rate = None
+        self._buffer = bytearray()
+        self._pending = []
+        self._context = []
+        self._samples_per_frame = 576
+        self._started = False
+
+    def feed(self, data):
+        """Adds raw bytes; returns the list of PCM arrays that became decodable."""
+        self._buffer.extend(data)
+        frames, samples_per_frame, consumed = split_mp3_frames(self._buffer)
+        del self._buffer[:consumed]
+        if samples_per_frame:
+            self._samples_per_frame = samples_per_frame
+        self._pending.extend(frames)
+
+        decoded = []
+        target = self.segment_frames if self._started else self.first_frames
+        while len(self._pending) >= target:
+            batch, self._pending = self._pending[:target], self._pending[target:]
+            decoded.append(self._decode(batch))
+            target = self.segment_frames
+        return decoded
+
+    def flush(self):
+        """Decodes whatever complete frames are left at the end of the stream."""
+        if not self._pending:
+            return []
+        batch, self._pending = self._pending, []
+        return [self._decode(batch)]
+
+    def _decode(self, batch):
+        self._started = True
+        data = b"".join(self._context + batch)
+        pcm, self.sample_rate = sf.read(io.BytesIO(data), dtype="float32")
+        if pcm.ndim > 1:
+            pcm = pcm.mean(axis=1)
+        pcm = pcm[len(self._context) * self._samples_per_frame:]
+        self._context = (self._context + batch)[-self.overlap_frames:] if self.overlap_frames else []
+        return pcm
+
+class ChunkedFileCommunicate:
+    """
+    Local stand-in for edge_tts.Communicate that replays an MP3 file in chunks.
+    Lets the streaming path be exercised without network access:
+        speak_streaming("ignored", "any", communicate_factory=ChunkedFileCommunicate.factory("x.mp3"))
+    """
+
+    def __init__(self, path, chunk_size=2048, delay=0.05):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.delay = delay
+
+    @classmethod
+    def factory(cls, path, **kwargs):
+        return lambda text, voice, **_: cls(path, **kwargs)
+
+    async def stream(self):
+        with open(self.path, "rb") as f:
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                await asyncio.sleep(self.delay)
+                yield {"type": "audio", "data": chunk}
+
+async def _stream_audio_chunks(text, voice, communicate_factory, on_chunk, stopped=None):
+    communicate = communicate_factory(text, voice, rate=RATE, pitch=PITCH)
+    async for chunk in communicate.stream():
+        if stopped is not None and stopped():
+            break
+        if chunk.get("type") == "audio" and chunk.get("data"):
+            on_chunk(chunk["data"])
 
-def speak(text: str, **kwargs):
+def _synthesize_pcm(text, voice, put, communicate_factory=edge_tts.Communicate, stopped=None):
     """
-    Synthesizes speech using edge-tts and plays it with pygame.
-    
+    Streams one synthesis and calls put(pcm, sample_rate) for every decoded batch.
+    Returns the complete (pcm, sample_rate) so the caller can cache it, or
+    (None, None) if stopped() turned true (playback was interrupted) first.
+    """
+    decoder = ProgressiveMP3Decoder()
+    decoded = []
+
+    def emit(pcm):
+        decoded.append(pcm)
+        put(pcm, decoder.sample_rate)
+
+    def on_chunk(data):
+        for pcm in decoder.feed(data):
+            emit(pcm)
+
+    asyncio.run(_stream_audio_chunks(text, voice, communicate_factory, on_chunk, stopped))
+    if stopped is not None and stopped():
+        return None, None
+    for pcm in decoder.flush():
+        emit(pcm)
+    if not decoded:
+        return None, None
+    return np.concatenate(decoded), decoder.sample_rate
+
+def _cached_pcm(text, voice):
+    """Returns (pcm, sample_rate) for a cached phrase, or None on a miss."""
+    if audio_cache is None:
+        return None
+    cached_path = audio_cache.get(audio_cache.key(text, voice, RATE, PITCH))
+    if not cached_path:
+        return None
+    print(f"TTS: Cache hit for '{text[:40]}'")
+    pcm, sample_rate = sf.read(cached_path, dtype="float32")
+    return (pcm.mean(axis=1) if pcm.ndim > 1 else pcm), sample_rate
+
+def _store_in_cache(text, voice, pcm, sample_rate):
+    """Writes decoded speech to the cache as 16-bit PCM WAV; returns its path."""
+    if audio_cache is None or pcm is None or not len(pcm):
+        return None
+    key = audio_cache.key(text, voice, RATE, PITCH)
+    temp_path = audio_cache.temp_path(key)
+    sf.write(temp_path, pcm, sample_rate, format="WAV", subtype="PCM_16")
+    return audio_cache.store(key, temp_path)
+
+def _open_playback(requested_at=None, context=None):
+    """A Playback on the shared engine that is stopped if the turn (turn_context.TurnContext) is cancelled."""
+    playback = playback_engine.get_engine().open(requested_at)
+    if context is not None:
+        context.on_cancel(playback.stop)
+    return playback
+
+def _play(pcm, sample_rate, requested_at=None, context=None):
+    playback = _open_playback(requested_at, context)
+    playback.write(pcm, sample_rate)
+    playback.close()
+    return playback
+
+def _wait(playback):
+    """Blocks until the playback engine has played everything and logs the start latency."""
+    playback.wait()
+    if playback.start_latency is not None:
+        print(f"TTS: Playback complete (first audio after {playback.start_latency:.2f}s).")
+
+class PartialPlaybackError(Exception):
+    """Streaming synthesis failed after part of the reply had already been played."""
+
+
+def speak_streaming(text: str, voice: str, communicate_factory=edge_tts.Communicate, requested_at=None,
+                    context=None):
+    """
+    Streams synthesis into the playback engine: decoding and playback start
+    after the first few frames instead of after the whole MP3 has arrived.
+    Returns the complete (pcm, sample_rate) so the caller can cache it.
+    A failure is re-raised as is if nothing was played yet (the caller can
+    retry from the start), or as PartialPlaybackError if some audio was.
+    """
+    print(f"TTS: Streaming '{text}' with voice {voice}...")
+    playback = _open_playback(requested_at, context)
+    result = {}
+
+    def produce():
+        try:
+            result["pcm"] = _synthesize_pcm(text, voice, playback.write, communicate_factory,
+                                            stopped=lambda: playback.stopped)
+        except Exception as e:
+            result["error"] = e
+        finally:
+            playback.close()
+
+    threading.Thread(target=produce, name="tts-stream", daemon=True).start()
+    _wait(playback)
+
+    if "error" in result:
+        if playback.started.is_set():
+            raise PartialPlaybackError(str(result["error"])) from result["error"]
+        raise result["error"]
+    return result["pcm"]
+
+def speak_segments(segments, communicate_factory=edge_tts.Communicate, context=None, **kwargs):
+    """
+    Speaks an iterable of text segments (e.g. sentences from responser_stream)
+    as they arrive. Segment n+1 is synthesized while segment n is playing.
+    If the playback is stopped (barge-in, or the turn context is cancelled),
+    the remaining segments are dropped. An error raised by `segments` (the
+    LLM reply failed mid-stream) or by synthesis is re-raised once whatever
+    was already queued has been played.
+
+    Args:
+        segments: Iterable of strings; it is consumed on a background thread
+        context: Optional turn_context.TurnContext that stops playback when cancelled
+        **kwargs: Same voice options as speak() (lang, gender)
+    """
+    voice, _ = resolve_voice(kwargs.get("lang", "en-IN"), kwargs.get("gender", "FEMALE"))
+    playback = _open_playback(context=context)
+    result = {}
+
+    def produce():
+        try:
+            for segment in segments:
+                if playback.stopped:
+                    break
+                if not segment or not segment.strip():
+                    continue
+                cached = _cached_pcm(segment, voice)
+                if cached is not None:
+                    playback.write(*cached)
+                    continue
+                print(f"TTS: Streaming segment '{segment}' with voice {voice}...")
+                pcm, sample_rate = _synthesize_pcm(segment, voice, playback.write, communicate_factory,
+                                                   stopped=lambda: playback.stopped)
+                _store_in_cache(segment, voice, pcm, sample_rate)
+        except concurrent.futures.CancelledError:
+            print("TTS: Reply stream cancelled (turn superseded).")
+        except Exception as e:
+            result["error"] = e
+        finally:
+            playback.close()
+
+    threading.Thread(target=produce, name="tts-segments", daemon=True).start()
+    _wait(playback)
+
+    if "error" in result:
+        raise result["error"]
+
+def speak(text: str, context=None, **kwargs):
+    """
+    Synthesizes speech using edge-tts and plays it on the shared playback
+    engine (streamed as it arrives when STREAMING_PLAYBACK is on, otherwise
+    after the whole reply is synthesized). Nothing is written to temp files.
+
     Args:
         text: The text to speak
+        context: Optional turn_context.TurnContext; cancelling it stops
+            synthesis and playback, and speak() returns at once
         **kwargs: Now supports lang="ta-IN" and gender="MALE"
     """
     if not text or not text.strip():
         print("TTS Warning: Received empty text. Nothing to speak.")
         return
-    
+    if context is not None and context.cancelled:
+        return
+
+    requested_at = time.time()
+
     # --- Dynamic Voice Selection ---
     lang = kwargs.get("lang", "en-IN")
     gender = kwargs.get("gender", "FEMALE").upper()
-    
-    # Voice map for your project
-    VOICE_MAP = {
-        ("ta-IN", "MALE"): "ta-IN-ValluvarNeural",
-        ("ta-IN", "FEMALE"): "ta-IN-PallaviNeural",
-        ("en-IN", "FEMALE"): "en-IN-NeerjaNeural",
-        ("en-IN", "MALE"): "en-IN-PrabhatNeural",
-    }
-    
-    # Default to Neerja if no match
-    VOICE = VOICE_MAP.get((lang, gender), "en-IN-NeerjaNeural")
-    STYLE = "expressive" if "en-" in lang else "default"
+    VOICE, STYLE = resolve_voice(lang, gender)
     # -------------------------------
-    
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
-    temp_path = temp_file.name
-    temp_file.close()
-    
+
     try:
-        # 1. Generate the speech file with the correct voice
-        asyncio.run(_generate_speech(text, temp_path, VOICE, STYLE))
-        
-        if not os.path.exists(temp_path):
-            print("TTS Error: File generation failed.")
+        # 1. Play a cached phrase straight from its PCM
+        cached = _cached_pcm(text, VOICE)
+        if cached is not None:
+            _wait(_play(*cached, requested_at=requested_at, context=context))
+            return
+
+        # 2. Stream a fresh synthesis into the engine
+        if STREAMING_PLAYBACK:
+            try:
+                pcm, sample_rate = speak_streaming(text, VOICE, requested_at=requested_at, context=context)
+                _store_in_cache(text, VOICE, pcm, sample_rate)
+                return
+            except PartialPlaybackError as e:
+                # Replaying from the start would repeat what the user already heard.
+                print(f"TTS Error: Streaming playback failed part-way through ({e}).")
+                return
+            except Exception as e:
+                print(f"TTS Warning: Streaming playback failed ({e}), falling back to whole-reply playback.")
+
+        # 3. Synthesize the whole reply in memory, decode it once and play it
+        if context is not None and context.cancelled:
+            return
+        mp3_bytes = asyncio.run(_synthesize_mp3(text, VOICE, STYLE))
+        if not mp3_bytes:
+            print("TTS Error: Synthesis returned no audio.")
             return
-        
-        # 2. Initialize pygame mixer
-        if not pygame.mixer.get_init():
-            pygame.mixer.init()
-        
-        # 3. Load and play the audio
-        print(f"TTS: Playing audio with {VOICE}...")
-        pygame.mixer.music.load(temp_path)
-        pygame.mixer.music.play()
-        
-        # 4. Wait for playback to finish
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(10)
-        
-        print("TTS: Playback complete.")
-        
+        pcm, sample_rate = _decode_mp3(mp3_bytes)
+        _store_in_cache(text, VOICE, pcm, sample_rate)
+        if context is not None and context.cancelled:
+            return
+        _wait(_play(pcm, sample_rate, requested_at=requested_at, context=context))
+
     except Exception as e:
         print(f"CRITICAL TTS ERROR: {e}")
-        print("Make sure pygame is installed: pip install pygame")
-    
-    finally:
-        # 5. Clean up
-        pygame.mixer.music.unload() if pygame.mixer.get_init() else None
-        if os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except:
-                pass
 
 if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 2 and sys.argv[1] == "--stream-test":
+        # Replays a local MP3 in chunks through the streaming path (no network needed).
+        print(f"Testing streaming playback with local stand-in {sys.argv[2]}...")
+        speak_streaming("stand-in", DEFAULT_VOICE, communicate_factory=ChunkedFileCommunicate.factory(sys.argv[2]))
+        sys.exit(0)
+
     # --- Test commands ---
     print("Testing Edge TTS with ta-IN-ValluvarNeural (Tanglish Male)...")
-    speak("Vanakkam sir, system online. Ready for your command.", lang="ta-IN", gender="MALE")
-    
+    speak(GREETING, lang="ta-IN", gender="MALE")
+
     print("\nTesting Creator Info...")
     speak("Enna create pannadhu Arun Kumar M.", lang="ta-IN", gender="MALE")
-    
+
     print("\nTesting English (Female)...")
-    speak("Hello! I am your voice assistant.", lang="en-IN", gender="FEMALE")
\ No newline at end of file
+    speak("Hello! I am your voice assistant.", lang="en-IN", gender="FEMALE")
+
+    print("\nTesting cache (second call should not synthesize)...")
+    speak("Hello! I am your voice assistant.", lang="en-IN", gender="FEMALE")
+    print(f"Cache stats: {audio_cache.stats() if audio_cache else 'disabled'}")
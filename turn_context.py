@@ -0,0 +1,73 @@
+# turn_context.py
+# Per-turn cancellation token shared by recording, ASR, LLM calls, tools and playback.
+
+import concurrent.futures
+import threading
+
+
+class TurnCancelled(concurrent.futures.CancelledError):
+    """Raised by TurnContext.check() once the turn was cancelled (superseded or aborted)."""
+
+
+class TurnContext:
+    """
+    Cancellation token for one turn.
+
+    Long-running stages either poll it (check() raises TurnCancelled,
+    which the existing `except concurrent.futures.CancelledError` handlers
+    already treat as "turn superseded") or register a callback with
+    on_cancel() that releases what they hold: the LLM requests, the Whisper
+    decode, the tool queue and the playback. It also quacks like a
+    threading.Event (is_set/wait), so it can be passed as a stop_event.
+    """
+
+    def __init__(self, name="turn"):
+        self.name = name
+        self.reason = None
+        self.tasks = None   # the turn's task_scheduler.TaskRun, once process_command has started it
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def cancel(self, reason="superseded"):
+        """Cancels the turn and runs the registered callbacks (once). Returns False if already cancelled."""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        print(f"⛔ {self.name} cancelled ({reason}).")
+        for callback in callbacks:
+            self._run(callback)
+        return True
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise TurnCancelled(f"{self.name} {self.reason}")
+
+    def on_cancel(self, callback):
+        """Runs callback when the turn is cancelled (right away if it already was)."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        self._run(callback)
+
+    # threading.Event interface, for APIs that take a stop_event
+    def is_set(self):
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        return self._event.wait(timeout)
+
+    @staticmethod
+    def _run(callback):
+        try:
+            callback()
+        except Exception as e:
+            print(f"Turn cancel callback failed: {e}")
@@ -0,0 +1,241 @@
+# vad.py
+# Voice activity detection for the recorder: a preallocated ring buffer,
+# vectorized energy/spectral features and adaptive end-of-speech detection.
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_SIZE = 256               # 16 ms analysis frames; capture blocks are whole multiples
+MIN_RMS = 0.005                # absolute floor (speech-band RMS) for "loud enough to be speech"
+ENERGY_RATIO = 1.8             # speech-band RMS must be this many times the noise floor
+SPEECH_BAND = (250.0, 3800.0)  # Hz
+MAX_FLATNESS = 0.5             # in-band spectral flatness: white noise ~1, voiced speech much lower
+
+CALIBRATION_TIME = 0.5         # seconds used to seed the noise floor
+NOISE_ADAPT = 0.05             # how fast the floor follows non-speech frames (EMA weight)
+ONSET_TIME = 0.048             # this much consecutive speech starts an utterance
+PRE_ROLL = 0.3                 # audio kept from before the onset (soft word starts)
+TAIL_PAD = 0.15                # audio kept after the last speech frame
+
+# Adaptive end of speech: short commands stop after MIN_HANGOVER of silence;
+# longer speech, and speakers who pause mid-sentence, get more (up to MAX_HANGOVER).
+# MIN_HANGOVER stays above a typical mid-command pause (~0.45 s, "open notepad ... and write"),
+# which a short first phrase hasn't yet earned any extra hangover for.
+MIN_HANGOVER = 0.5
+MAX_HANGOVER = 1.0
+HANGOVER_PER_SPEECH_SECOND = 0.15
+PAUSE_MARGIN = 1.25            # hangover stays this much above the longest pause seen so far
+PAUSE_EVENT_TIME = 0.2         # silence this long is reported as a pause (streaming ASR commits)
+
+# States
+CALIBRATING = "calibrating"
+WAITING = "waiting"
+SPEAKING = "speaking"
+DONE = "done"
+
+
+class RingBuffer:
+    """
+    Fixed-size float32 ring addressed by absolute sample position.
+    write() copies into preallocated storage; nothing is allocated per block.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self.data = np.zeros(self.capacity, dtype=np.float32)
+        self.total = 0  # samples written so far (absolute position of the next sample)
+
+    def write(self, samples):
+        samples = samples.reshape(-1)
+        n = len(samples)
+        if n >= self.capacity:
+            samples = samples[-self.capacity:]
+            self.total += n - self.capacity
+            n = self.capacity
+        start = self.total % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        if first < n:
+            self.data[:n - first] = samples[first:]
+        self.total += n
+
+    def oldest(self):
+        return max(0, self.total - self.capacity)
+
+    def read(self, start, end=None):
+        """Copy of samples [start, end) by absolute position (clamped to what is still held)."""
+        end = self.total if end is None else min(end, self.total)
+        start = max(start, self.oldest())
+        if start >= end:
+            return np.zeros(0, dtype=np.float32)
+        a, n = start % self.capacity, end - start
+        if a + n <= self.capacity:
+            return self.data[a:a + n].copy()
+        return np.concatenate((self.data[a:], self.data[:a + n - self.capacity]))
+
+
+_analysis_cache = {}
+
+
+def _analysis(frame_size, sample_rate):
+    key = (frame_size, sample_rate)
+    if key not in _analysis_cache:
+        window = np.hanning(frame_size).astype(np.float32)
+        freqs = np.fft.rfftfreq(frame_size, 1.0 / sample_rate)
+        band = (freqs >= SPEECH_BAND[0]) & (freqs <= SPEECH_BAND[1])
+        # Scales summed |X|^2 over the band back to a time-domain mean square.
+        scale = 2.0 / (frame_size * float(np.sum(window ** 2)))
+        _analysis_cache[key] = (window, band, scale)
+    return _analysis_cache[key]
+
+
+def frame_features(samples, sample_rate=SAMPLE_RATE, frame_size=FRAME_SIZE):
+    """
+    Per-frame (band_rms, flatness) for a 1-D signal, computed
+    for all frames at once with one batched FFT. band_rms is the RMS of the
+    SPEECH_BAND part of the frame, so hum and low-frequency rumble don't
+    count as voice. Trailing samples that don't fill a frame are ignored.
+    """
+    samples = samples.reshape(-1)
+    count = len(samples) // frame_size
+    frames = samples[:count * frame_size].reshape(count, frame_size)
+    window, band, scale = _analysis(frame_size, sample_rate)
+
+    power = np.abs(np.fft.rfft(frames * window, axis=1)) ** 2 + 1e-12
+    band_power = power[:, band].sum(axis=1)
+    band_rms = np.sqrt(band_power * scale)
+    in_band = power[:, band]
+    flatness = np.exp(np.mean(np.log(in_band), axis=1)) / np.mean(in_band, axis=1)
+    return band_rms, flatness
+
+
+class VoiceActivityDetector:
+    """
+    Frame-level speech detector and endpointer for one utterance.
+
+    process(block) is cheap enough for the audio callback: it writes the
+    block into the ring, classifies its frames in bulk and advances the
+    state machine, returning a list of (event, sample_position) tuples:
+    "calibrated", "start", "pause", "resume" and "end". Nothing is printed.
+    After "end", utterance() returns the audio from PRE_ROLL before the
+    onset to TAIL_PAD after the last speech frame.
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, max_seconds=30.0, calibration_time=CALIBRATION_TIME,
+                 min_hangover=MIN_HANGOVER, max_hangover=MAX_HANGOVER, min_rms=MIN_RMS, noise_floor=None):
+        self.sample_rate = sample_rate
+        self.min_rms = min_rms
+        self.ring = RingBuffer(int((max_seconds + PRE_ROLL + 1.0) * sample_rate))
+        self.min_hangover = min_hangover
+        self.max_hangover = max_hangover
+        self.calibration_samples = int(calibration_time * sample_rate)
+
+        self.state = CALIBRATING if noise_floor is None and self.calibration_samples > 0 else WAITING
+        self.noise_floor = noise_floor or 0.0
+        self._calibration_energy = []
+        self._onset_frames = max(1, int(round(ONSET_TIME * sample_rate / FRAME_SIZE)))
+        self._run = 0                 # consecutive speech frames while waiting
+        self._pending = np.zeros(0, dtype=np.float32)
+
+        self.speech_start = None      # absolute sample of the first speech frame
+        self.last_speech = None       # absolute sample just after the last speech frame
+        self.speech_samples = 0
+        self.longest_pause = 0
+        self._paused = False
+        self.end = None
+
+    # --- Per block ---
+
+    def process(self, block):
+        block = block.reshape(-1)
+        block_start = self.ring.total
+        self.ring.write(block)
+        if self.state == DONE:
+            return []
+
+        # Frames are analysed in bulk; a partial frame waits for the next block.
+        if len(self._pending):
+            samples = np.concatenate((self._pending, block))
+            first_pos = block_start - len(self._pending)
+        else:
+            samples, first_pos = block, block_start
+        usable = len(samples) - len(samples) % FRAME_SIZE
+        self._pending = samples[usable:].copy() if usable < len(samples) else np.zeros(0, dtype=np.float32)
+        if usable == 0:
+            return []
+
+        energy, flatness = frame_features(samples[:usable], self.sample_rate)
+        events = []
+
+        if self.state == CALIBRATING:
+            self._calibration_energy.append(energy)
+            if self.ring.total >= self.calibration_samples:
+                self.noise_floor = float(np.mean(np.concatenate(self._calibration_energy)))
+                self.state = WAITING
+                events.append(("calibrated", self.ring.total))
+            return events
+
+        threshold = max(self.min_rms, self.noise_floor * ENERGY_RATIO)
+        speech = (energy > threshold) & (flatness < MAX_FLATNESS)
+
+        for i in range(len(speech)):
+            pos = first_pos + i * FRAME_SIZE
+            if self.state == WAITING:
+                if speech[i]:
+                    self._run += 1
+                    if self._run >= self._onset_frames:
+                        self.state = SPEAKING
+                        self.speech_start = pos - (self._run - 1) * FRAME_SIZE
+                        self.last_speech = pos + FRAME_SIZE
+                        self.speech_samples = self._run * FRAME_SIZE
+                        events.append(("start", self.speech_start))
+                else:
+                    self._run = 0
+                    self.noise_floor += NOISE_ADAPT * (energy[i] - self.noise_floor)
+            elif self.state == SPEAKING:
+                if speech[i]:
+                    gap = pos - self.last_speech
+                    if self._paused:
+                        self.longest_pause = max(self.longest_pause, gap)
+                        self._paused = False
+                        events.append(("resume", pos))
+                    self.last_speech = pos + FRAME_SIZE
+                    self.speech_samples += FRAME_SIZE
+                else:
+                    silence = pos + FRAME_SIZE - self.last_speech
+                    if not self._paused and silence >= PAUSE_EVENT_TIME * self.sample_rate:
+                        self._paused = True
+                        events.append(("pause", self.last_speech))
+                    if silence >= self.hangover() * self.sample_rate:
+                        self.state = DONE
+                        self.end = pos + FRAME_SIZE
+                        events.append(("end", self.end))
+                        break
+        return events
+
+    def hangover(self):
+        """Seconds of silence that end the current utterance."""
+        speech_seconds = self.speech_samples / self.sample_rate
+        hang = self.min_hangover + HANGOVER_PER_SPEECH_SECOND * speech_seconds
+        hang = max(hang, PAUSE_MARGIN * self.longest_pause / self.sample_rate)
+        return min(self.max_hangover, hang)
+
+    # --- Results ---
+
+    def speech_started(self):
+        return self.speech_start is not None
+
+    def utterance_bounds(self):
+        """(start, end) absolute sample positions of the utterance audio, or None."""
+        if self.speech_start is None:
+            return None
+        start = max(self.ring.oldest(), self.speech_start - int(PRE_ROLL * self.sample_rate))
+        end = min(self.ring.total, self.last_speech + int(TAIL_PAD * self.sample_rate))
+        return start, end
+
+    def utterance(self):
+        """The captured utterance as a 1-D float32 array, or None if no speech was detected."""
+        bounds = self.utterance_bounds()
+        if bounds is None:
+            return None
+        return self.ring.read(*bounds)
@@ -0,0 +1,285 @@
+# wake_word.py
+# Lightweight "Jarvis" keyword spotter for hands-free mode: log-mel features
+# matched against a few enrolled recordings with DTW, only while the VAD hears speech.
+#
+# Enroll once (records TEMPLATE_COUNT samples of you saying the wake word):
+#     python wake_word.py enroll
+
+import glob
+import os
+import sys
+import time
+import wave
+import numpy as np
+import vad
+
+SAMPLE_RATE = 16000
+WAKE_WORD = "Jarvis"
+TEMPLATE_DIR = "wake_word_templates"
+TEMPLATE_COUNT = 3
+MIN_TEMPLATES = 2
+
+# Log-mel front end (25 ms windows, 10 ms hop).
+WIN = 400
+HOP = 160
+N_FFT = 512
+N_MELS = 24
+MEL_RANGE = (100.0, 4000.0)
+DYNAMIC_RANGE = 3.5        # nats (~15 dB) below each frame's peak band; weaker bands are clamped
+
+# Matching
+THRESHOLD_MARGIN = 1.35   # accept up to this many times the worst distance between two templates
+MAX_STRETCH = 1.6         # the spoken wake word may be this much faster/slower than a template
+BURST_PREROLL = 0.1       # audio kept before the VAD onset of a burst
+BURST_GAP = 0.15          # silence that ends a burst
+MIN_BURST = 0.25          # shorter bursts (clicks, coughs) are never matched
+RING_SECONDS = 4.0
+
+
+def _hz_to_mel(hz):
+    return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+
+def _mel_to_hz(mel):
+    return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+
+def _mel_filterbank(sample_rate=SAMPLE_RATE):
+    freqs = np.fft.rfftfreq(N_FFT, 1.0 / sample_rate)
+    edges = _mel_to_hz(np.linspace(_hz_to_mel(MEL_RANGE[0]), _hz_to_mel(MEL_RANGE[1]), N_MELS + 2))
+    bank = np.zeros((N_MELS, len(freqs)), dtype=np.float32)
+    for m in range(N_MELS):
+        low, center, high = edges[m], edges[m + 1], edges[m + 2]
+        rising = (freqs - low) / (center - low)
+        falling = (high - freqs) / (high - center)
+        bank[m] = np.maximum(0.0, np.minimum(rising, falling))
+    return bank
+
+
+_FILTERBANK = _mel_filterbank()
+_WINDOW = np.hanning(WIN).astype(np.float32)
+
+
+def log_mel(samples):
+    """
+    (frames, N_MELS) log-mel features for a 1-D float32 signal. Each frame
+    is clamped to DYNAMIC_RANGE below its strongest band, so background noise
+    in the weak bands doesn't dominate the distance, and has its mean removed
+    so that microphone gain and distance don't matter.
+    """
+    samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+    if len(samples) < WIN:
+        return np.zeros((0, N_MELS), dtype=np.float32)
+    frames = np.lib.stride_tricks.sliding_window_view(samples, WIN)[::HOP]
+    power = np.abs(np.fft.rfft(frames * _WINDOW, N_FFT, axis=1)) ** 2
+    features = np.log(power @ _FILTERBANK.T + 1e-10)
+    features = np.maximum(features, features.max(axis=1, keepdims=True) - DYNAMIC_RANGE)
+    return features - features.mean(axis=1, keepdims=True)
+
+
+def dtw_match(template, segment):
+    """
+    Subsequence DTW: aligns the whole template with the best-matching stretch
+    of segment (free start and end). Returns (cost, end): the path cost per
+    template frame and the segment frame just after the match.
+    """
+    t_len, s_len = len(template), len(segment)
+    if t_len == 0 or s_len < t_len / MAX_STRETCH:
+        return np.inf, 0
+    # Euclidean frame distances for the whole grid at once; only the recursion is a loop.
+    diff = template[:, None, :] - segment[None, :, :]
+    cost = np.sqrt(np.einsum("ijk,ijk->ij", diff, diff)).tolist()
+
+    previous = cost[0]
+    for i in range(1, t_len):
+        row = cost[i]
+        current = [0.0] * s_len
+        left = np.inf
+        for j in range(s_len):
+            best = min(previous[j], left, previous[j - 1] if j else np.inf)
+            left = current[j] = row[j] + best
+        previous = current
+
+    end = int(np.argmin(previous))
+    return previous[end] / t_len, end + 1
+
+
+# --- Templates ---
+
+def _read_wav(path):
+    with wave.open(path, "rb") as f:
+        if f.getframerate() != SAMPLE_RATE or f.getsampwidth() != 2:
+            raise ValueError(f"{path}: needs {SAMPLE_RATE} Hz 16-bit PCM")
+        channels = f.getnchannels()
+        frames = f.readframes(f.getnframes())
+    return (np.frombuffer(frames, dtype=np.int16).reshape(-1, channels).mean(axis=1) / 32767.0).astype(np.float32)
+
+
+def _trim(samples):
+    """Cuts a recording down to its speech (speech-band energy within 20 dB of the peak)."""
+    energy, _ = vad.frame_features(samples, SAMPLE_RATE)
+    loud = np.flatnonzero(energy > energy.max() * 0.1) if len(energy) else []
+    if not len(loud):
+        return samples
+    return samples[loud[0] * vad.FRAME_SIZE:(loud[-1] + 1) * vad.FRAME_SIZE]
+
+
+def template_features(recordings):
+    return [log_mel(_trim(samples)) for samples in recordings]
+
+
+def calibrate_threshold(templates):
+    """Acceptance threshold from how far apart the enrolled templates are from each other."""
+    costs = [dtw_match(a, b)[0] for i, a in enumerate(templates) for j, b in enumerate(templates) if i != j]
+    finite = [c for c in costs if np.isfinite(c)]
+    if not finite:
+        raise ValueError("Wake word templates are too different in length to compare.")
+    return THRESHOLD_MARGIN * max(finite)
+
+
+def load_templates(directory=TEMPLATE_DIR):
+    """
+    Enrolled template features from directory, or None if fewer than
+    MIN_TEMPLATES recordings are there.
+    """
+    paths = sorted(glob.glob(os.path.join(directory, "*.wav")))
+    if len(paths) < MIN_TEMPLATES:
+        return None
+    return template_features([_read_wav(path) for path in paths])
+
+
+class WakeWordSpotter:
+    """
+    Streaming wake-word detector, fed the same blocks as the recorder.
+
+    Every block goes through the cheap vad.frame_features gate; log-mel
+    features and DTW run only on speech bursts, once per burst. process()
+    returns None, or the absolute sample position where the wake word ended,
+    so the audio right after it (often the start of the command) can be
+    handed to the recorder from self.ring.
+    """
+
+    def __init__(self, templates, threshold=None, sample_rate=SAMPLE_RATE,
+                 calibration_time=vad.CALIBRATION_TIME, noise_floor=None):
+        self.templates = templates
+        self.threshold = threshold if threshold is not None else calibrate_threshold(templates)
+        self.sample_rate = sample_rate
+        self.ring = vad.RingBuffer(int(RING_SECONDS * sample_rate))
+        self.max_template = max(len(t) for t in templates) * HOP + WIN
+        self.noise_floor = noise_floor or 0.0
+        self.calibration_samples = int(calibration_time * sample_rate)
+        self._calibrating = noise_floor is None and self.calibration_samples > 0
+        self._calibration_energy = []
+
+        self._burst_start = None
+        self._last_speech = None
+        self._checked = False   # a long burst is matched once, then ignored until the next gap
+
+        # Stats
+        self.busy_seconds = 0.0
+        self.checks = 0
+        self.triggers = 0
+        self.last_cost = None
+
+    def process(self, block):
+        started = time.perf_counter()
+        try:
+            return self._process(block.reshape(-1))
+        finally:
+            self.busy_seconds += time.perf_counter() - started
+
+    def _process(self, block):
+        block_start = self.ring.total
+        self.ring.write(block)
+        energy, flatness = vad.frame_features(block, self.sample_rate)
+        if not len(energy):
+            return None
+
+        if self._calibrating:
+            self._calibration_energy.append(energy)
+            if self.ring.total >= self.calibration_samples:
+                self.noise_floor = float(np.median(np.concatenate(self._calibration_energy)))
+                self._calibrating = False
+            return None
+
+        threshold = max(vad.MIN_RMS, self.noise_floor * vad.ENERGY_RATIO)
+        speech = (energy > threshold) & (flatness < vad.MAX_FLATNESS)
+        now = self.ring.total
+
+        if speech.any():
+            last = block_start + (int(np.flatnonzero(speech)[-1]) + 1) * vad.FRAME_SIZE
+            if self._burst_start is None:
+                first = block_start + int(np.flatnonzero(speech)[0]) * vad.FRAME_SIZE
+                self._burst_start = max(self.ring.oldest(), first - int(BURST_PREROLL * self.sample_rate))
+                self._checked = False
+            self._last_speech = last
+        elif self._burst_start is None:
+            self.noise_floor += vad.NOISE_ADAPT * (float(energy.mean()) - self.noise_floor)
+            return None
+
+        gap = now - self._last_speech >= BURST_GAP * self.sample_rate
+        long_enough = now - self._burst_start >= self.max_template * MAX_STRETCH
+        wake_end = None
+        if not self._checked and (gap or long_enough):
+            self._checked = True
+            if self._last_speech - self._burst_start >= MIN_BURST * self.sample_rate:
+                wake_end = self._match(self._burst_start, min(now, self._burst_start + int(self.max_template * MAX_STRETCH)))
+        if gap or wake_end is not None:
+            self._burst_start = None
+        return wake_end
+
+    def _match(self, start, end):
+        self.checks += 1
+        features = log_mel(self.ring.read(start, end))
+        cost, end = min(dtw_match(template, features) for template in self.templates)
+        self.last_cost = cost
+        if cost > self.threshold:
+            return None
+        self.triggers += 1
+        return start + (end - 1) * HOP + WIN
+
+    def cpu_load(self):
+        """Share of one core spent in process(), relative to the audio it was fed."""
+        audio_seconds = self.ring.total / self.sample_rate
+        return self.busy_seconds / audio_seconds if audio_seconds else 0.0
+
+    def stats(self):
+        return {
+            "cpu": self.cpu_load(),
+            "checks": self.checks,
+            "triggers": self.triggers,
+            "threshold": self.threshold,
+            "last_cost": self.last_cost,
+        }
+
+
+def load_spotter(directory=TEMPLATE_DIR):
+    """A WakeWordSpotter for the enrolled templates, or None if there aren't enough."""
+    templates = load_templates(directory)
+    return WakeWordSpotter(templates) if templates else None
+
+
+def enroll(count=TEMPLATE_COUNT, directory=TEMPLATE_DIR):
+    """Records count samples of the wake word into directory."""
+    import audio_recorder
+    os.makedirs(directory, exist_ok=True)
+    recordings = []
+    for i in range(count):
+        input(f"[{i + 1}/{count}] Press Enter, then say '{WAKE_WORD}' once...")
+        audio = audio_recorder.record_with_immediate_stop()
+        if audio is None:
+            print("Nothing recorded; try again.")
+            return False
+        recordings.append(audio)
+    for i, audio in enumerate(recordings):
+        audio_recorder.save_debug_wav(audio, os.path.join(directory, f"{WAKE_WORD.lower()}_{i + 1}.wav"))
+    threshold = calibrate_threshold(template_features(recordings))
+    print(f"Enrolled {count} templates (match threshold {threshold:.2f}).")
+    return True
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["enroll"]:
+        enroll(int(sys.argv[2]) if len(sys.argv) > 2 else TEMPLATE_COUNT)
+    else:
+        print("Usage: python wake_word.py enroll [count]")